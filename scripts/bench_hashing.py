@@ -0,0 +1,101 @@
+"""로컬 파일 해시/지문 방식별 처리량을 측정합니다.
+
+사용법:
+    python scripts/bench_hashing.py <측정할 폴더> [--workers N] [--repeat N]
+    python scripts/bench_hashing.py --generate 2048 [--file-size-mb 64]
+
+<측정할 폴더>의 모든 파일을 방식별로 해시하여 MB/s 와 files/s 를 출력합니다.
+--generate 를 주면 임시 폴더에 지정한 MB 만큼 무작위 파일을 만들어 측정합니다.
+OS 페이지 캐시 효과를 줄이려면 측정 대상보다 큰 트리를 쓰거나 --repeat 1 을 사용하세요.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import sync  # noqa: E402
+
+
+def _collect_files(root):
+    return [path for path in root.rglob('*') if path.is_file()]
+
+
+def _generate_tree(root, total_mb, file_size_mb):
+    remaining = total_mb * 1024 * 1024
+    index = 0
+    while remaining > 0:
+        size = min(remaining, file_size_mb * 1024 * 1024)
+        target = root / f"dir{index % 16:02d}" / f"file{index:05d}.bin"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(os.urandom(size))
+        remaining -= size
+        index += 1
+
+
+def _bench(label, paths, hash_fn, workers, repeat):
+    total_bytes = sum(path.stat().st_size for path in paths)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        sync._hash_files_parallel(
+            {str(path): path for path in paths},
+            hash_fn,
+            max_workers=workers,
+        )
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    mb_per_sec = total_bytes / (1024 * 1024) / best if best else float('inf')
+    files_per_sec = len(paths) / best if best else float('inf')
+    print(f"| {label:<10} | {best:>9.3f} | {mb_per_sec:>10.1f} | {files_per_sec:>10.1f} |")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='해시/지문 방식별 처리량 측정')
+    parser.add_argument('root', type=Path, nargs='?', default=None, help='측정할 폴더')
+    parser.add_argument('--generate', type=int, default=None, metavar='MB',
+                        help='임시 폴더에 생성할 전체 데이터 크기(MB)')
+    parser.add_argument('--file-size-mb', type=int, default=64,
+                        help='--generate 시 파일 하나의 크기(MB)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='병렬 작업자 수 (기본: CPU 수)')
+    parser.add_argument('--repeat', type=int, default=3, help='방식별 반복 횟수 (최솟값 사용)')
+    args = parser.parse_args()
+
+    if args.root is None and args.generate is None:
+        parser.error('측정할 폴더 또는 --generate 를 지정해 주세요.')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = args.root
+        if root is None:
+            root = Path(tmp_dir)
+            _generate_tree(root, args.generate, args.file_size_mb)
+        paths = _collect_files(root)
+        total_mb = sum(path.stat().st_size for path in paths) / (1024 * 1024)
+        print(f"Files: {len(paths)}, Total: {total_mb:.1f} MB, "
+              f"Workers: {args.workers or os.cpu_count()}")
+        print()
+        print(f"| {'mode':<10} | {'seconds':>9} | {'MB/s':>10} | {'files/s':>10} |")
+        print(f"|{'-' * 12}|{'-' * 11}|{'-' * 12}|{'-' * 12}|")
+
+        modes = ['md5', 'blake2', 'sampled']
+        if sync.xxhash is not None:
+            modes.insert(1, 'xxh3')
+        if sync.blake3 is not None:
+            modes.insert(1, 'blake3')
+        for mode in modes:
+            _bench(
+                mode,
+                paths,
+                lambda path, mode=mode: sync.compute_file_fingerprint(path, mode),
+                args.workers,
+                args.repeat,
+            )
+
+
+if __name__ == '__main__':
+    main()
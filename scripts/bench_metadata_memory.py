@@ -0,0 +1,135 @@
+"""Drive/로컬 메타데이터 표현 방식별 최대 메모리(RSS)를 측정합니다.
+
+사용법:
+    python scripts/bench_metadata_memory.py [--entries 1000000]
+
+각 방식을 별도 프로세스에서 실행해 Drive 목록 + 로컬 스캔 결과를 --entries 개씩
+만들고, 프로세스 최대 RSS와 항목 100만 개당 환산값을 출력합니다.
+- dicts:   기존 표현 (API 응답 dict, 로컬 dict + Path, 양쪽이 별도 경로 문자열)
+- records: DriveFileRecord/LocalFileRecord (__slots__) + intern 된 공유 경로 문자열
+- parent_index: 같은 레코드를 (부모 폴더 번호, intern 된 이름) 키로 보관하고
+  폴더 경로는 양쪽이 공유하는 폴더 표에 한 번만 둡니다
+"""
+import argparse
+import resource
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+VARIANTS = ('baseline', 'dicts', 'records', 'parent_index')
+
+
+def _iter_synthetic_paths(count):
+    for index in range(count):
+        yield f"dir{index % 100:03d}/sub{(index // 100) % 100:03d}/file{index:08d}.bin"
+
+
+def _api_item(index, name):
+    return {
+        'id': f"1{index:032d}",
+        'name': name,
+        'size': str(index * 7 % 10_000_000),
+        'md5Checksum': f"{index:032x}",
+        'modifiedTime': '2024-01-01T00:00:00.000Z',
+        'mimeType': 'application/octet-stream',
+    }
+
+
+def _build(variant, count):
+    import sync
+
+    sync_dir = Path('/tmp/sync-root')
+    drive_files = {}
+    local_files = {}
+    folder_index = {'': 0}
+    if variant == 'baseline':
+        return drive_files, local_files
+    for index, rel_path in enumerate(_iter_synthetic_paths(count)):
+        name = rel_path.rsplit('/', 1)[-1]
+        item = _api_item(index, name)
+        if variant == 'dicts':
+            drive_files[rel_path] = item
+            # 로컬 스캔은 별도로 경로 문자열을 만들고 Path 객체를 보관합니다.
+            local_key = str(Path(rel_path))
+            local_files[local_key] = {
+                'path': sync_dir / local_key,
+                'md5': item['md5Checksum'],
+                'modified': 1_700_000_000.0,
+                'size': int(item['size']),
+            }
+        elif variant == 'parent_index':
+            # 부모 폴더 경로는 폴더 표에 한 번만 두고, 파일은 (폴더 번호, 이름)으로 찾습니다.
+            parent = rel_path.rpartition('/')[0]
+            parent_id = folder_index.setdefault(sys.intern(parent), len(folder_index))
+            key = (parent_id, sys.intern(name))
+            drive_files[key] = sync.DriveFileRecord.from_api(item)
+            # 유리한 쪽으로 가정해 키 튜플도 양쪽이 공유합니다.
+            local_files[key] = sync.LocalFileRecord(
+                size=int(item['size']),
+                modified=1_700_000_000.0,
+                mtime_ns=1_700_000_000_000_000_000,
+                md5=item['md5Checksum'],
+            )
+        else:
+            key = sys.intern(rel_path)
+            drive_files[key] = sync.DriveFileRecord.from_api(item)
+            local_files[sys.intern(str(Path(rel_path)))] = sync.LocalFileRecord(
+                size=int(item['size']),
+                modified=1_700_000_000.0,
+                mtime_ns=1_700_000_000_000_000_000,
+                md5=item['md5Checksum'],
+            )
+    return drive_files, local_files
+
+
+def _max_rss_bytes():
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위입니다.
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def _run_child(variant, count):
+    data = _build(variant, count)
+    print(_max_rss_bytes())
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='메타데이터 표현 방식별 최대 RSS 측정')
+    parser.add_argument('--entries', type=int, default=1_000_000,
+                        help='Drive/로컬 각각의 파일 항목 수 (기본: 1,000,000)')
+    parser.add_argument('--child', choices=VARIANTS, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _run_child(args.child, args.entries)
+        return
+
+    results = {}
+    for variant in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', variant, '--entries', str(args.entries)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[variant] = int(output.strip().splitlines()[-1])
+
+    baseline = results['baseline']
+    scale = 1_000_000 / args.entries
+    print(f"Entries per side: {args.entries:,}")
+    print()
+    print(f"| {'variant':<12} | {'peak RSS (MB)':>14} | {'MB / 1M entries':>16} | {'bytes / entry':>14} |")
+    print(f"|{'-' * 14}|{'-' * 16}|{'-' * 18}|{'-' * 16}|")
+    for variant in VARIANTS[1:]:
+        used = results[variant] - baseline
+        print(
+            f"| {variant:<12} | {results[variant] / 2**20:>14.1f} | "
+            f"{used * scale / 2**20:>16.1f} | {used / args.entries:>14.0f} |"
+        )
+
+
+if __name__ == '__main__':
+    main()
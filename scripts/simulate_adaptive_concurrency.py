@@ -0,0 +1,189 @@
+"""지연 시간/할당량 초과 프로필을 재현하는 가짜 Drive 백엔드로 동시 실행 수 조정을 시뮬레이션합니다.
+
+사용법:
+    python scripts/simulate_adaptive_concurrency.py [--profile all] [--bounds 1:16] [--seconds 6]
+    python scripts/simulate_adaptive_concurrency.py --check
+
+프로필마다 AdaptiveConcurrency 를 새로 만들고 --bounds 상한만큼의 작업자가 가짜
+요청을 계속 보내며, 0.5초 간격으로 동시 실행 수, 처리량, 429 응답 수를 출력합니다.
+- steady:    동시 6개까지는 지연이 일정하고, 넘으면 대기열 때문에 비례해서 느려짐
+- throttled: 용량은 충분하지만 초당 요청 수 제한을 넘으면 429 응답
+- daytime:   중간 구간에서 용량이 줄고 초당 제한이 걸렸다가 다시 회복
+시간을 줄여 실행하므로 재시도 백오프도 --backoff 초로 줄여서 사용합니다.
+
+--check 는 표 대신 조정 규칙을 assert 로 확인하고, 어긋나면 0이 아닌 코드로 끝납니다.
+- 429 응답 한 번에 동시 실행 수가 절반으로 줄어듦
+- steady 프로필에서 429 없이 동시 실행 수가 늘어남
+- throttled 프로필에서 429를 받으면 동시 실행 수가 줄어듦
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import sync  # noqa: E402
+
+# 구간별 (시작 비율, 용량, 기본 지연(초), 초당 요청 제한 또는 None)
+PROFILES = {
+    'steady': [(0.0, 6, 0.02, None)],
+    'throttled': [(0.0, 32, 0.02, 150)],
+    'daytime': [(0.0, 8, 0.02, None), (0.35, 2, 0.04, 40), (0.7, 8, 0.02, None)],
+}
+
+
+def _rate_limit_error():
+    return HttpError(
+        httplib2.Response({'status': 429}),
+        json.dumps({'error': {'errors': [{'reason': 'rateLimitExceeded'}]}}).encode(),
+    )
+
+
+class ScriptedBackend:
+    """프로필 구간에 따라 지연 시간과 429 응답을 흉내 내는 가짜 Drive API입니다."""
+
+    def __init__(self, phases, seconds):
+        self._phases = phases
+        self._seconds = seconds
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._in_flight = 0
+        self._tokens = 0.0
+        self._refilled = self._started
+        self.completed = 0
+        self.rejected = 0
+
+    def _phase(self):
+        progress = (time.monotonic() - self._started) / self._seconds
+        return [phase for phase in self._phases if phase[0] <= progress][-1]
+
+    def request(self):
+        _, capacity, base_latency, rate_limit = self._phase()
+        with self._lock:
+            # 초당 제한은 0.1초 분량까지 몰아 쓸 수 있는 토큰 버킷으로 흉내 냅니다.
+            now = time.monotonic()
+            if rate_limit is not None:
+                self._tokens = min(rate_limit / 10, self._tokens + (now - self._refilled) * rate_limit)
+            self._refilled = now
+            if rate_limit is not None and self._tokens < 1:
+                self.rejected += 1
+                raise _rate_limit_error()
+            if rate_limit is not None:
+                self._tokens -= 1
+            self._in_flight += 1
+            in_flight = self._in_flight
+        # 용량을 넘는 요청은 대기열에서 기다리는 만큼 느려집니다.
+        time.sleep(base_latency * max(1.0, in_flight / capacity))
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+
+
+def _simulate(name, bounds, seconds, report=True):
+    backend = ScriptedBackend(PROFILES[name], seconds)
+    limiter = sync.AdaptiveConcurrency(name, *bounds)
+    deadline = time.monotonic() + seconds
+
+    def _worker():
+        while time.monotonic() < deadline:
+            try:
+                limiter.call(backend.request)
+            except HttpError:
+                pass
+
+    workers = [threading.Thread(target=_worker, daemon=True) for _ in range(bounds[1])]
+    for worker in workers:
+        worker.start()
+
+    if report:
+        print(f"## {name}")
+        print()
+        print(f"| {'t (s)':>6} | {'phase cap':>9} | {'limit':>5} | {'req/s':>7} | {'429s':>5} |")
+        print(f"|{'-' * 8}|{'-' * 11}|{'-' * 7}|{'-' * 9}|{'-' * 7}|")
+    previous_completed = previous_rejected = 0
+    started = time.monotonic()
+    while report and time.monotonic() < deadline:
+        time.sleep(0.5)
+        completed, rejected = backend.completed, backend.rejected
+        print(
+            f"| {time.monotonic() - started:>6.1f} | {backend._phase()[1]:>9} | "
+            f"{limiter.limit:>5} | {(completed - previous_completed) / 0.5:>7.0f} | "
+            f"{rejected - previous_rejected:>5} |"
+        )
+        previous_completed, previous_rejected = completed, rejected
+    for worker in workers:
+        worker.join()
+    if report:
+        print()
+        print(limiter.summary())
+        print()
+    return limiter, backend
+
+
+def _check(bounds, seconds):
+    # 1. 429 응답 한 번에 동시 실행 수가 ADAPTIVE_DECREASE_FACTOR 배로 줄어야 합니다.
+    limiter = sync.AdaptiveConcurrency('check', *bounds)
+    limiter.limit = bounds[1]
+    responses = iter([_rate_limit_error()])
+
+    def _request():
+        error = next(responses, None)
+        if error is not None:
+            raise error
+
+    limiter.call(_request)
+    expected = max(bounds[0], int(bounds[1] * sync.ADAPTIVE_DECREASE_FACTOR))
+    assert limiter.limit == expected, f"429 후 동시 실행 수 {limiter.limit} != {expected}"
+    assert limiter.throttled == 1 and limiter.requests == 1, limiter.summary()
+    print(f"ok: 429 halves the limit ({bounds[1]} -> {limiter.limit})")
+
+    # 2. 지연이 일정하면 동시 실행 수가 최소값에서 늘어나야 합니다.
+    limiter, backend = _simulate('steady', bounds, seconds, report=False)
+    assert backend.rejected == 0, f"steady 프로필에서 429 {backend.rejected}건"
+    assert limiter.increases > 0 and limiter.peak > bounds[0], limiter.summary()
+    print(f"ok: steady load grows the limit (peak {limiter.peak})")
+
+    # 3. 초당 요청 제한에 걸리면 동시 실행 수를 줄여야 합니다.
+    limiter, backend = _simulate('throttled', bounds, seconds, report=False)
+    assert backend.rejected > 0, "throttled 프로필에서 429가 발생하지 않았습니다"
+    assert limiter.decreases > 0, limiter.summary()
+    print(f"ok: throttling shrinks the limit ({limiter.decreases} decrease(s))")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='동시 실행 수 자동 조정 시뮬레이션')
+    parser.add_argument('--profile', choices=['all', *PROFILES], default='all',
+                        help='실행할 프로필 (기본: 전체)')
+    parser.add_argument('--bounds', default='1:16', help='동시 실행 수 범위 MIN:MAX (기본: 1:16)')
+    parser.add_argument('--seconds', type=float, default=6.0, help='프로필당 실행 시간(초)')
+    parser.add_argument('--backoff', type=float, default=0.05,
+                        help='할당량 초과 시 첫 재시도 대기(초) (기본: 0.05)')
+    parser.add_argument('--check', action='store_true',
+                        help='표 대신 조정 규칙을 assert 로 확인 (실패 시 종료 코드 1)')
+    args = parser.parse_args()
+
+    try:
+        bounds = sync.parse_worker_bounds(args.bounds)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.check and bounds[0] >= bounds[1]:
+        parser.error('--check 에는 MIN < MAX 인 --bounds 가 필요합니다')
+    sync.RATE_LIMIT_BACKOFF_BASE = args.backoff
+    sync.RATE_LIMIT_BACKOFF_MAX = args.backoff * 16
+
+    if args.check:
+        _check(bounds, args.seconds)
+        return
+
+    for name in PROFILES if args.profile == 'all' else [args.profile]:
+        _simulate(name, bounds, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,15 +4,39 @@ import json
 import os
 import pickle
 import hashlib
+import heapq
+import random
+import re
 import shutil
+import signal
+import sqlite3
+import subprocess
 import sys
-from datetime import datetime
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta, timezone
+from fnmatch import translate as glob_to_regex
 from pathlib import Path
 from typing import Dict, Set, Tuple
+from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
+try:
+    import xxhash
+except ImportError:  # 선택 의존성: 없으면 다른 지문 방식으로 대체
+    xxhash = None
+try:
+    import blake3
+except ImportError:  # 선택 의존성: 없으면 다른 지문 방식으로 대체
+    blake3 = None
+from google.oauth2 import service_account
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaIoBaseDownload, MediaFileUpload
 
 SCOPES = ['https://www.googleapis.com/auth/drive']
@@ -23,7 +47,89 @@ FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
 GOOGLE_APPS_MIME_PREFIX = 'application/vnd.google-apps.'
 BACKUP_DIR_NAME = 'conflicts_backup'
 SYNC_LOG_FILENAME = 'sync.log'
+# 충돌 백업 이름 끝의 생성 시각. 원본 파일의 mtime 이 그대로 남는 경우가 많아 보존 기간은 이것으로 판단합니다.
+BACKUP_TIMESTAMP_FORMAT = '%Y%m%d_%H%M%S'
+BACKUP_TIMESTAMP_PATTERN = re.compile(r'_(\d{8}_\d{6})(?:\.revision\.json)?$')
+REVISION_NOTE_SUFFIX = '.revision.json'
+SYNC_IGNORE_FILENAME = '.syncignore'
 MAX_LOG_SIZE_BYTES = 10 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+FINGERPRINT_MODES = ('auto', 'xxh3', 'blake3', 'blake2', 'sampled', 'md5')
+FINGERPRINT_SAMPLE_SIZE = 64 * 1024
+STATE_DIR_NAME = '.sync_state'
+DIRECTORY_DIGESTS_FILENAME = 'directory_digests.json'
+EXPORT_INDEX_FILENAME = 'export_index.json'
+LOCAL_INDEX_FILENAME = 'local_index.json'
+METRICS_FILENAME = 'metrics.json'
+JOURNAL_FILENAME = 'journal.jsonl'
+DRIVE_SNAPSHOT_FILENAME = 'drive_snapshot.sqlite'
+# 스냅샷 저장 시각(로컬 시계)과 Drive createdTime 의 시계 차이를 감안한 여유.
+SNAPSHOT_CLOCK_SKEW = timedelta(minutes=10)
+JOURNAL_FSYNC_BATCH = 100
+JOURNAL_FSYNC_INTERVAL = 1.0
+PARTIAL_FILE_SUFFIX = '.sync-part'
+SHARD_MODES = ('subtree', 'hash')
+DEFAULT_EXPORT_WORKERS = 2
+# 목록 조회/전송 동시 실행 수 (최소, 최대). 둘이 같으면 고정, 다르면 자동 조정합니다.
+DEFAULT_LIST_WORKERS = (1, 8)
+DEFAULT_TRANSFER_WORKERS = (1, 4)
+ADAPTIVE_MIN_WINDOW = 8
+ADAPTIVE_DECREASE_FACTOR = 0.5
+ADAPTIVE_LATENCY_DECREASE_FACTOR = 0.75
+ADAPTIVE_LATENCY_TOLERANCE = 1.5
+ADAPTIVE_BASELINE_DRIFT = 1.02
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+RATE_LIMIT_MAX_RETRIES = 6
+RATE_LIMIT_BACKOFF_BASE = 1.0
+RATE_LIMIT_BACKOFF_MAX = 64.0
+# 자격 증명 풀: 자격 증명별 기본 초당 요청 수와 할당량 초과 시 휴식 시간(초)
+CREDENTIAL_DEFAULT_QPS = 10.0
+CREDENTIAL_COOLDOWN_BASE = 2.0
+CREDENTIAL_COOLDOWN_MAX = 120.0
+# Google Workspace 문서 종류별 내보내기 형식 (확장자 -> export MIME 타입)
+GOOGLE_WORKSPACE_KINDS = {
+    'application/vnd.google-apps.document': 'document',
+    'application/vnd.google-apps.spreadsheet': 'spreadsheet',
+    'application/vnd.google-apps.presentation': 'presentation',
+    'application/vnd.google-apps.drawing': 'drawing',
+}
+EXPORT_MIME_TYPES = {
+    'document': {
+        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        'odt': 'application/vnd.oasis.opendocument.text',
+        'pdf': 'application/pdf',
+        'txt': 'text/plain',
+        'md': 'text/markdown',
+    },
+    'spreadsheet': {
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'ods': 'application/vnd.oasis.opendocument.spreadsheet',
+        'pdf': 'application/pdf',
+        'csv': 'text/csv',
+    },
+    'presentation': {
+        'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+        'odp': 'application/vnd.oasis.opendocument.presentation',
+        'pdf': 'application/pdf',
+    },
+    'drawing': {
+        'png': 'image/png',
+        'svg': 'image/svg+xml',
+        'pdf': 'application/pdf',
+    },
+}
+DEFAULT_EXPORT_FORMATS = {
+    'document': 'docx',
+    'spreadsheet': 'xlsx',
+    'presentation': 'pptx',
+    'drawing': 'png',
+}
+VERIFY_REPORT_FILENAME = 'verify.md'
+DRIVE_BACKUP_MODES = ('download', 'copy', 'revision')
+# linux/fs.h 의 FICLONE ioctl 번호 (btrfs/xfs 등 reflink 지원 파일시스템)
+FICLONE = 0x40049409
+# SIGINT/SIGTERM 을 받으면 설정되어 진행 중인 전송을 마무리하고 멈추게 합니다.
+STOP_REQUESTED = threading.Event()
 
 def _load_credentials_json():
     """credentials.json을 로드합니다. JSON 오류 시 원인을 알기 쉽게 출력합니다."""
@@ -55,7 +161,7 @@ def _load_credentials_json():
         sys.exit(1)
 
 
-def get_service():
+def get_credentials():
     creds = None
     if os.path.exists(TOKEN_FILE):
         with open(TOKEN_FILE, 'rb') as token:
@@ -69,9 +175,702 @@ def get_service():
             creds = flow.run_local_server(port=0)
         with open(TOKEN_FILE, 'wb') as token:
             pickle.dump(creds, token)
+    return creds
+
+
+def build_drive_service(creds):
+    """자격 증명으로 Drive API 서비스 객체를 만듭니다.
+
+    서비스 객체(httplib2)는 스레드 간 공유가 안전하지 않으므로
+    작업자 스레드마다 이 함수로 별도 객체를 만들어 사용합니다.
+    """
     return build('drive', 'v3', credentials=creds)
 
 
+def get_service():
+    return build_drive_service(get_credentials())
+
+
+def is_rate_limit_error(error):
+    """Drive 할당량 초과(429, 403 rateLimitExceeded/userRateLimitExceeded) 오류인지 확인합니다.
+
+    403은 권한 오류에도 쓰이므로 응답 본문의 reason 으로 구분합니다.
+    """
+    if not isinstance(error, HttpError):
+        return False
+    return _is_rate_limit_response(getattr(error.resp, 'status', None), error.content)
+
+
+def _is_rate_limit_response(status, content):
+    if status == 429:
+        return True
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', 'replace')
+    return status == 403 and any(reason in (content or '') for reason in RATE_LIMIT_REASONS)
+
+
+def parse_worker_bounds(spec):
+    """'N' 또는 'MIN:MAX' 형식의 동시 실행 수 범위를 해석합니다.
+
+    Args:
+        spec (str): 예) '4' (고정), '1:8' (1~8 사이 자동 조정).
+
+    Returns:
+        tuple[int, int]: (최소, 최대) 동시 실행 수.
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 범위가 올바르지 않은 경우.
+    """
+    parts = spec.split(':')
+    try:
+        bounds = [int(part) for part in parts]
+    except ValueError:
+        raise ValueError(f"동시 실행 수는 N 또는 MIN:MAX 형식이어야 합니다: {spec}") from None
+    if len(bounds) == 1:
+        bounds *= 2
+    if len(bounds) != 2 or bounds[0] < 1 or bounds[0] > bounds[1]:
+        raise ValueError(f"동시 실행 수 범위가 올바르지 않습니다 (1 <= MIN <= MAX): {spec}")
+    return bounds[0], bounds[1]
+
+
+class AdaptiveConcurrency:
+    """AIMD 방식으로 Drive API 동시 요청 수를 min_limit~max_limit 사이에서 조정합니다.
+
+    한 번에 limit 개까지만 call() 을 실행하며, 완료된 요청이 일정 수(창) 모일
+    때마다 지연 시간 분위수와 처리량을 보고 다음과 같이 조정합니다.
+    - 할당량 초과(403/429): 즉시 limit 을 ADAPTIVE_DECREASE_FACTOR 배로 줄이고
+      지수 백오프 후 같은 요청을 재시도합니다. 감소 전에 시작한 요청의 초과 응답은
+      같은 혼잡으로 보고 다시 줄이지 않습니다.
+    - 창의 p50 지연이 기준 지연의 ADAPTIVE_LATENCY_TOLERANCE 배를 넘는데 처리량이
+      10% 넘게 늘지 않았으면 (대기열만 길어짐): ADAPTIVE_LATENCY_DECREASE_FACTOR 배로 줄입니다.
+    - 그 밖에 창 동안 limit 까지 모두 사용했으면: 1 늘립니다.
+    기준 지연은 지금까지 가장 낮았던 창 p50 이며, 조건 변화를 따라가도록 창마다
+    ADAPTIVE_BASELINE_DRIFT 배씩 천천히 올라갑니다. 지연 시간은 요청의
+    작업량(units, 예: 전송 MiB)으로 나눈 값을 사용합니다.
+    """
+
+    def __init__(self, name, min_limit=1, max_limit=1, latency_tolerance=ADAPTIVE_LATENCY_TOLERANCE):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = min_limit
+        self.latency_tolerance = latency_tolerance
+        self.requests = 0
+        self.throttled = 0
+        self.increases = 0
+        self.decreases = 0
+        self.peak = 0
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._latencies = deque(maxlen=4096)
+        self._baseline = None
+        self._previous_throughput = None
+        self._decreased_at = None
+        self._reset_window()
+
+    @property
+    def adaptive(self):
+        return self.min_limit < self.max_limit
+
+    def _reset_window(self):
+        self._window = []
+        self._window_units = 0.0
+        self._window_started = time.monotonic()
+        self._window_peak = self._in_flight
+
+    def _acquire(self):
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+            self.peak = max(self.peak, self._in_flight)
+            self._window_peak = max(self._window_peak, self._in_flight)
+
+    def _release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _set_limit(self, limit):
+        limit = max(self.min_limit, min(self.max_limit, limit))
+        if limit > self.limit:
+            self.increases += 1
+        elif limit < self.limit:
+            self.decreases += 1
+            self._decreased_at = time.monotonic()
+        self.limit = limit
+        self._cond.notify_all()
+
+    def call(self, fn, *args, units=1.0, **kwargs):
+        """동시 실행 수 제한 안에서 fn 을 실행하고 지연 시간/할당량 초과를 기록합니다.
+
+        Args:
+            fn (Callable): 실행할 함수 (Drive API 요청 등).
+            *args: fn 위치 인자.
+            units (float): 이 요청의 작업량. 지연 시간/처리량 계산에 사용합니다.
+            **kwargs: fn 키워드 인자.
+
+        Returns:
+            fn 의 반환값.
+
+        Raises:
+            HttpError: 할당량 초과가 RATE_LIMIT_MAX_RETRIES 번 넘게 반복되거나 다른 API 오류인 경우.
+            SyncInterrupted: 백오프 대기 중 중단이 요청된 경우.
+        """
+        attempt = 0
+        while True:
+            self._acquire()
+            started = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as error:
+                self._release()
+                if not is_rate_limit_error(error) or attempt >= RATE_LIMIT_MAX_RETRIES:
+                    raise
+                self._record_throttle(started)
+                delay = min(RATE_LIMIT_BACKOFF_MAX, RATE_LIMIT_BACKOFF_BASE * 2 ** attempt)
+                retry_after = error.resp.get('retry-after') if hasattr(error.resp, 'get') else None
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+                attempt += 1
+                if STOP_REQUESTED.wait(delay * random.uniform(0.5, 1.0)):
+                    raise SyncInterrupted(f"Stopped while backing off ({self.name})") from error
+                continue
+            self._release()
+            self._record_success(time.monotonic() - started, units)
+            return result
+
+    def _record_throttle(self, started):
+        with self._cond:
+            self.throttled += 1
+            if self.adaptive and (self._decreased_at is None or started > self._decreased_at):
+                previous = self.limit
+                self._set_limit(int(self.limit * ADAPTIVE_DECREASE_FACTOR))
+                if self.limit != previous:
+                    print(f"Throttled by Drive ({self.name}), concurrency {previous} -> {self.limit}")
+                self._reset_window()
+
+    def _record_success(self, elapsed, units):
+        with self._cond:
+            self.requests += 1
+            latency = elapsed / max(units, 1e-9)
+            self._latencies.append(latency)
+            self._window.append(latency)
+            self._window_units += units
+            if self.adaptive and len(self._window) >= max(ADAPTIVE_MIN_WINDOW, 2 * self.limit):
+                self._adjust()
+
+    def _adjust(self):
+        p50, _ = _percentiles(self._window)
+        elapsed = max(time.monotonic() - self._window_started, 1e-9)
+        throughput = self._window_units / elapsed
+        if self._baseline is None:
+            self._baseline = p50
+        else:
+            self._baseline = min(self._baseline * ADAPTIVE_BASELINE_DRIFT, p50)
+        improved = (
+            self._previous_throughput is None or throughput > self._previous_throughput * 1.1
+        )
+        if p50 > self._baseline * self.latency_tolerance and not improved:
+            self._set_limit(min(self.limit - 1, int(self.limit * ADAPTIVE_LATENCY_DECREASE_FACTOR)))
+        elif self._window_peak >= self.limit:
+            self._set_limit(self.limit + 1)
+        self._previous_throughput = throughput
+        self._reset_window()
+
+    def latency_percentiles(self):
+        """최근 요청의 (p50, p95) 지연 시간(초/작업량)을 반환합니다. 요청이 없으면 (0, 0)."""
+        with self._cond:
+            return _percentiles(list(self._latencies))
+
+    def summary(self):
+        """현재 동시 실행 수와 통계를 한 줄로 요약합니다."""
+        _, p95 = self.latency_percentiles()
+        return (
+            f"Concurrency ({self.name}): {self.limit} "
+            f"(peak {self.peak}, bounds {self.min_limit}-{self.max_limit}), "
+            f"requests {self.requests}, throttled {self.throttled}, p95 {p95:.3f}s"
+        )
+
+
+def _percentiles(values):
+    if not values:
+        return 0.0, 0.0
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2], ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class CredentialPoolExhausted(Exception):
+    """자격 증명 풀에 사용할 수 있는 자격 증명이 하나도 남지 않았을 때 발생합니다."""
+
+
+def parse_credential_spec(spec, default_qps=CREDENTIAL_DEFAULT_QPS):
+    """'PATH' 또는 'PATH@QPS' 형식의 자격 증명 풀 항목을 해석합니다.
+
+    Args:
+        spec (str): 예) 'tokens/alice.pickle', 'keys/sa.json@20'.
+        default_qps (float): QPS를 생략했을 때 사용할 초당 요청 수.
+
+    Returns:
+        tuple[Path, float]: (파일 경로, 초당 요청 수).
+
+    Raises:
+        ValueError: QPS가 양수가 아닌 경우.
+    """
+    path, qps = spec, default_qps
+    if '@' in spec:
+        head, tail = spec.rsplit('@', 1)
+        try:
+            path, qps = head, float(tail)
+        except ValueError:
+            path, qps = spec, default_qps
+    if qps <= 0:
+        raise ValueError(f"자격 증명 초당 요청 수는 0보다 커야 합니다: {spec}")
+    return Path(path).expanduser(), qps
+
+
+def load_pooled_credentials(path):
+    """자격 증명 풀에 넣을 자격 증명 파일을 읽습니다.
+
+    서비스 계정 키(JSON, type=service_account), 사용자 자격 증명 JSON
+    (type=authorized_user), get_credentials 가 저장하는 token.pickle 형식의
+    사용자 토큰을 지원합니다. 풀의 토큰은 미리 인증해 두어야 하며 브라우저
+    인증 흐름은 실행하지 않습니다.
+
+    Args:
+        path (Path): 자격 증명 파일 경로.
+
+    Returns:
+        google.auth.credentials.Credentials: 읽은 자격 증명.
+
+    Raises:
+        ValueError: 파일이 없거나 형식을 알 수 없는 경우.
+    """
+    try:
+        if path.suffix.lower() == '.json':
+            info = json.loads(path.read_text(encoding='utf-8'))
+            kind = info.get('type')
+            if kind == 'service_account':
+                return service_account.Credentials.from_service_account_info(info, scopes=SCOPES)
+            if kind == 'authorized_user':
+                return Credentials.from_authorized_user_info(info, SCOPES)
+            raise ValueError(f"지원하지 않는 자격 증명 JSON 입니다 (type={kind}): {path}")
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, json.JSONDecodeError, pickle.UnpicklingError) as error:
+        raise ValueError(f"자격 증명 파일을 읽을 수 없습니다: {path} ({error})") from None
+
+
+class PooledCredential:
+    """자격 증명 풀의 구성원 하나와 그 요청 속도 제한/상태를 보관합니다."""
+
+    def __init__(self, label, creds, qps=CREDENTIAL_DEFAULT_QPS, path=None):
+        self.label = label
+        self.creds = creds
+        self.qps = qps
+        self.path = path
+        self.tokens = 1.0
+        self.refilled = time.monotonic()
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.failures = 0
+        self.disabled = False
+        self.requests = 0
+        self.throttled = 0
+        self.refresh_failures = 0
+        self.refresh_lock = threading.Lock()
+
+    def refill(self, now):
+        """초당 qps 개씩, 최대 1초 분량까지 요청 토큰을 채웁니다."""
+        self.tokens = min(max(1.0, self.qps), self.tokens + (now - self.refilled) * self.qps)
+        self.refilled = now
+
+    def status(self):
+        if self.disabled:
+            return 'disabled (token refresh failed)'
+        if self.cooldown_until > time.monotonic():
+            return 'cooling down'
+        return 'healthy'
+
+
+class CredentialPool:
+    """여러 자격 증명(사용자 토큰/서비스 계정)에 Drive API 요청을 나눠 보냅니다.
+
+    구성원마다 초당 요청 수(qps) 토큰 버킷을 두고, 요청마다 사용할 수 있는 구성원 중
+    진행 중인 요청이 가장 적은 쪽을 고릅니다. 할당량 초과 응답을 받은 구성원은
+    CREDENTIAL_COOLDOWN_BASE 초부터 두 배씩 늘어나는 휴식 시간 동안 제외하고,
+    토큰 갱신에 실패한 구성원은 이번 실행에서 제외해 나머지 구성원으로 전환합니다.
+    """
+
+    def __init__(self, members):
+        self.members = members
+        self.failovers = 0
+        self._cond = threading.Condition()
+
+    @classmethod
+    def load(cls, specs):
+        """parse_credential_spec 결과 목록에서 풀을 만듭니다.
+
+        Args:
+            specs (list[tuple[Path, float]]): (파일 경로, 초당 요청 수) 목록.
+
+        Returns:
+            CredentialPool: 자격 증명 풀.
+
+        Raises:
+            ValueError: 자격 증명 파일을 읽을 수 없는 경우.
+        """
+        return cls(
+            [
+                PooledCredential(str(path), load_pooled_credentials(path), qps, path=path)
+                for path, qps in specs
+            ]
+        )
+
+    def acquire(self):
+        """요청 하나에 사용할 구성원을 고릅니다. 모두 쉬는 중이면 가장 먼저 풀리는 때까지 기다립니다.
+
+        Returns:
+            PooledCredential: 토큰이 유효한 구성원. 사용 후 release 해야 합니다.
+
+        Raises:
+            CredentialPoolExhausted: 모든 구성원이 토큰 갱신에 실패한 경우.
+        """
+        while True:
+            member = self._reserve()
+            if self._ensure_valid(member):
+                return member
+
+    def _reserve(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                ready = []
+                wake_at = None
+                for member in self.members:
+                    if member.disabled:
+                        continue
+                    member.refill(now)
+                    if member.cooldown_until > now:
+                        ready_at = member.cooldown_until
+                    elif member.tokens < 1:
+                        ready_at = now + (1 - member.tokens) / member.qps
+                    else:
+                        ready.append(member)
+                        continue
+                    wake_at = ready_at if wake_at is None else min(wake_at, ready_at)
+                if ready:
+                    member = min(ready, key=lambda m: (m.in_flight, -m.tokens))
+                    member.tokens -= 1
+                    member.in_flight += 1
+                    member.requests += 1
+                    return member
+                if wake_at is None:
+                    raise CredentialPoolExhausted(
+                        "사용할 수 있는 자격 증명이 없습니다 (모든 토큰 갱신 실패)"
+                    )
+                self._cond.wait(wake_at - now)
+
+    def _ensure_valid(self, member):
+        with member.refresh_lock:
+            if member.disabled:
+                self.release(member)
+                return False
+            if member.creds.valid:
+                return True
+            try:
+                member.creds.refresh(Request())
+            except RefreshError as error:
+                self.release(member)
+                self.mark_refresh_failed(member, error)
+                return False
+            self._save_refreshed(member)
+        return True
+
+    @staticmethod
+    def _save_refreshed(member):
+        # get_credentials 처럼 갱신한 사용자 토큰을 pickle 파일에 다시 저장합니다.
+        # JSON 자격 증명(서비스 계정/authorized_user)은 갱신 토큰이 바뀌지 않아 그대로 둡니다.
+        if member.path is None or member.path.suffix.lower() == '.json':
+            return
+        try:
+            with open(member.path, 'wb') as token:
+                pickle.dump(member.creds, token)
+        except OSError as error:
+            print(f"Could not save refreshed token: {member.label} ({error})")
+
+    def release(self, member):
+        """acquire 로 고른 구성원의 진행 중 요청 수를 줄입니다."""
+        with self._cond:
+            member.in_flight -= 1
+            self._cond.notify_all()
+
+    def mark_healthy(self, member):
+        with self._cond:
+            member.failures = 0
+
+    def mark_throttled(self, member):
+        """할당량 초과를 받은 구성원을 잠시 제외합니다."""
+        with self._cond:
+            delay = min(CREDENTIAL_COOLDOWN_MAX, CREDENTIAL_COOLDOWN_BASE * 2 ** member.failures)
+            member.cooldown_until = max(member.cooldown_until, time.monotonic() + delay)
+            member.failures += 1
+            member.throttled += 1
+            self.failovers += 1
+            self._cond.notify_all()
+        print(f"Credential throttled: {member.label} (cooling down {delay:.0f}s)")
+
+    def mark_refresh_failed(self, member, error=None):
+        """토큰 갱신에 실패한 구성원을 이번 실행에서 제외합니다."""
+        with self._cond:
+            if member.disabled:
+                return
+            member.disabled = True
+            member.refresh_failures += 1
+            self.failovers += 1
+            self._cond.notify_all()
+        print(f"Credential refresh failed, disabled for this run: {member.label} ({error})")
+
+    def healthy_count(self):
+        return sum(1 for member in self.members if member.status() == 'healthy')
+
+    def summary_lines(self):
+        """구성원별 요청 수와 상태를 요약합니다."""
+        return [
+            f"Credential {member.label}: {member.requests} request(s), "
+            f"throttled {member.throttled}, {member.status()}"
+            for member in self.members
+        ]
+
+
+class PooledDriveService:
+    """CredentialPool 로 요청을 나눠 보내는 Drive 서비스 객체입니다.
+
+    service.files().list(...).execute() 처럼 기존 서비스 객체와 같은 방식으로 쓰며,
+    execute() 마다 풀에서 자격 증명을 골라 그 자격 증명의 스레드별 서비스로 요청합니다.
+    할당량 초과나 토큰 갱신 실패는 다른 구성원으로 다시 보내고, 모든 구성원이
+    할당량을 초과했으면 오류를 그대로 올려 AdaptiveConcurrency 가 동시 실행 수를
+    줄이고 백오프하게 합니다. get_media/export_media 는 MediaIoBaseDownload 에 넘길
+    실제 요청을 반환하므로 응답 상태만 풀에 보고하고, 재시도는 호출자가 합니다.
+    이때 고른 구성원은 마지막 청크를 받을 때까지 진행 중 요청으로 셉니다.
+    """
+
+    MEDIA_METHODS = ('get_media', 'export_media')
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._thread_state = threading.local()
+
+    def _member_service(self, member):
+        services = getattr(self._thread_state, 'services', None)
+        if services is None:
+            services = self._thread_state.services = {}
+        service = services.get(member.label)
+        if service is None:
+            service = services[member.label] = build_drive_service(member.creds)
+        return service
+
+    def files(self):
+        return _PooledResource(self, 'files')
+
+    def changes(self):
+        return _PooledResource(self, 'changes')
+
+    def revisions(self):
+        return _PooledResource(self, 'revisions')
+
+    def build_request(self, member, resource, method, kwargs):
+        return getattr(getattr(self._member_service(member), resource)(), method)(**kwargs)
+
+    def execute(self, resource, method, kwargs, execute_kwargs):
+        """요청을 풀의 구성원으로 실행하고, 할당량 초과/토큰 갱신 실패 시 다른 구성원으로 전환합니다."""
+        throttled = 0
+        while True:
+            member = self.pool.acquire()
+            try:
+                result = self.build_request(member, resource, method, kwargs).execute(
+                    **execute_kwargs
+                )
+            except RefreshError as error:
+                self.pool.release(member)
+                self.pool.mark_refresh_failed(member, error)
+                continue
+            except HttpError as error:
+                self.pool.release(member)
+                if not is_rate_limit_error(error):
+                    raise
+                self.pool.mark_throttled(member)
+                throttled += 1
+                if throttled >= len(self.pool.members):
+                    raise
+                continue
+            self.pool.release(member)
+            self.pool.mark_healthy(member)
+            return result
+
+    def media_request(self, resource, method, kwargs):
+        member = self.pool.acquire()
+        try:
+            request = self.build_request(member, resource, method, kwargs)
+        except Exception:
+            self.pool.release(member)
+            raise
+        # 구성원은 _PoolReportingHttp 가 다운로드를 마칠 때 release 합니다.
+        request.http = _PoolReportingHttp(request.http, self.pool, member)
+        return request
+
+
+class _PooledResource:
+    def __init__(self, service, resource):
+        self._service = service
+        self._resource = resource
+
+    def __getattr__(self, method):
+        def _make_request(**kwargs):
+            if method in PooledDriveService.MEDIA_METHODS:
+                return self._service.media_request(self._resource, method, kwargs)
+            return _PooledRequest(self._service, self._resource, method, kwargs)
+
+        return _make_request
+
+
+class _PooledRequest:
+    def __init__(self, service, resource, method, kwargs):
+        self._service = service
+        self._resource = resource
+        self._method = method
+        self._kwargs = kwargs
+
+    def execute(self, **execute_kwargs):
+        return self._service.execute(self._resource, self._method, self._kwargs, execute_kwargs)
+
+
+class _PoolReportingHttp:
+    """미디어 다운로드 응답 상태를 자격 증명 풀에 보고하는 http 래퍼입니다.
+
+    마지막 청크를 받거나 오류가 나면 구성원을 release 하므로, 다운로드/내보내기가
+    진행되는 동안 그 구성원의 진행 중 요청 수에 포함됩니다.
+    """
+
+    _released = True
+
+    def __init__(self, http, pool, member):
+        self._http = http
+        self._pool = pool
+        self._member = member
+        self._released = False
+
+    def _release(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._member)
+
+    def request(self, *args, **kwargs):
+        try:
+            response, content = self._http.request(*args, **kwargs)
+        except RefreshError as error:
+            self._release()
+            self._pool.mark_refresh_failed(self._member, error)
+            raise
+        except Exception:
+            self._release()
+            raise
+        if _is_rate_limit_response(response.status, content):
+            self._release()
+            self._pool.mark_throttled(self._member)
+        elif response.status >= 400:
+            self._release()
+        else:
+            self._pool.mark_healthy(self._member)
+            # 'bytes 0-1048575/5242880' 처럼 남은 범위가 있으면 아직 진행 중입니다.
+            _, _, byte_range = (response.get('content-range') or '').rpartition(' ')
+            span, _, total = byte_range.partition('/')
+            last_byte = span.rpartition('-')[2]
+            if not (last_byte.isdigit() and total.isdigit() and int(last_byte) + 1 < int(total)):
+                self._release()
+        return response, content
+
+    def __del__(self):
+        # 끝까지 받지 않고 버린 요청도 진행 중 요청 수에서 뺍니다.
+        self._release()
+
+    def __getattr__(self, name):
+        return getattr(self._http, name)
+
+
+def _normalize_size(value):
+    """파일 크기 값을 정수로 정규화합니다.
+
+    Args:
+        value: 정수 또는 문자열 형태 크기.
+
+    Returns:
+        int | None: 변환된 파일 크기. 변환 불가 시 None.
+    """
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class DriveFileRecord:
+    """Drive 파일 메타데이터의 압축 표현입니다.
+
+    API 응답 dict(키 문자열 + 값 문자열 여러 개)를 그대로 들고 있으면 항목당
+    수백 바이트~수 KB가 들기 때문에, 필요한 필드만 __slots__ 로 보관합니다.
+    크기는 정수로, MIME 타입은 intern 된 공유 문자열로 저장합니다.
+    """
+
+    __slots__ = ('id', 'size', 'md5', 'modified_time', 'mime_type', 'version')
+
+    def __init__(
+        self,
+        file_id,
+        size=None,
+        md5=None,
+        modified_time=None,
+        mime_type=None,
+        version=None,
+    ):
+        self.id = file_id
+        self.size = _normalize_size(size)
+        self.md5 = md5
+        self.modified_time = modified_time
+        self.mime_type = sys.intern(mime_type) if mime_type else mime_type
+        self.version = version
+
+    @classmethod
+    def from_api(cls, item):
+        """Drive API files 리소스 dict에서 레코드를 만듭니다."""
+        return cls(
+            item['id'],
+            size=item.get('size'),
+            md5=item.get('md5Checksum'),
+            modified_time=item.get('modifiedTime'),
+            mime_type=item.get('mimeType'),
+            version=item.get('version'),
+        )
+
+
+class LocalFileRecord:
+    """로컬 파일 메타데이터의 압축 표현입니다.
+
+    항목마다 Path 객체를 두지 않고, 실제 경로는 필요할 때
+    sync_dir / 상대 경로로 만듭니다.
+    """
+
+    __slots__ = ('size', 'modified', 'mtime_ns', 'md5', 'fingerprint')
+
+    def __init__(self, size, modified, mtime_ns=None, md5=None, fingerprint=None):
+        self.size = size
+        self.modified = modified
+        self.mtime_ns = mtime_ns
+        self.md5 = md5
+        self.fingerprint = fingerprint
+
+
 def validate_drive_folder(service, folder_id):
     """입력한 Drive ID가 실제 동기화 가능한 폴더인지 검증합니다.
 
@@ -79,12 +878,15 @@ def validate_drive_folder(service, folder_id):
         service: Google Drive API 서비스 객체.
         folder_id (str): 사용자가 입력한 Drive 폴더 ID.
 
+    Returns:
+        dict: 폴더 메타데이터 (공유 드라이브면 driveId 포함).
+
     Raises:
         ValueError: 폴더가 아니거나 휴지통 항목인 경우.
     """
     item = service.files().get(
         fileId=folder_id,
-        fields='id, name, mimeType, trashed',
+        fields='id, name, mimeType, trashed, driveId',
         supportsAllDrives=True,
     ).execute()
 
@@ -97,53 +899,349 @@ def validate_drive_folder(service, folder_id):
             "입력한 ID가 폴더가 아닙니다. "
             "Drive 폴더 URL(https://drive.google.com/drive/folders/...)의 ID를 사용하세요."
         )
+    return item
+
+
+def _compile_globs(patterns):
+    """글롭 패턴 목록을 하나의 정규식으로 컴파일합니다.
+
+    Args:
+        patterns (list[str]): fnmatch 형식 글롭 패턴 목록.
+
+    Returns:
+        re.Pattern | None: 패턴이 없으면 None.
+    """
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{glob_to_regex(pattern)})' for pattern in patterns))
+
+
+class ShardSpec:
+    """동기화 작업을 N개로 나눈 것 중 하나(--shard i/N)를 나타냅니다.
+
+    - subtree: 최상위 항목 이름의 CRC32로 분배합니다. 최상위 폴더 하나가 통째로 한
+      샤드에 속하므로 다른 샤드의 하위 트리는 목록 조회/스캔 자체를 건너뜁니다.
+    - hash: 파일 경로(확장자 제외)의 CRC32로 분배합니다. 큰 폴더 하나에 파일이 몰려 있어도
+      고르게 나뉘지만, 폴더는 모든 샤드가 공유하므로 트리 순회는 줄지 않습니다.
+    """
+
+    __slots__ = ('index', 'count', 'mode')
+
+    def __init__(self, index, count, mode='subtree'):
+        self.index = index
+        self.count = count
+        self.mode = mode
+
+    @classmethod
+    def parse(cls, spec, mode='subtree'):
+        """'i/N' 형식(1 <= i <= N)의 샤드 지정을 해석합니다.
+
+        Args:
+            spec (str): 샤드 지정 문자열 (예: '3/8').
+            mode (str): 분배 방식 (SHARD_MODES).
+
+        Returns:
+            ShardSpec: 해석된 샤드 지정.
+
+        Raises:
+            ValueError: 형식이 잘못되었거나 범위를 벗어난 경우.
+        """
+        index_text, sep, count_text = spec.partition('/')
+        if not sep or not index_text.isdigit() or not count_text.isdigit():
+            raise ValueError(f"샤드 지정은 i/N 형식이어야 합니다: {spec}")
+        index, count = int(index_text), int(count_text)
+        if not 1 <= index <= count:
+            raise ValueError(f"샤드 번호는 1 이상 {count} 이하여야 합니다: {spec}")
+        if mode not in SHARD_MODES:
+            raise ValueError(f"알 수 없는 샤드 분배 방식입니다: {mode}")
+        return cls(index, count, mode)
+
+    @property
+    def name(self):
+        return f"shard-{self.index}-of-{self.count}"
+
+    @property
+    def label(self):
+        return f"{self.index}/{self.count}"
+
+    def owns(self, rel_path, is_dir=False):
+        """경로가 이 샤드에 속하는지 확인합니다.
+
+        Args:
+            rel_path (str): 동기화 루트 기준 상대 경로('/' 구분).
+            is_dir (bool): 폴더 여부.
+
+        Returns:
+            bool: 이 샤드가 처리할 경로이면 True.
+        """
+        if self.mode == 'subtree':
+            key = rel_path.split('/', 1)[0]
+        elif is_dir:
+            return True
+        else:
+            # 확장자를 뺀 경로로 분배해 Google 문서와 그 내보내기 사본(이름.docx)이
+            # 같은 샤드에 속하게 합니다.
+            parent, _, name = rel_path.rpartition('/')
+            key = f"{parent}/{name.split('.', 1)[0]}"
+        return zlib.crc32(key.encode('utf-8')) % self.count == self.index - 1
+
+
+class SyncRules:
+    """선택 동기화 규칙(.syncignore, --include, --exclude)을 컴파일한 매처입니다.
+
+    규칙 문법은 .gitignore를 단순화한 형태입니다.
+    - '/'가 없는 패턴(예: node_modules, *.tmp)은 경로의 모든 단계 이름에 적용됩니다.
+    - '/'가 있는 패턴(예: /build, photos/raw/*)은 동기화 루트 기준 경로 전체에 적용됩니다.
+    - '/'로 끝나는 패턴은 폴더에만 적용됩니다.
+    - .syncignore 에서 '!'로 시작하는 줄은 include 패턴입니다.
+
+    include 패턴이 하나라도 있으면 include 에 맞는 파일만 동기화합니다.
+    샤드가 지정되면 다른 샤드에 속한 경로도 제외 대상으로 취급합니다.
+    제외된 폴더는 하위를 조회하지 않으므로 목록 조회/스캔 비용도 함께 줄어듭니다.
+    """
+
+    def __init__(self, include_patterns=(), exclude_patterns=(), shard=None):
+        # 충돌 백업 폴더와 전송 중인 임시 파일은 항상 동기화 대상에서 제외합니다.
+        exclude_patterns = [f'{BACKUP_DIR_NAME}/', f'*{PARTIAL_FILE_SUFFIX}', *exclude_patterns]
+        self._exclude = self._compile_group(exclude_patterns)
+        self._include = self._compile_group(include_patterns)
+        self.has_includes = bool(include_patterns)
+        self._include_prefixes = self._anchored_prefixes(include_patterns)
+        self.shard = shard
+
+    @staticmethod
+    def _compile_group(patterns):
+        groups = {
+            (anchored, dir_only): []
+            for anchored in (False, True)
+            for dir_only in (False, True)
+        }
+        for pattern in patterns:
+            dir_only = pattern.endswith('/')
+            stripped = pattern.strip('/')
+            if not stripped:
+                continue
+            anchored = pattern.startswith('/') or '/' in stripped
+            groups[(anchored, dir_only)].append(stripped)
+        return {key: _compile_globs(value) for key, value in groups.items()}
+
+    @staticmethod
+    def _anchored_prefixes(patterns):
+        """include 패턴의 글롭 이전 고정 경로 단계를 구합니다.
+
+        '/'가 없는 include 패턴이 있으면 어느 폴더에서나 일치할 수 있으므로
+        None을 반환해 폴더 가지치기를 하지 않습니다.
+        """
+        prefixes = []
+        for pattern in patterns:
+            if not pattern.startswith('/') and '/' not in pattern.strip('/'):
+                return None
+            pattern = pattern.strip('/')
+            literal_parts = []
+            for part in pattern.split('/'):
+                if any(char in part for char in '*?['):
+                    break
+                literal_parts.append(part)
+            prefixes.append(tuple(literal_parts))
+        return prefixes
+
+    @staticmethod
+    def _matches(group, rel_path, is_dir):
+        parts = rel_path.split('/')
+        for (anchored, dir_only), regex in group.items():
+            if regex is None or (dir_only and not is_dir):
+                continue
+            if anchored:
+                if regex.match(rel_path):
+                    return True
+            elif regex.match(parts[-1]):
+                return True
+        return False
+
+    @classmethod
+    def load(cls, sync_dir, include_patterns=None, exclude_patterns=None, shard=None):
+        """sync_dir/.syncignore 와 명령줄 패턴을 합쳐 규칙을 만듭니다.
+
+        Args:
+            sync_dir (Path): 로컬 동기화 루트 경로.
+            include_patterns (list[str] | None): --include 패턴 목록.
+            exclude_patterns (list[str] | None): --exclude 패턴 목록.
+            shard (ShardSpec | None): 이 실행이 맡은 샤드.
+
+        Returns:
+            SyncRules: 컴파일된 규칙.
+        """
+        includes = list(include_patterns or [])
+        excludes = list(exclude_patterns or [])
+        ignore_path = sync_dir / SYNC_IGNORE_FILENAME
+        if ignore_path.is_file():
+            for line in ignore_path.read_text(encoding='utf-8').splitlines():
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                if line.startswith('!'):
+                    includes.append(line[1:])
+                else:
+                    excludes.append(line)
+        return cls(includes, excludes, shard)
+
+    def is_excluded(self, rel_path, is_dir=False):
+        """경로가 동기화 대상에서 제외되는지 확인합니다.
 
+        상위 폴더는 순회 중에 이미 걸러지므로 경로 자신만 검사합니다.
 
-def get_drive_items(service, folder_id):
+        Args:
+            rel_path (str): 동기화 루트 기준 상대 경로('/' 구분).
+            is_dir (bool): 폴더 여부.
+
+        Returns:
+            bool: 제외 대상이면 True.
+        """
+        if self.shard is not None and not self.shard.owns(rel_path, is_dir):
+            return True
+        if self._matches(self._exclude, rel_path, is_dir):
+            return True
+        if not self.has_includes:
+            return False
+        if is_dir:
+            if self._include_prefixes is None:
+                return False
+            parts = tuple(rel_path.split('/'))
+            return not any(
+                parts[:len(prefix)] == prefix[:len(parts)]
+                for prefix in self._include_prefixes
+            )
+        # include 패턴에 맞는 폴더 아래의 파일은 모두 포함합니다.
+        parts = rel_path.split('/')
+        for depth in range(1, len(parts)):
+            if self._matches(self._include, '/'.join(parts[:depth]), True):
+                return False
+        return not self._matches(self._include, rel_path, is_dir)
+
+
+def get_drive_items(
+    service,
+    folder_id,
+    rules=None,
+    workspace_files=None,
+    folder_ids=None,
+    limiter=None,
+    service_factory=None,
+):
     """Drive 폴더의 파일/폴더 목록을 재귀적으로 가져옵니다.
 
+    limiter 와 service_factory 를 주면 하위 폴더들을 스레드 풀에서 병렬로 조회하며,
+    동시 요청 수는 limiter 가 지연 시간/할당량 초과에 따라 조정합니다.
+
     Args:
         service: Google Drive API 서비스 객체.
         folder_id (str): 동기화할 Drive 폴더 ID.
+        rules (SyncRules | None): 선택 동기화 규칙. 제외된 폴더는 조회하지 않습니다.
+        workspace_files (dict[str, DriveFileRecord] | None): 주어지면 내보내기 가능한
+            Google Docs/Sheets/Slides 항목을 건너뛰지 않고 여기에 모읍니다.
+        folder_ids (dict[str, str] | None): 주어지면 폴더 상대 경로별 Drive ID를 채웁니다.
+        limiter (AdaptiveConcurrency | None): 목록 조회 동시 실행 수 제어기.
+        service_factory (Callable[[], Any] | None): 작업자 스레드별 서비스 객체 생성 함수.
 
     Returns:
-        tuple[dict[str, dict], set[str]]: (파일 메타데이터 맵, 폴더 상대경로 집합).
+        tuple[dict[str, DriveFileRecord], set[str]]: (파일 메타데이터 맵, 폴더 상대경로 집합).
+            경로 문자열은 intern 되어 로컬 스캔 결과와 같은 객체를 공유합니다.
     """
+    rules = rules or SyncRules()
     files = {}
     folders: Set[str] = set()
+    thread_state = threading.local()
+
+    def _service():
+        if service_factory is None:
+            return service
+        if getattr(thread_state, 'service', None) is None:
+            thread_state.service = service_factory()
+        return thread_state.service
 
-    def _walk(parent_id, prefix=''):
+    def _list_children(parent_id):
+        items = []
         page_token = None
         while True:
-            query = f"'{parent_id}' in parents and trashed=false"
-            results = service.files().list(
-                q=query,
-                fields='nextPageToken, files(id, name, size, md5Checksum, modifiedTime, mimeType)',
+            request = _service().files().list(
+                q=f"'{parent_id}' in parents and trashed=false",
+                fields=(
+                    'nextPageToken, '
+                    'files(id, name, size, md5Checksum, modifiedTime, mimeType, version)'
+                ),
                 supportsAllDrives=True,
                 includeItemsFromAllDrives=True,
                 pageToken=page_token,
-            ).execute()
-            for item in results.get('files', []):
-                mime_type = item.get('mimeType', '')
-                item_name = item['name']
-                rel_name = f"{prefix}/{item_name}" if prefix else item_name
-                if mime_type == FOLDER_MIME_TYPE:
-                    folders.add(rel_name)
-                    _walk(item['id'], rel_name)
-                    continue
-                if mime_type.startswith(GOOGLE_APPS_MIME_PREFIX):
-                    # Google Docs/Sheets/Slides는 get_media 다운로드가 불가하여 현재 스코프에서 제외.
-                    print(f"Skipping non-binary Google file: {rel_name} ({mime_type})")
-                    continue
-                files[rel_name] = item
+            )
+            results = _execute(request, limiter)
+            items.extend(results.get('files', []))
             page_token = results.get('nextPageToken')
             if not page_token:
-                break
-
-    _walk(folder_id)
+                return items
+
+    def _add_items(items, prefix):
+        subfolders = []
+        for item in items:
+            mime_type = item.get('mimeType', '')
+            item_name = item['name']
+            rel_name = sys.intern(f"{prefix}/{item_name}" if prefix else item_name)
+            is_folder = mime_type == FOLDER_MIME_TYPE
+            if rules.is_excluded(rel_name, is_dir=is_folder):
+                continue
+            if is_folder:
+                folders.add(rel_name)
+                if folder_ids is not None:
+                    folder_ids[rel_name] = item['id']
+                subfolders.append((item['id'], rel_name))
+                continue
+            if mime_type.startswith(GOOGLE_APPS_MIME_PREFIX):
+                if workspace_files is not None and mime_type in GOOGLE_WORKSPACE_KINDS:
+                    workspace_files[rel_name] = DriveFileRecord.from_api(item)
+                    continue
+                # Google Docs/Sheets/Slides는 get_media 다운로드가 불가하여 내보내기를 켠 경우만 동기화.
+                print(f"Skipping non-binary Google file: {rel_name} ({mime_type})")
+                continue
+            files[rel_name] = DriveFileRecord.from_api(item)
+        return subfolders
+
+    if limiter is None or service_factory is None:
+        stack = [(folder_id, '')]
+        while stack:
+            parent_id, prefix = stack.pop()
+            stack.extend(reversed(_add_items(_list_children(parent_id), prefix)))
+        return files, folders
+
+    # 결과 처리는 이 스레드에서만 하므로 files/folders 에 잠금이 필요 없습니다.
+    pool = ThreadPoolExecutor(max_workers=limiter.max_limit, thread_name_prefix='list')
+    pending = {pool.submit(_list_children, folder_id): ''}
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                prefix = pending.pop(future)
+                for sub_id, sub_prefix in _add_items(future.result(), prefix):
+                    pending[pool.submit(_list_children, sub_id)] = sub_prefix
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
     return files, folders
 
 
+def _execute(request, limiter=None):
+    """Drive API 요청을 실행합니다.
+
+    limiter 가 있으면 동시 실행 수 제한 안에서 실행하고, 할당량 초과 응답은
+    limiter 가 동시 실행 수를 줄이고 백오프한 뒤 재시도합니다.
+
+    Args:
+        request: execute() 를 가진 Drive API 요청 객체.
+        limiter (AdaptiveConcurrency | None): 동시 실행 수 제어기.
+
+    Returns:
+        dict: API 응답.
+    """
+    return request.execute() if limiter is None else limiter.call(request.execute)
+
+
 def _escape_drive_query_value(value):
     """Drive 쿼리 문자열 값을 이스케이프합니다.
 
@@ -156,14 +1254,44 @@ def _escape_drive_query_value(value):
     return value.replace("\\", "\\\\").replace("'", "\\'")
 
 
-def get_or_create_drive_folder(service, parent_id, folder_name, folder_cache):
+def _list_drive_folders_named(service, parent_id, folder_name, limiter=None):
+    """부모 폴더 아래에서 이름이 같은 (휴지통에 없는) 폴더를 모두 조회합니다."""
+    escaped_name = _escape_drive_query_value(folder_name)
+    query = (
+        f"'{parent_id}' in parents and trashed=false and "
+        f"mimeType='{FOLDER_MIME_TYPE}' and name='{escaped_name}'"
+    )
+    request = service.files().list(
+        q=query,
+        fields='files(id, name, createdTime)',
+        supportsAllDrives=True,
+        includeItemsFromAllDrives=True,
+        pageSize=100,
+    )
+    return _execute(request, limiter).get('files', [])
+
+
+def _pick_canonical_folder(items):
+    """같은 이름의 폴더 중 모든 작업자가 똑같이 고르는 대표 폴더 ID를 반환합니다.
+
+    가장 먼저 만들어진 폴더(createdTime, 같으면 ID 순)를 고릅니다.
+    """
+    return min((item.get('createdTime') or '', item['id']) for item in items)[1]
+
+
+def get_or_create_drive_folder(service, parent_id, folder_name, folder_cache, limiter=None):
     """Drive 부모 폴더 아래에 하위 폴더를 조회하거나 생성합니다.
 
+    여러 샤드/호스트가 같은 폴더를 동시에 만들 수 있으므로 생성 후 다시 조회해
+    같은 이름의 폴더가 여럿이면 대표 폴더 하나로 정리합니다 (create-then-reconcile).
+    대표가 아닌 폴더를 만든 작업자가 자신의 폴더를 휴지통으로 옮깁니다.
+
     Args:
         service: Google Drive API 서비스 객체.
         parent_id (str): 부모 폴더 ID.
         folder_name (str): 생성/조회할 하위 폴더 이름.
         folder_cache (dict[tuple[str, str], str]): 폴더 조회 캐시.
+        limiter (AdaptiveConcurrency | None): 조회/생성 요청의 동시 실행 수 제어기.
 
     Returns:
         str: 하위 폴더 ID.
@@ -173,21 +1301,9 @@ def get_or_create_drive_folder(service, parent_id, folder_name, folder_cache):
     if cached_id:
         return cached_id
 
-    escaped_name = _escape_drive_query_value(folder_name)
-    query = (
-        f"'{parent_id}' in parents and trashed=false and "
-        f"mimeType='{FOLDER_MIME_TYPE}' and name='{escaped_name}'"
-    )
-    results = service.files().list(
-        q=query,
-        fields='files(id, name)',
-        supportsAllDrives=True,
-        includeItemsFromAllDrives=True,
-        pageSize=1,
-    ).execute()
-    items = results.get('files', [])
+    items = _list_drive_folders_named(service, parent_id, folder_name, limiter)
     if items:
-        folder_id = items[0]['id']
+        folder_id = _pick_canonical_folder(items)
         folder_cache[cache_key] = folder_id
         return folder_id
 
@@ -196,17 +1312,37 @@ def get_or_create_drive_folder(service, parent_id, folder_name, folder_cache):
         'mimeType': FOLDER_MIME_TYPE,
         'parents': [parent_id],
     }
-    folder_id = service.files().create(
-        body=metadata,
-        fields='id',
-        supportsAllDrives=True,
-    ).execute()['id']
-    folder_cache[cache_key] = folder_id
+    created = _execute(
+        service.files().create(
+            body=metadata,
+            fields='id, createdTime',
+            supportsAllDrives=True,
+        ),
+        limiter,
+    )
+    folder_id = created['id']
     print(f"Created Drive folder: {folder_name}")
+
+    items = _list_drive_folders_named(service, parent_id, folder_name, limiter)
+    if not any(item['id'] == folder_id for item in items):
+        items.append(created)
+    canonical_id = _pick_canonical_folder(items)
+    if canonical_id != folder_id:
+        _execute(
+            service.files().update(
+                fileId=folder_id,
+                body={'trashed': True},
+                supportsAllDrives=True,
+            ),
+            limiter,
+        )
+        print(f"Reconciled concurrently created Drive folder: {folder_name}")
+        folder_id = canonical_id
+    folder_cache[cache_key] = folder_id
     return folder_id
 
 
-def ensure_drive_parent_folder(service, root_folder_id, rel_path, folder_cache):
+def ensure_drive_parent_folder(service, root_folder_id, rel_path, folder_cache, limiter=None):
     """상대 경로의 부모 폴더 트리를 Drive에 보장하고 최종 부모 ID를 반환합니다.
 
     Args:
@@ -214,6 +1350,7 @@ def ensure_drive_parent_folder(service, root_folder_id, rel_path, folder_cache):
         root_folder_id (str): 동기화 루트 Drive 폴더 ID.
         rel_path (str): 상대 파일 경로.
         folder_cache (dict[tuple[str, str], str]): 폴더 조회 캐시.
+        limiter (AdaptiveConcurrency | None): 조회/생성 요청의 동시 실행 수 제어기.
 
     Returns:
         str: 해당 파일이 업로드될 Drive 부모 폴더 ID.
@@ -224,18 +1361,50 @@ def ensure_drive_parent_folder(service, root_folder_id, rel_path, folder_cache):
         return parent_id
 
     for folder_name in rel_parent.parts:
-        parent_id = get_or_create_drive_folder(service, parent_id, folder_name, folder_cache)
+        parent_id = get_or_create_drive_folder(
+            service, parent_id, folder_name, folder_cache, limiter
+        )
     return parent_id
 
 
-def ensure_drive_folder_path(service, root_folder_id, rel_folder_path, folder_cache):
-    """상대 폴더 경로가 Drive에 존재하도록 보장합니다.
+def find_drive_parent_folder(service, root_folder_id, rel_path, folder_cache, limiter=None):
+    """상대 경로의 부모 폴더를 Drive에서 조회만 하고 ID를 반환합니다.
+
+    ensure_drive_parent_folder 와 달리 없는 폴더를 만들지 않습니다.
 
     Args:
         service: Google Drive API 서비스 객체.
         root_folder_id (str): 동기화 루트 Drive 폴더 ID.
-        rel_folder_path (str): 동기화 루트 기준 상대 폴더 경로.
-        folder_cache (dict[tuple[str, str], str]): 폴더 조회 캐시.
+        rel_path (str): 상대 파일 경로.
+        folder_cache (dict[tuple[str, str], str]): 폴더 조회 캐시. 찾은 폴더를 채웁니다.
+        limiter (AdaptiveConcurrency | None): 조회 요청의 동시 실행 수 제어기.
+
+    Returns:
+        str | None: 부모 폴더 ID. 경로 중간 폴더가 Drive에 없으면 None.
+    """
+    parent_id = root_folder_id
+    for folder_name in rel_path.split('/')[:-1]:
+        cache_key = (parent_id, folder_name)
+        folder_id = folder_cache.get(cache_key)
+        if folder_id is None:
+            items = _list_drive_folders_named(service, parent_id, folder_name, limiter)
+            if not items:
+                return None
+            folder_id = _pick_canonical_folder(items)
+            folder_cache[cache_key] = folder_id
+        parent_id = folder_id
+    return parent_id
+
+
+def ensure_drive_folder_path(service, root_folder_id, rel_folder_path, folder_cache, limiter=None):
+    """상대 폴더 경로가 Drive에 존재하도록 보장합니다.
+
+    Args:
+        service: Google Drive API 서비스 객체.
+        root_folder_id (str): 동기화 루트 Drive 폴더 ID.
+        rel_folder_path (str): 동기화 루트 기준 상대 폴더 경로.
+        folder_cache (dict[tuple[str, str], str]): 폴더 조회 캐시.
+        limiter (AdaptiveConcurrency | None): 조회/생성 요청의 동시 실행 수 제어기.
 
     Returns:
         str: 최종 폴더 ID.
@@ -246,445 +1415,3069 @@ def ensure_drive_folder_path(service, root_folder_id, rel_folder_path, folder_ca
         return parent_id
 
     for folder_name in rel_path_obj.parts:
-        parent_id = get_or_create_drive_folder(service, parent_id, folder_name, folder_cache)
+        parent_id = get_or_create_drive_folder(
+            service, parent_id, folder_name, folder_cache, limiter
+        )
     return parent_id
 
 
-def get_local_files(sync_dir):
-    """로컬 동기화 폴더의 파일 메타데이터 목록을 수집합니다.
+def filter_by_rules(rules, files, folders, known_folders=()):
+    """목록에 현재 선택 동기화 규칙을 적용합니다. 제외된 폴더의 하위 항목도 뺍니다.
 
     Args:
-        sync_dir (Path): 로컬 동기화 루트 경로.
+        rules (SyncRules): 선택 동기화 규칙.
+        files (dict[str, DriveFileRecord]): 상대 경로 기준 파일 메타데이터.
+        folders (set[str]): 상대 경로 기준 폴더 집합.
+        known_folders (Container[str]): 이미 포함된 것으로 보는 상위 폴더.
 
     Returns:
-        dict[str, dict]: 상대 경로 기준 로컬 파일 메타데이터.
+        tuple[dict[str, DriveFileRecord], set[str]]: 규칙에 맞는 (파일, 폴더).
     """
-    files = {}
-    for path in sync_dir.rglob('*'):
-        if path.is_file():
-            rel_path = path.relative_to(sync_dir)
-            if BACKUP_DIR_NAME in rel_path.parts:
-                continue
-            file_stat = path.stat()
-            md5_hash = hashlib.md5(path.read_bytes()).hexdigest()
-            files[str(rel_path)] = {
-                'path': path,
-                'md5': md5_hash,
-                'modified': file_stat.st_mtime,
-                'size': file_stat.st_size,
-            }
-    return files
+    kept_folders: Set[str] = set()
+
+    def _parent_kept(rel_path):
+        parent = _parent_dir_key(rel_path)
+        return parent == '' or parent in kept_folders or parent in known_folders
+
+    for folder in sorted(folders, key=path_sort_key):
+        if _parent_kept(folder) and not rules.is_excluded(folder, is_dir=True):
+            kept_folders.add(folder)
+    kept_files = {
+        path: record
+        for path, record in files.items()
+        if _parent_kept(path) and not rules.is_excluded(path)
+    }
+    return kept_files, kept_folders
 
 
-def get_local_directories(sync_dir):
-    """로컬 동기화 폴더 하위의 상대 디렉터리 목록을 수집합니다.
+def find_foreign_name_conflicts(shard, sync_dir, drive_folders, local_folders):
+    """해시 샤드에서 다른 샤드가 처리할 파일/폴더 이름 충돌 경로를 찾습니다.
+
+    해시 분배에서는 폴더가 모든 샤드에 속하지만 파일은 한 샤드에만 속합니다.
+    Drive 폴더와 같은 이름의 로컬 파일이 있으면 그 파일을 가진 샤드만 충돌을
+    처리하고(로컬 파일 백업 후 폴더 생성), 나머지 샤드는 이번 실행에서 그 하위
+    트리를 건너뛰어야 같은 경로에 폴더를 만들다 실패하지 않습니다.
 
     Args:
+        shard (ShardSpec | None): 샤드 지정.
         sync_dir (Path): 로컬 동기화 루트 경로.
+        drive_folders (set[str]): Drive 폴더 경로 집합.
+        local_folders (set[str]): 로컬 폴더 경로 집합.
 
     Returns:
-        set[str]: 동기화 루트 기준 상대 폴더 경로 집합.
+        set[str]: 이번 실행에서 건너뛸 Drive 폴더 경로 집합.
     """
-    folders: Set[str] = set()
-    for path in sync_dir.rglob('*'):
-        if path.is_dir():
-            rel_path = path.relative_to(sync_dir)
-            if str(rel_path) == '.' or BACKUP_DIR_NAME in rel_path.parts:
-                continue
-            folders.add(str(rel_path))
-    return folders
+    if shard is None or shard.mode != 'hash':
+        return set()
+    return {
+        folder
+        for folder in drive_folders - local_folders
+        if not shard.owns(folder) and (sync_dir / folder).is_file()
+    }
 
 
-def build_tree_markdown(title, files, folders):
-    """파일/폴더 목록으로 Markdown 트리를 만듭니다.
+def drop_subtrees(files, folders, roots):
+    """roots 폴더와 그 하위 항목을 뺀 (파일, 폴더) 목록 사본을 반환합니다.
 
     Args:
-        title (str): Markdown 문서 제목.
-        files (dict[str, dict]): 상대 경로 기준 파일 메타데이터.
+        files (dict[str, DriveFileRecord | LocalFileRecord]): 상대 경로 기준 파일 메타데이터.
         folders (set[str]): 상대 경로 기준 폴더 집합.
+        roots (set[str]): 뺄 폴더 경로 집합. ''(루트)가 있으면 전체를 뺍니다.
 
     Returns:
-        str: Markdown 형식 트리 문자열.
+        tuple[dict, set[str]]: roots 하위가 빠진 (파일, 폴더).
     """
-    tree = {'dirs': {}, 'files': []}
-
-    def _ensure_dir(root, parts):
-        node = root
-        for part in parts:
-            node = node['dirs'].setdefault(part, {'dirs': {}, 'files': []})
-        return node
-
-    for folder in sorted(folders):
-        parts = Path(folder).parts
-        _ensure_dir(tree, parts)
+    if not roots:
+        return files, folders
+    if '' in roots:
+        return {}, set()
+    prefixes = tuple(f"{root}/" for root in roots)
+    return (
+        {path: record for path, record in files.items() if not path.startswith(prefixes)},
+        {
+            folder
+            for folder in folders
+            if folder not in roots and not folder.startswith(prefixes)
+        },
+    )
 
-    for rel_path, meta in sorted(files.items()):
-        parts = Path(rel_path).parts
-        parent = _ensure_dir(tree, parts[:-1])
-        parent['files'].append((parts[-1], meta.get('size')))
 
-    lines = [f'# {title}', '']
+def get_changes_start_page_token(service, drive_id=None):
+    """이후 변경 사항을 받아올 Changes API 시작 토큰을 조회합니다.
 
-    def _render(node, depth):
-        indent = '  ' * depth
-        for dirname in sorted(node['dirs']):
-            lines.append(f"{indent}- [D] {dirname}/")
-            _render(node['dirs'][dirname], depth + 1)
-        for filename, size in sorted(node['files'], key=lambda item: item[0]):
-            size_text = size if size is not None else '?'
-            lines.append(f"{indent}- [F] {filename} (size: {size_text})")
+    Args:
+        service: Google Drive API 서비스 객체.
+        drive_id (str | None): 공유 드라이브 ID. 내 드라이브면 None.
 
-    _render(tree, 0)
-    if len(lines) == 2:
-        lines.append('- (empty)')
-    lines.append('')
-    return '\n'.join(lines)
+    Returns:
+        str: 시작 페이지 토큰.
+    """
+    params = {'supportsAllDrives': True}
+    if drive_id:
+        params['driveId'] = drive_id
+    return service.changes().getStartPageToken(**params).execute()['startPageToken']
 
 
-def export_tree_markdown(output_path, title, files, folders):
-    """파일/폴더 트리를 Markdown 파일로 저장합니다.
+def resolve_folder_ids(root_folder_id, folders, known_ids, folder_cache):
+    """폴더 경로별 Drive ID를 목록 조회 결과와 폴더 생성 캐시에서 구합니다.
 
     Args:
-        output_path (Path): 저장할 Markdown 파일 경로.
-        title (str): Markdown 문서 제목.
-        files (dict[str, dict]): 상대 경로 기준 파일 메타데이터.
-        folders (set[str]): 상대 경로 기준 폴더 집합.
+        root_folder_id (str): 동기화 루트 Drive 폴더 ID.
+        folders (Iterable[str]): 상대 폴더 경로.
+        known_ids (dict[str, str]): 목록 조회로 알게 된 폴더 경로별 ID.
+        folder_cache (dict[tuple[str, str], str]): (부모 ID, 이름) 기준 폴더 생성/조회 캐시.
+
+    Returns:
+        dict[str, str | None]: 폴더 경로별 ID. 알 수 없으면 None.
+    """
+    folder_ids = {'': root_folder_id}
+    for folder in sorted(folders, key=path_sort_key):
+        folder_id = known_ids.get(folder)
+        if folder_id is None:
+            parent_id = folder_ids.get(_parent_dir_key(folder))
+            folder_id = folder_cache.get((parent_id, folder.rsplit('/', 1)[-1]))
+        folder_ids[folder] = folder_id
+    del folder_ids['']
+    return folder_ids
+
+
+class DriveSnapshot:
+    """Drive 목록(경로, ID, 부모, 크기, MD5, 수정 시각, MIME)을 SQLite 파일로 보관합니다.
+
+    동기화/검증 실행이 끝날 때마다 저장하며, --from-snapshot 은 네트워크 없이
+    이 파일로 트리 출력, 변경 미리보기, 검증 리포트를 만듭니다. 저장 시점의
+    Changes API 토큰을 함께 보관하므로 refresh 로 바뀐 항목만 반영할 수 있습니다.
     """
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    content = build_tree_markdown(title, files, folders)
-    output_path.write_text(content, encoding='utf-8')
-    print(f"Tree exported: {output_path}")
 
+    SCHEMA = (
+        'CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)',
+        'CREATE TABLE items ('
+        'path TEXT NOT NULL, id TEXT, parent TEXT, is_folder INTEGER NOT NULL, '
+        'size INTEGER, md5 TEXT, modified_time TEXT, mime_type TEXT, version TEXT, '
+        # Drive는 같은 이름의 파일과 폴더를 함께 둘 수 있습니다.
+        'PRIMARY KEY (path, is_folder)'
+        ') WITHOUT ROWID',
+    )
 
-def export_drive_tree_markdown(output_path, files, folders):
-    """Drive 파일/폴더 트리를 Markdown 파일로 저장합니다.
+    def __init__(self, path):
+        self.path = path
 
-    Args:
-        output_path (Path): 저장할 Markdown 파일 경로.
-        files (dict[str, dict]): 상대 경로 기준 Drive 파일 메타데이터.
-        folders (set[str]): 상대 경로 기준 Drive 폴더 집합.
-    """
-    export_tree_markdown(output_path, 'Google Drive Tree', files, folders)
+    def exists(self):
+        return self.path.exists()
 
+    def save(self, meta, files, folders, folder_ids):
+        """스냅샷을 임시 파일에 쓴 뒤 교체해 원자적으로 저장합니다.
 
-def export_local_tree_markdown(output_path, files, folders):
-    """로컬 파일/폴더 트리를 Markdown 파일로 저장합니다.
+        Args:
+            meta (dict[str, str | None]): drive_folder_id, drive_id, start_page_token 등.
+            files (dict[str, DriveFileRecord]): 상대 경로 기준 Drive 파일 메타데이터.
+            folders (set[str]): 상대 경로 기준 Drive 폴더 집합.
+            folder_ids (dict[str, str | None]): 폴더 경로별 Drive ID.
+        """
+        root_folder_id = meta['drive_folder_id']
 
-    Args:
-        output_path (Path): 저장할 Markdown 파일 경로.
-        files (dict[str, dict]): 상대 경로 기준 로컬 파일 메타데이터.
-        folders (set[str]): 상대 경로 기준 로컬 폴더 집합.
-    """
-    export_tree_markdown(output_path, 'Local Tree', files, folders)
+        def _parent_id(rel_path):
+            parent = _parent_dir_key(rel_path)
+            return root_folder_id if parent == '' else folder_ids.get(parent)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = partial_file_path(self.path)
+        tmp_path.unlink(missing_ok=True)
+        connection = sqlite3.connect(tmp_path)
+        try:
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+            connection.executemany(
+                'INSERT INTO meta VALUES (?, ?)',
+                [(key, value) for key, value in meta.items()]
+                + [('updated', datetime.now().isoformat(timespec='seconds'))],
+            )
+            connection.executemany(
+                'INSERT INTO items VALUES (?, ?, ?, 1, NULL, NULL, NULL, ?, NULL)',
+                (
+                    (folder, folder_ids.get(folder), _parent_id(folder), FOLDER_MIME_TYPE)
+                    for folder in folders
+                ),
+            )
+            connection.executemany(
+                'INSERT INTO items VALUES (?, ?, ?, 0, ?, ?, ?, ?, ?)',
+                (
+                    (
+                        path,
+                        record.id,
+                        _parent_id(path),
+                        record.size,
+                        record.md5,
+                        record.modified_time,
+                        record.mime_type,
+                        record.version,
+                    )
+                    for path, record in files.items()
+                ),
+            )
+            connection.commit()
+        finally:
+            connection.close()
+        os.replace(tmp_path, self.path)
 
+    def load(self):
+        """스냅샷을 읽습니다.
 
-def _normalize_size(value):
-    """파일 크기 값을 정수로 정규화합니다.
+        Returns:
+            tuple[dict[str, str], dict[str, DriveFileRecord], set[str], dict[str, str | None]]:
+                (메타 정보, 파일 메타데이터, 폴더 집합, 폴더 경로별 ID).
+        """
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            meta = dict(connection.execute('SELECT key, value FROM meta'))
+            files = {}
+            folders: Set[str] = set()
+            folder_ids = {}
+            rows = connection.execute(
+                'SELECT path, id, is_folder, size, md5, modified_time, mime_type, version '
+                'FROM items'
+            )
+            for path, item_id, is_folder, size, md5, modified_time, mime_type, version in rows:
+                path = sys.intern(path)
+                if is_folder:
+                    folders.add(path)
+                    folder_ids[path] = item_id
+                else:
+                    files[path] = DriveFileRecord(
+                        item_id,
+                        size=size,
+                        md5=md5,
+                        modified_time=modified_time,
+                        mime_type=mime_type,
+                        version=version,
+                    )
+        finally:
+            connection.close()
+        return meta, files, folders, folder_ids
+
+
+def refresh_drive_snapshot(service, snapshot, rules=None, limiter=None, service_factory=None):
+    """Changes API로 마지막 저장 이후 바뀐 항목만 스냅샷에 반영합니다.
+
+    삭제/휴지통 이동은 항목(폴더면 하위 트리)을 지우고, 이름 변경/이동은 경로를
+    고칩니다. 스냅샷 저장 뒤에 만든 폴더는 내용도 모두 변경 목록에 나오므로 변경
+    레코드만으로 추가하고, 그 전부터 있던 폴더가 동기화 루트 밖에서 들어온 경우에만
+    하위 트리를 새로 조회합니다. 부모 폴더보다 먼저 나온 항목은 부모가 추가될 때 반영합니다.
 
     Args:
-        value: 정수 또는 문자열 형태 크기.
+        service: Google Drive API 서비스 객체.
+        snapshot (DriveSnapshot): 갱신할 스냅샷.
+        rules (SyncRules | None): 선택 동기화 규칙.
+        limiter (AdaptiveConcurrency | None): 변경/목록 조회 동시 실행 수 제어기.
+        service_factory (Callable[[], Any] | None): 하위 트리 재조회용 스레드별 서비스 생성 함수.
 
     Returns:
-        int | None: 변환된 파일 크기. 변환 불가 시 None.
+        int: 반영한 변경 수.
     """
-    if value is None:
-        return None
-    try:
-        return int(value)
-    except (TypeError, ValueError):
-        return None
+    rules = rules or SyncRules()
+    meta, files, folders, folder_ids = snapshot.load()
+    root_folder_id = meta['drive_folder_id']
+    drive_id = meta.get('drive_id') or None
+    folder_path_by_id = {folder_id: path for path, folder_id in folder_ids.items() if folder_id}
+    folder_path_by_id[root_folder_id] = ''
+    file_path_by_id = {record.id: path for path, record in files.items()}
+    created_after = None
+    if meta.get('updated'):
+        created_after = (
+            datetime.fromisoformat(meta['updated']).astimezone(timezone.utc) + SNAPSHOT_CLOCK_SKEW
+        )
+    # 아직 경로를 모르는 부모 ID → {항목 ID: 변경}, 항목 ID → 기다리는 부모 ID 목록
+    waiting: Dict[str, Dict[str, dict]] = {}
+    waiting_parents: Dict[str, list] = {}
+
+    def _created_after_snapshot(item):
+        created = item.get('createdTime')
+        if created_after is None or not created:
+            return False
+        return datetime.fromisoformat(created.replace('Z', '+00:00')) > created_after
+
+    def _remove_subtree(old_path):
+        prefix = f"{old_path}/"
+        for path in [p for p in folders if p == old_path or p.startswith(prefix)]:
+            folders.discard(path)
+            folder_path_by_id.pop(folder_ids.pop(path, None), None)
+        for path in [p for p in files if p.startswith(prefix)]:
+            file_path_by_id.pop(files.pop(path).id, None)
+
+    def _move_subtree(old_path, new_path):
+        prefix = f"{old_path}/"
+
+        def _renamed(path):
+            return sys.intern(new_path + path[len(old_path):])
+
+        for path in [p for p in folders if p == old_path or p.startswith(prefix)]:
+            folders.discard(path)
+            folder_id = folder_ids.pop(path, None)
+            folders.add(_renamed(path))
+            folder_ids[_renamed(path)] = folder_id
+            if folder_id:
+                folder_path_by_id[folder_id] = _renamed(path)
+        for path in [p for p in files if p.startswith(prefix)]:
+            record = files.pop(path)
+            files[_renamed(path)] = record
+            file_path_by_id[record.id] = _renamed(path)
+
+    def _add_folder(folder_path, folder_id):
+        folders.add(folder_path)
+        folder_ids[folder_path] = folder_id
+        folder_path_by_id[folder_id] = folder_path
+        for child_id, change in waiting.pop(folder_id, {}).items():
+            waiting_parents.pop(child_id, None)
+            _apply(change)
+
+    def _add_subtree(folder_path, folder_id):
+        sub_ids: Dict[str, str] = {}
+        sub_files, sub_folders = get_drive_items(
+            service,
+            folder_id,
+            folder_ids=sub_ids,
+            limiter=limiter,
+            service_factory=service_factory,
+        )
+        sub_files, sub_folders = filter_by_rules(
+            rules,
+            {f"{folder_path}/{path}": record for path, record in sub_files.items()},
+            {folder_path, *(f"{folder_path}/{path}" for path in sub_folders)},
+            known_folders=folders,
+        )
+        for path in sub_folders:
+            folders.add(sys.intern(path))
+            sub_id = folder_id if path == folder_path else sub_ids[path[len(folder_path) + 1:]]
+            folder_ids[path] = sub_id
+            folder_path_by_id[sub_id] = path
+            # 방금 조회한 목록이 더 최신이므로 이 폴더를 기다리던 변경은 버립니다.
+            for child_id in waiting.pop(sub_id, {}):
+                waiting_parents.pop(child_id, None)
+        for path, record in sub_files.items():
+            files[sys.intern(path)] = record
+            file_path_by_id[record.id] = path
+
+    def _apply(change):
+        file_id = change.get('fileId')
+        item = change.get('file')
+        for parent in waiting_parents.pop(file_id, ()):
+            waiting.get(parent, {}).pop(file_id, None)
+        old_folder_path = folder_path_by_id.get(file_id)
+        old_file_path = file_path_by_id.pop(file_id, None)
+        if old_file_path is not None:
+            files.pop(old_file_path, None)
+
+        new_path = None
+        if not change.get('removed') and item is not None and not item.get('trashed'):
+            parent_path = next(
+                (
+                    folder_path_by_id[parent]
+                    for parent in item.get('parents') or []
+                    if parent in folder_path_by_id
+                ),
+                None,
+            )
+            if parent_path is not None:
+                name = item['name']
+                new_path = sys.intern(f"{parent_path}/{name}" if parent_path else name)
+            else:
+                # 부모가 이번 갱신에서 나중에 추가될 수 있으므로 그때 다시 적용합니다.
+                waiting_parents[file_id] = list(item.get('parents') or [])
+                for parent in waiting_parents[file_id]:
+                    waiting.setdefault(parent, {})[file_id] = change
+        is_folder = item is not None and item.get('mimeType') == FOLDER_MIME_TYPE
+        if new_path is not None and rules.is_excluded(new_path, is_dir=is_folder):
+            new_path = None
+
+        if old_folder_path is not None and old_folder_path != '':
+            if new_path is None:
+                _remove_subtree(old_folder_path)
+            elif new_path != old_folder_path:
+                _move_subtree(old_folder_path, new_path)
+            return
+        if new_path is None:
+            return
+        if is_folder and _created_after_snapshot(item):
+            _add_folder(new_path, file_id)
+        elif is_folder:
+            _add_subtree(new_path, file_id)
+        elif not item.get('mimeType', '').startswith(GOOGLE_APPS_MIME_PREFIX):
+            files[new_path] = DriveFileRecord.from_api(item)
+            file_path_by_id[file_id] = new_path
+
+    params = {
+        'fields': (
+            'nextPageToken, newStartPageToken, changes(fileId, removed, '
+            'file(id, name, parents, mimeType, size, md5Checksum, modifiedTime, version, '
+            'trashed, createdTime))'
+        ),
+        'includeRemoved': True,
+        'supportsAllDrives': True,
+        'includeItemsFromAllDrives': True,
+        'spaces': 'drive',
+        'pageSize': 1000,
+    }
+    if drive_id:
+        params['driveId'] = drive_id
+    page_token = meta['start_page_token']
+    applied = 0
+    while page_token:
+        response = _execute(service.changes().list(pageToken=page_token, **params), limiter)
+        for change in response.get('changes', []):
+            _apply(change)
+            applied += 1
+        page_token = response.get('nextPageToken')
+        if response.get('newStartPageToken'):
+            meta['start_page_token'] = response['newStartPageToken']
+    meta.pop('updated', None)
+    snapshot.save(meta, files, folders, folder_ids)
+    print(f"Drive snapshot refreshed: {applied} change(s) applied")
+    return applied
+
+
+def _compute_file_md5(path, chunk_size=HASH_CHUNK_SIZE):
+    """파일 전체를 청크 단위로 읽어 MD5를 계산합니다.
 
+    Args:
+        path (Path): 해시를 계산할 파일 경로.
+        chunk_size (int): 한 번에 읽을 바이트 수.
 
-def build_sync_verification_report(
-    drive_files,
-    drive_folders,
-    local_files,
-    local_folders,
-):
-    """Drive/Local 트리 비교 결과 리포트를 생성합니다.
+    Returns:
+        str: 16진수 MD5 문자열.
+    """
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def resolve_fingerprint_mode(mode):
+    """'auto' 지문 방식을 설치된 라이브러리에 맞는 실제 방식으로 바꿉니다.
 
     Args:
-        drive_files (dict[str, dict]): Drive 파일 메타데이터.
-        drive_folders (set[str]): Drive 폴더 경로 집합.
-        local_files (dict[str, dict]): 로컬 파일 메타데이터.
-        local_folders (set[str]): 로컬 폴더 경로 집합.
+        mode (str): FINGERPRINT_MODES 중 하나.
 
     Returns:
-        tuple[bool, str]: (검증 통과 여부, Markdown 리포트).
+        str: 사용할 지문 방식. 선택 의존성이 없으면 md5로 대체합니다.
+            (blake2b는 MD5보다 크게 빠르지 않아, 이 경우 지문을 MD5로 겸하는 편이
+            파일을 한 번만 읽으므로 유리합니다.)
     """
-    drive_file_paths = set(drive_files)
-    local_file_paths = set(local_files)
-    drive_folder_paths = set(drive_folders)
-    local_folder_paths = set(local_folders)
+    if mode == 'auto':
+        if xxhash is not None:
+            return 'xxh3'
+        if blake3 is not None:
+            return 'blake3'
+        return 'md5'
+    if (mode == 'xxh3' and xxhash is None) or (mode == 'blake3' and blake3 is None):
+        print(f"'{mode}' 라이브러리가 없어 md5 지문을 사용합니다.")
+        return 'md5'
+    return mode
+
+
+def compute_file_fingerprint(path, mode, chunk_size=HASH_CHUNK_SIZE):
+    """로컬 변경 감지용 파일 지문을 계산합니다.
+
+    - xxh3/blake3/blake2: 파일 전체를 읽는 빠른 해시 (MD5보다 수 배 빠름).
+    - sampled: 크기 + 앞/가운데/끝 블록만 읽는 해시. 가장 빠르지만 같은 크기에서
+      샘플 밖의 바이트만 바뀐 경우는 감지하지 못합니다.
+    - md5: Drive와 같은 MD5 (지문이 곧 MD5).
 
-    missing_local_files = sorted(drive_file_paths - local_file_paths)
-    extra_local_files = sorted(local_file_paths - drive_file_paths)
-    missing_local_folders = sorted(drive_folder_paths - local_folder_paths)
-    extra_local_folders = sorted(local_folder_paths - drive_folder_paths)
+    Args:
+        path (Path): 파일 경로.
+        mode (str): resolve_fingerprint_mode()로 확정된 지문 방식.
+        chunk_size (int): 한 번에 읽을 바이트 수.
 
-    size_mismatches = []
-    conflict_reason_count = 0
-    for path in sorted(drive_file_paths & local_file_paths):
-        drive_size = _normalize_size(drive_files[path].get('size'))
-        local_size = _normalize_size(local_files[path].get('size'))
-        if drive_size is None or local_size is None:
-            continue
-        if drive_size != local_size:
-            size_mismatches.append((path, drive_size, local_size))
+    Returns:
+        str: '방식:16진수' 형식 지문. 방식을 바꾸면 이전 지문과 자연히 달라집니다.
+    """
+    if mode == 'md5':
+        return f"md5:{_compute_file_md5(path, chunk_size)}"
+    if mode == 'xxh3':
+        hasher = xxhash.xxh3_128()
+    elif mode == 'blake3':
+        hasher = blake3.blake3()
+    else:
+        hasher = hashlib.blake2b(digest_size=16)
+
+    with open(path, 'rb') as f:
+        if mode == 'sampled':
+            size = os.fstat(f.fileno()).st_size
+            hasher.update(str(size).encode('ascii'))
+            if size <= FINGERPRINT_SAMPLE_SIZE * 3:
+                hasher.update(f.read())
+            else:
+                for offset in (0, (size - FINGERPRINT_SAMPLE_SIZE) // 2, size - FINGERPRINT_SAMPLE_SIZE):
+                    f.seek(offset)
+                    hasher.update(f.read(FINGERPRINT_SAMPLE_SIZE))
+        else:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                hasher.update(chunk)
+    return f"{mode}:{hasher.hexdigest()}"
 
-    is_ok = not (
-        missing_local_files
-        or extra_local_files
-        or missing_local_folders
-        or extra_local_folders
-        or size_mismatches
-    )
 
-    lines = ['# Sync Verification Report', '']
-    lines.append(f'- Result: {"PASS" if is_ok else "FAIL"}')
-    lines.append(f'- Drive files: {len(drive_file_paths)}')
-    lines.append(f'- Local files: {len(local_file_paths)}')
-    lines.append(f'- Drive folders: {len(drive_folder_paths)}')
-    lines.append(f'- Local folders: {len(local_folder_paths)}')
-    lines.append('')
+def _hash_files_parallel(paths_by_rel, hash_fn, max_workers=None):
+    """여러 파일에 해시 함수를 스레드 풀로 병렬 적용합니다.
 
-    drive_file_vs_local_folder = [
-        item for item in missing_local_files if item in local_folder_paths
-    ]
-    drive_folder_vs_local_file = [
-        item for item in missing_local_folders if item in local_file_paths
-    ]
-    local_file_vs_drive_folder = [
-        item for item in extra_local_files if item in drive_folder_paths
-    ]
-    local_folder_vs_drive_file = [
-        item for item in extra_local_folders if item in drive_file_paths
-    ]
-    conflict_reason_count = (
-        len(drive_file_vs_local_folder)
-        + len(drive_folder_vs_local_file)
-        + len(local_file_vs_drive_folder)
-        + len(local_folder_vs_drive_file)
-    )
+    hashlib/xxhash/blake3는 큰 버퍼를 처리하는 동안 GIL을 해제하므로
+    스레드만으로도 여러 코어를 활용할 수 있습니다.
 
-    lines.append('## Failure Reasons')
-    if is_ok:
-        lines.append('- none')
-    else:
-        if missing_local_folders:
-            lines.append(f'- Missing local folders: {len(missing_local_folders)}')
-        if extra_local_folders:
-            lines.append(f'- Extra local folders: {len(extra_local_folders)}')
-        if missing_local_files:
-            lines.append(f'- Missing local files: {len(missing_local_files)}')
-        if extra_local_files:
-            lines.append(f'- Extra local files: {len(extra_local_files)}')
-        if size_mismatches:
-            lines.append(f'- File size mismatches: {len(size_mismatches)}')
-        if conflict_reason_count:
-            lines.append(
-                f'- File/Folder same-name conflicts: {conflict_reason_count} '
-                '(one of possible failure reasons)'
-            )
-    lines.append('')
+    Args:
+        paths_by_rel (dict[str, Path]): 상대 경로별 파일 경로.
+        hash_fn (Callable[[Path], str]): 파일 경로를 받아 해시를 반환하는 함수.
+        max_workers (int | None): 최대 작업자 수. None이면 CPU 수를 사용합니다.
 
-    def _format_item_with_reason(
-        item,
-        item_type,
-        side,
-    ):
-        """검증 항목에 조건부 원인 설명을 추가합니다.
+    Returns:
+        dict[str, str | None]: 상대 경로별 해시. 읽을 수 없는 파일은 None.
+    """
+    def _hash(item):
+        rel_path, path = item
+        try:
+            return rel_path, hash_fn(path)
+        except OSError as error:
+            print(f"Hash failed: {rel_path} ({error})")
+            return rel_path, None
 
-        Args:
-            item (str): 경로 항목.
-            item_type (str): 'file' 또는 'folder'.
-            side (str): 'drive_only' 또는 'local_only'.
+    if not paths_by_rel:
+        return {}
+    workers = max_workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(_hash, paths_by_rel.items()))
 
-        Returns:
-            str: 필요 시 원인 설명이 포함된 문자열.
-        """
-        reason = None
-        if item_type == 'file' and side == 'drive_only' and item in local_folder_paths:
-            reason = 'local path is a folder (file/folder name conflict)'
-        elif item_type == 'folder' and side == 'drive_only' and item in local_file_paths:
-            reason = 'local path is a file (file/folder name conflict)'
-        elif item_type == 'file' and side == 'local_only' and item in drive_folder_paths:
-            reason = 'drive path is a folder (file/folder name conflict)'
-        elif item_type == 'folder' and side == 'local_only' and item in drive_file_paths:
-            reason = 'drive path is a file (file/folder name conflict)'
-
-        if reason is None:
-            return item
-        return f'{item} (reason: {reason})'
 
-    def _append_section(title, items, item_type, side):
-        lines.append(f'## {title}')
-        if not items:
-            lines.append('- none')
-        else:
-            for item in items:
-                formatted_item = _format_item_with_reason(item, item_type, side)
-                lines.append(f'- {formatted_item}')
-        lines.append('')
+def compute_local_md5_parallel(sync_dir, rel_paths, max_workers=None):
+    """로컬 파일들의 MD5를 스레드 풀로 병렬 계산합니다.
 
-    _append_section(
-        'Missing Local Folders (Drive only)',
-        missing_local_folders,
-        'folder',
-        'drive_only',
-    )
-    _append_section(
-        'Extra Local Folders (Local only)',
-        extra_local_folders,
-        'folder',
-        'local_only',
-    )
-    _append_section(
-        'Missing Local Files (Drive only)',
-        missing_local_files,
-        'file',
-        'drive_only',
-    )
-    _append_section(
-        'Extra Local Files (Local only)',
-        extra_local_files,
-        'file',
-        'local_only',
-    )
+    Args:
+        sync_dir (Path): 로컬 동기화 루트 경로.
+        rel_paths (Iterable[str]): 동기화 루트 기준 상대 파일 경로.
+        max_workers (int | None): 최대 작업자 수. None이면 CPU 수를 사용합니다.
 
-    lines.append('## Size Mismatches')
-    if not size_mismatches:
-        lines.append('- none')
-    else:
-        for path, drive_size, local_size in size_mismatches:
-            lines.append(f'- {path} (drive: {drive_size}, local: {local_size})')
-    lines.append('')
+    Returns:
+        dict[str, str | None]: 상대 경로별 MD5. 읽을 수 없는 파일은 None.
+    """
+    return _hash_files_parallel(
+        {rel_path: sync_dir / rel_path for rel_path in rel_paths},
+        _compute_file_md5,
+        max_workers,
+    )
 
-    return is_ok, '\n'.join(lines)
 
+def ensure_local_md5(sync_dir, local_files, rel_paths, max_workers=None):
+    """Drive와 비교가 필요한 경로만 골라 아직 없는 MD5를 계산합니다.
 
-def export_verification_report(output_path, report):
-    """동기화 검증 리포트를 Markdown 파일로 저장합니다.
+    지문 방식 스캔은 변경된 파일의 MD5를 비워 두므로, 실제로 Drive의
+    md5Checksum과 비교해야 하는 경로에 대해서만 이 함수로 채웁니다.
 
     Args:
-        output_path (Path): 저장할 Markdown 파일 경로.
-        report (str): Markdown 리포트 본문.
+        sync_dir (Path): 로컬 동기화 루트 경로.
+        local_files (dict[str, LocalFileRecord]): 로컬 파일 메타데이터 (제자리 갱신).
+        rel_paths (Iterable[str]): MD5가 필요한 상대 경로.
+        max_workers (int | None): 최대 작업자 수.
     """
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(report, encoding='utf-8')
-    print(f"Verification report exported: {output_path}")
+    missing = [
+        rel_path
+        for rel_path in rel_paths
+        if rel_path in local_files and local_files[rel_path].md5 is None
+    ]
+    if not missing:
+        return
+    print(f"Hashing local files for Drive comparison: {len(missing)}")
+    for rel_path, md5 in compute_local_md5_parallel(sync_dir, missing, max_workers).items():
+        local_files[rel_path].md5 = md5
 
 
-def export_verification_report_to_backup(backup_dir, report):
-    """검증 리포트를 conflicts_backup/verify.md 로 저장합니다.
+def get_state_dir(backup_dir, shard=None):
+    """동기화 상태 폴더 경로를 반환합니다. 샤드 실행은 샤드별 하위 폴더를 씁니다.
 
     Args:
         backup_dir (Path): 충돌 백업 루트 경로.
-        report (str): Markdown 리포트 본문.
+        shard (ShardSpec | None): 샤드 지정. None이면 전체 실행.
+
+    Returns:
+        Path: conflicts_backup/.sync_state[/shard-i-of-N] 경로.
     """
-    backup_report_path = backup_dir / 'verify.md'
-    backup_report_path.parent.mkdir(parents=True, exist_ok=True)
-    backup_report_path.write_text(report, encoding='utf-8')
-    print(f"Verification report exported: {backup_report_path}")
+    state_dir = backup_dir / STATE_DIR_NAME
+    return state_dir if shard is None else state_dir / shard.name
 
 
-def rotate_log_if_needed(log_path, max_size_bytes=MAX_LOG_SIZE_BYTES):
-    """로그 파일이 제한 크기를 넘으면 기존 로그를 삭제합니다.
+def load_local_index(backup_dir, shard=None):
+    """이전 실행의 로컬 파일 상태(크기/mtime/지문/MD5)를 읽습니다.
 
     Args:
-        log_path (Path): 로그 파일 경로.
-        max_size_bytes (int): 허용 최대 파일 크기(바이트).
+        backup_dir (Path): 충돌 백업 루트 경로.
+        shard (ShardSpec | None): 샤드 지정.
+
+    Returns:
+        dict[str, dict]: 상대 경로별 로컬 파일 상태.
     """
-    if not log_path.exists():
-        return
-    if log_path.stat().st_size > max_size_bytes:
-        log_path.unlink()
+    index_path = get_state_dir(backup_dir, shard) / LOCAL_INDEX_FILENAME
+    if not index_path.exists():
+        return {}
+    try:
+        return json.loads(index_path.read_text(encoding='utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        print(f"Ignoring corrupted local index: {index_path}")
+        return {}
 
 
-class TeeStream:
-    """터미널 출력과 파일 출력을 동시에 수행하는 스트림입니다."""
+def save_local_index(backup_dir, local_files, shard=None):
+    """다음 실행에서 재사용할 로컬 파일 상태를 저장합니다.
 
-    def __init__(self, streams):
-        self._streams = streams
+    Args:
+        backup_dir (Path): 충돌 백업 루트 경로.
+        local_files (dict[str, LocalFileRecord]): 상대 경로 기준 로컬 파일 메타데이터.
+        shard (ShardSpec | None): 샤드 지정.
+    """
+    index = {
+        rel_path: {
+            'size': info.size,
+            'mtime_ns': info.mtime_ns,
+            'fingerprint': info.fingerprint,
+            'md5': info.md5,
+        }
+        for rel_path, info in local_files.items()
+        if info.mtime_ns is not None
+    }
+    state_dir = get_state_dir(backup_dir, shard)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    (state_dir / LOCAL_INDEX_FILENAME).write_text(
+        json.dumps(index, ensure_ascii=False, sort_keys=True),
+        encoding='utf-8',
+    )
+
+
+def iter_local_entries(sync_dir, rules=None):
+    """로컬 동기화 폴더를 scandir로 순회하며 규칙에 맞는 항목을 반환합니다.
+
+    제외된 폴더는 scandir 하기 전에 건너뛰므로 하위 트리를 읽지 않습니다.
+
+    Args:
+        sync_dir (Path): 로컬 동기화 루트 경로.
+        rules (SyncRules | None): 선택 동기화 규칙.
+
+    Yields:
+        tuple[str, os.DirEntry, bool]: (상대 경로, 디렉터리 항목, 폴더 여부).
+    """
+    rules = rules or SyncRules()
+    pending = [(sync_dir, '')]
+    while pending:
+        dir_path, prefix = pending.pop()
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                rel_path = sys.intern(f"{prefix}/{entry.name}" if prefix else entry.name)
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if rules.is_excluded(rel_path, is_dir=is_dir):
+                    continue
+                if is_dir:
+                    pending.append((entry.path, rel_path))
+                yield rel_path, entry, is_dir
+
+
+def get_local_files(sync_dir, rules=None, fingerprint_mode='md5', local_index=None):
+    """로컬 동기화 폴더의 파일 메타데이터 목록을 수집합니다.
+
+    local_index 가 주어지면 크기/mtime이 그대로인 파일은 읽지 않고 이전 지문과
+    MD5를 재사용합니다. 바뀐 파일은 지문만 다시 계산하고, 파일 전체를 읽는 지문이
+    같을 때만 MD5도 재사용합니다. sampled 지문은 샘플 밖의 변경을 놓칠 수 있으므로
+    재사용하지 않습니다. 그 밖의 경우 'md5'는 None으로 두며 필요할 때
+    ensure_local_md5()로 계산합니다.
+
+    Args:
+        sync_dir (Path): 로컬 동기화 루트 경로.
+        rules (SyncRules | None): 선택 동기화 규칙.
+        fingerprint_mode (str): 지문 방식. 'md5'면 모든 파일의 MD5를 바로 계산합니다.
+        local_index (dict[str, dict] | None): 이전 실행의 로컬 파일 상태.
+
+    Returns:
+        dict[str, LocalFileRecord]: 상대 경로 기준 로컬 파일 메타데이터.
+    """
+    local_index = local_index or {}
+    files = {}
+    changed = {}
+    for rel_path, entry, is_dir in iter_local_entries(sync_dir, rules):
+        if is_dir or not entry.is_file():
+            continue
+        file_stat = entry.stat()
+        info = LocalFileRecord(
+            size=file_stat.st_size,
+            modified=file_stat.st_mtime,
+            mtime_ns=file_stat.st_mtime_ns,
+        )
+        files[rel_path] = info
+        cached = local_index.get(rel_path)
+        if (
+            cached
+            and cached.get('size') == file_stat.st_size
+            and cached.get('mtime_ns') == file_stat.st_mtime_ns
+            and cached.get('md5')
+        ):
+            info.fingerprint = cached.get('fingerprint')
+            info.md5 = cached['md5']
+        else:
+            changed[rel_path] = Path(entry.path)
+
+    fingerprints = _hash_files_parallel(
+        changed,
+        lambda path: compute_file_fingerprint(path, fingerprint_mode),
+    )
+    for rel_path, fingerprint in fingerprints.items():
+        info = files[rel_path]
+        info.fingerprint = fingerprint
+        cached = local_index.get(rel_path)
+        if fingerprint is None:
+            continue
+        if fingerprint_mode == 'md5':
+            info.md5 = fingerprint.split(':', 1)[1]
+        elif (
+            fingerprint_mode != 'sampled'
+            and cached
+            and cached.get('fingerprint') == fingerprint
+        ):
+            info.md5 = cached.get('md5')
+    return files
+
+
+def get_local_directories(sync_dir, rules=None):
+    """로컬 동기화 폴더 하위의 상대 디렉터리 목록을 수집합니다.
+
+    Args:
+        sync_dir (Path): 로컬 동기화 루트 경로.
+        rules (SyncRules | None): 선택 동기화 규칙.
+
+    Returns:
+        set[str]: 동기화 루트 기준 상대 폴더 경로 집합.
+    """
+    return {
+        rel_path
+        for rel_path, _, is_dir in iter_local_entries(sync_dir, rules)
+        if is_dir
+    }
+
+
+DIFF_BOTH = 'both'
+DIFF_DRIVE_ONLY = 'drive_only'
+DIFF_LOCAL_ONLY = 'local_only'
+DIFF_TYPE_CONFLICT = 'type_conflict'
+DIFF_CHANGED = 'changed'
+
+
+def path_sort_key(rel_path):
+    """경로를 트리 깊이 우선 순서로 정렬하는 문자열 키를 만듭니다.
+
+    구분자 '/'를 가장 작은 문자 '\\0'으로 바꾸므로 일반 문자열 정렬과 달리
+    부모 폴더 바로 뒤에 그 하위 항목이 옵니다 ('a', 'a/x', 'a-b' 순서).
+    경로 구성 요소 튜플로 비교하는 것과 순서가 같지만 키가 문자열 하나입니다.
+
+    Args:
+        rel_path (str): 동기화 루트 기준 상대 경로.
+
+    Returns:
+        str: 정렬 키 문자열.
+    """
+    return rel_path.replace('/', '\0')
+
+
+def _tree_sort_key(rel_path, is_dir):
+    # 트리 출력용: 같은 부모 아래에서 폴더('\1')를 파일('\2')보다 먼저 둡니다.
+    parent, _, name = rel_path.rpartition('/')
+    prefix = '\1' + parent.replace('/', '\0\1') + '\0' if parent else ''
+    return prefix + ('\1' if is_dir else '\2') + name
+
+
+def md5_differs(drive_record, local_record):
+    """두 파일 레코드의 MD5가 다른지 확인합니다 (동기화 계획의 기본 변경 판정)."""
+    return drive_record.md5 != local_record.md5
+
+
+def iter_sorted_entries(files, folders, dirs_first=False):
+    """파일/폴더 목록을 정렬된 (키, 경로, 폴더 여부, 레코드) 스트림으로 만듭니다.
+
+    경로 문자열만 정렬하고 레코드는 내보낼 때 조회하므로, 항목별 튜플 목록을
+    미리 만들지 않아 추가 메모리가 경로 참조 목록 수준으로 줄어듭니다.
+
+    Args:
+        files (dict[str, DriveFileRecord | LocalFileRecord]): 상대 경로 기준 파일 메타데이터.
+        folders (set[str]): 상대 경로 기준 폴더 집합.
+        dirs_first (bool): True면 같은 부모 아래에서 폴더를 파일보다 먼저 냅니다.
+            병합 비교(iter_tree_diff)에는 양쪽 모두 False를 사용해야 합니다.
+
+    Yields:
+        tuple[str, str, bool, DriveFileRecord | LocalFileRecord | None]:
+            (정렬 키, 상대 경로, 폴더 여부, 파일 레코드 또는 None).
+            같은 경로의 파일과 폴더가 함께 있으면 파일이 먼저 옵니다.
+    """
+    if dirs_first:
+        def file_key(path):
+            return _tree_sort_key(path, False)
+
+        def folder_key(path):
+            return _tree_sort_key(path, True)
+    else:
+        file_key = folder_key = path_sort_key
+
+    file_entries = (
+        (file_key(path), path, False, files[path])
+        for path in sorted(files, key=file_key)
+    )
+    folder_entries = (
+        (folder_key(path), path, True, None)
+        for path in sorted(folders, key=folder_key)
+    )
+    yield from heapq.merge(file_entries, folder_entries, key=lambda entry: entry[0])
+
+
+def iter_tree_diff(drive_entries, local_entries, is_changed=None):
+    """정렬된 Drive/로컬 스트림을 한 번의 병합으로 비교해 분류 결과를 냅니다.
+
+    두 입력은 iter_sorted_entries(dirs_first=False) 순서여야 하며,
+    양쪽에서 한 항목씩만 보관하므로 비교 자체는 항목 수와 무관한 메모리로 동작합니다.
+
+    Args:
+        drive_entries (Iterable[tuple]): Drive 쪽 정렬 스트림.
+        local_entries (Iterable[tuple]): 로컬 쪽 정렬 스트림.
+        is_changed (Callable[[DriveFileRecord, LocalFileRecord], bool] | None):
+            양쪽 파일이 다른지 판단하는 함수. 기본값은 MD5 비교입니다.
+
+    Yields:
+        tuple[str, str, tuple | None, tuple | None]:
+            (상대 경로, 분류, Drive 항목, 로컬 항목). 분류는 DIFF_BOTH,
+            DIFF_DRIVE_ONLY, DIFF_LOCAL_ONLY, DIFF_TYPE_CONFLICT, DIFF_CHANGED 중
+            하나이고 각 항목은 (폴더 여부, 레코드) 또는 None 입니다.
+    """
+    if is_changed is None:
+        is_changed = md5_differs
+
+    drive_iter = iter(drive_entries)
+    local_iter = iter(local_entries)
+    drive_entry = next(drive_iter, None)
+    local_entry = next(local_iter, None)
+    while drive_entry is not None or local_entry is not None:
+        if local_entry is None or (
+            drive_entry is not None and drive_entry[0] < local_entry[0]
+        ):
+            yield drive_entry[1], DIFF_DRIVE_ONLY, drive_entry[2:], None
+            drive_entry = next(drive_iter, None)
+            continue
+        if drive_entry is None or local_entry[0] < drive_entry[0]:
+            yield local_entry[1], DIFF_LOCAL_ONLY, None, local_entry[2:]
+            local_entry = next(local_iter, None)
+            continue
+
+        _, path, drive_is_dir, drive_record = drive_entry
+        _, _, local_is_dir, local_record = local_entry
+        if drive_is_dir != local_is_dir:
+            kind = DIFF_TYPE_CONFLICT
+        elif drive_is_dir or not is_changed(drive_record, local_record):
+            kind = DIFF_BOTH
+        else:
+            kind = DIFF_CHANGED
+        yield path, kind, drive_entry[2:], local_entry[2:]
+        drive_entry = next(drive_iter, None)
+        local_entry = next(local_iter, None)
+
+
+def build_tree_markdown(title, files, folders):
+    """파일/폴더 목록으로 Markdown 트리를 만듭니다.
+
+    Args:
+        title (str): Markdown 문서 제목.
+        files (dict[str, DriveFileRecord | LocalFileRecord]): 상대 경로 기준 파일 메타데이터.
+        folders (set[str]): 상대 경로 기준 폴더 집합.
+
+    Returns:
+        str: Markdown 형식 트리 문자열.
+    """
+    lines = [f'# {title}', '']
+    # 정렬 스트림이 트리 깊이 우선 순서이므로 중간 트리를 만들지 않고 바로 출력합니다.
+    # 폴더 목록에 없는 상위 폴더는 직전 항목과 달라지는 부분만 출력합니다.
+    open_dirs = ()
+    for _, path, is_dir, meta in iter_sorted_entries(files, folders, dirs_first=True):
+        parts = tuple(path.split('/'))
+        dir_parts = parts if is_dir else parts[:-1]
+        common = 0
+        while (
+            common < min(len(open_dirs), len(dir_parts))
+            and open_dirs[common] == dir_parts[common]
+        ):
+            common += 1
+        for depth in range(common, len(dir_parts)):
+            lines.append(f"{'  ' * depth}- [D] {dir_parts[depth]}/")
+        open_dirs = dir_parts
+        if not is_dir:
+            size_text = meta.size if meta.size is not None else '?'
+            lines.append(f"{'  ' * (len(parts) - 1)}- [F] {parts[-1]} (size: {size_text})")
+
+    if len(lines) == 2:
+        lines.append('- (empty)')
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def export_tree_markdown(output_path, title, files, folders):
+    """파일/폴더 트리를 Markdown 파일로 저장합니다.
+
+    Args:
+        output_path (Path): 저장할 Markdown 파일 경로.
+        title (str): Markdown 문서 제목.
+        files (dict[str, DriveFileRecord | LocalFileRecord]): 상대 경로 기준 파일 메타데이터.
+        folders (set[str]): 상대 경로 기준 폴더 집합.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    content = build_tree_markdown(title, files, folders)
+    output_path.write_text(content, encoding='utf-8')
+    print(f"Tree exported: {output_path}")
+
+
+def export_drive_tree_markdown(output_path, files, folders):
+    """Drive 파일/폴더 트리를 Markdown 파일로 저장합니다.
+
+    Args:
+        output_path (Path): 저장할 Markdown 파일 경로.
+        files (dict[str, DriveFileRecord]): 상대 경로 기준 Drive 파일 메타데이터.
+        folders (set[str]): 상대 경로 기준 Drive 폴더 집합.
+    """
+    export_tree_markdown(output_path, 'Google Drive Tree', files, folders)
+
+
+def export_local_tree_markdown(output_path, files, folders):
+    """로컬 파일/폴더 트리를 Markdown 파일로 저장합니다.
+
+    Args:
+        output_path (Path): 저장할 Markdown 파일 경로.
+        files (dict[str, LocalFileRecord]): 상대 경로 기준 로컬 파일 메타데이터.
+        folders (set[str]): 상대 경로 기준 로컬 폴더 집합.
+    """
+    export_tree_markdown(output_path, 'Local Tree', files, folders)
+
+
+def _parent_dir_key(rel_path):
+    """상대 경로의 부모 폴더 키를 반환합니다. 루트는 빈 문자열입니다.
+
+    Args:
+        rel_path (str): 동기화 루트 기준 상대 경로.
+
+    Returns:
+        str: 부모 폴더 상대 경로. 루트 바로 아래 항목이면 ''.
+    """
+    return rel_path.rpartition('/')[0]
+
+
+def compute_directory_digests(file_signatures, folders):
+    """폴더별 계층 다이제스트(Merkle 트리)를 계산합니다.
+
+    각 폴더의 다이제스트는 자식 이름, 파일 서명, 하위 폴더 다이제스트로
+    만들어지므로 다이제스트가 같으면 그 하위 트리 전체가 같습니다.
+
+    Args:
+        file_signatures (dict[str, tuple]): 상대 파일 경로별 서명 (예: (크기, MD5)).
+        folders (set[str]): 상대 폴더 경로 집합.
+
+    Returns:
+        dict[str, str]: 폴더 상대 경로별 다이제스트. 루트는 '' 키를 사용합니다.
+    """
+    children: Dict[str, list] = {'': []}
+
+    def _ensure_folder(folder):
+        if folder in children:
+            return
+        parent, _, name = folder.rpartition('/')
+        _ensure_folder(parent)
+        children[folder] = []
+        children[parent].append(('D', name, folder))
+
+    for folder in folders:
+        _ensure_folder(folder)
+    for rel_path, signature in file_signatures.items():
+        parent, _, name = rel_path.rpartition('/')
+        _ensure_folder(parent)
+        children[parent].append(('F', name, signature))
+
+    digests: Dict[str, str] = {}
+    # 깊은 폴더부터 계산해야 부모가 자식 다이제스트를 참조할 수 있습니다.
+    for folder in sorted(
+        children, key=lambda path: path.count('/') + 1 if path else 0, reverse=True
+    ):
+        entries = []
+        for kind, name, value in children[folder]:
+            if kind == 'D':
+                entries.append(f"D\0{name}\0{digests[value]}")
+            else:
+                entries.append(f"F\0{name}\0" + '\0'.join(map(str, value)))
+        digests[folder] = hashlib.md5('\n'.join(sorted(entries)).encode('utf-8')).hexdigest()
+    return digests
+
+
+def _content_digests(files, folders):
+    # 양쪽을 비교할 수 있는 내용 기준 서명: (크기, MD5).
+    return compute_directory_digests(
+        {path: (record.size, record.md5) for path, record in files.items()}, folders
+    )
+
+
+def _local_stat_digests(files, folders):
+    # 로컬 스캔 결과만으로 만드는 서명: 로컬 인덱스와 같은 (크기, mtime) 기준입니다.
+    return compute_directory_digests(
+        {path: (record.size, record.mtime_ns) for path, record in files.items()}, folders
+    )
+
+
+def load_directory_digests(backup_dir, shard=None):
+    """지난 실행 끝에 저장한 폴더별 다이제스트를 읽습니다.
+
+    Args:
+        backup_dir (Path): 충돌 백업 루트 경로.
+        shard (ShardSpec | None): 샤드 지정.
+
+    Returns:
+        dict[str, list[str]]: 폴더 상대 경로별 [Drive 다이제스트, 로컬 상태 다이제스트].
+    """
+    digests_path = get_state_dir(backup_dir, shard) / DIRECTORY_DIGESTS_FILENAME
+    if not digests_path.exists():
+        return {}
+    try:
+        return json.loads(digests_path.read_text(encoding='utf-8')).get('directories', {})
+    except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+        print(f"Ignoring corrupted directory digests: {digests_path}")
+        return {}
+
+
+def save_directory_digests(
+    backup_dir, drive_files, drive_folders, local_files, local_folders, shard=None
+):
+    """동기화가 끝난 상태의 폴더별 다이제스트를 conflicts_backup/.sync_state 에 저장합니다.
+
+    양쪽 내용(크기/MD5) 다이제스트가 같은 폴더만 저장하므로, 저장된 폴더는
+    이 시점에 하위 트리 전체가 일치했던 폴더입니다.
+
+    Args:
+        backup_dir (Path): 충돌 백업 루트 경로.
+        drive_files (dict[str, DriveFileRecord]): Drive 파일 메타데이터.
+        drive_folders (set[str]): Drive 폴더 경로 집합.
+        local_files (dict[str, LocalFileRecord]): 로컬 파일 메타데이터.
+        local_folders (set[str]): 로컬 폴더 경로 집합.
+        shard (ShardSpec | None): 샤드 지정.
+    """
+    drive_digests = _content_digests(drive_files, drive_folders)
+    local_digests = _content_digests(local_files, local_folders)
+    stat_digests = _local_stat_digests(local_files, local_folders)
+    payload = {
+        'updated': datetime.now().isoformat(timespec='seconds'),
+        'directories': {
+            folder: [digest, stat_digests[folder]]
+            for folder, digest in drive_digests.items()
+            if local_digests.get(folder) == digest
+        },
+    }
+    state_dir = get_state_dir(backup_dir, shard)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    (state_dir / DIRECTORY_DIGESTS_FILENAME).write_text(
+        json.dumps(payload, ensure_ascii=False, sort_keys=True),
+        encoding='utf-8',
+    )
+
+
+def find_unchanged_directories(
+    stored_digests, drive_files, drive_folders, local_files, local_folders
+):
+    """지난 동기화 이후 양쪽 모두 바뀌지 않은 하위 트리의 최상위 폴더를 찾습니다.
+
+    루트부터 내려가며 Drive 내용 다이제스트와 로컬 상태 다이제스트가 모두 저장된
+    값과 같은 폴더에서 멈추므로, 바뀐 폴더 수만큼만 내려갑니다. 로컬 쪽은 스캔에서
+    얻은 크기/mtime 만 쓰므로 MD5를 계산하기 전에 판단할 수 있습니다.
+
+    Args:
+        stored_digests (dict[str, list[str]]): load_directory_digests() 결과.
+        drive_files (dict[str, DriveFileRecord]): Drive 파일 메타데이터.
+        drive_folders (set[str]): Drive 폴더 경로 집합.
+        local_files (dict[str, LocalFileRecord]): 로컬 파일 메타데이터.
+        local_folders (set[str]): 로컬 폴더 경로 집합.
+
+    Returns:
+        set[str]: 비교를 건너뛸 폴더 경로 집합 ('' = 루트 전체).
+    """
+    if not stored_digests:
+        return set()
+    drive_digests = _content_digests(drive_files, drive_folders)
+    stat_digests = _local_stat_digests(local_files, local_folders)
+    child_dirs: Dict[str, list] = {}
+    for folder in drive_digests.keys() & stat_digests.keys():
+        if folder:
+            child_dirs.setdefault(_parent_dir_key(folder), []).append(folder)
+
+    unchanged: Set[str] = set()
+    pending = ['']
+    while pending:
+        folder = pending.pop()
+        if stored_digests.get(folder) == [drive_digests.get(folder), stat_digests.get(folder)]:
+            unchanged.add(folder)
+            continue
+        pending.extend(child_dirs.get(folder, ()))
+    return unchanged
+
+
+def build_sync_verification_report(
+    drive_files,
+    drive_folders,
+    local_files,
+    local_folders,
+    compare_md5=False,
+):
+    """Drive/Local 트리 비교 결과 리포트를 생성합니다.
+
+    Args:
+        drive_files (dict[str, DriveFileRecord]): Drive 파일 메타데이터.
+        drive_folders (set[str]): Drive 폴더 경로 집합.
+        local_files (dict[str, LocalFileRecord]): 로컬 파일 메타데이터.
+        local_folders (set[str]): 로컬 폴더 경로 집합.
+        compare_md5 (bool): True면 크기뿐 아니라 MD5까지 비교합니다.
+
+    Returns:
+        tuple[bool, str]: (검증 통과 여부, Markdown 리포트).
+    """
+    missing_local_files = []
+    extra_local_files = []
+    missing_local_folders = []
+    extra_local_folders = []
+    size_mismatches = []
+    md5_mismatches = []
+    # 파일/폴더 이름 충돌 항목의 원인 설명: (경로, 항목 종류, 쪽) -> 원인
+    conflict_reasons = {}
+
+    def _sizes_differ(drive_record, local_record):
+        return (
+            drive_record.size is not None
+            and local_record.size is not None
+            and drive_record.size != local_record.size
+        )
+
+    def _files_differ(drive_record, local_record):
+        if _sizes_differ(drive_record, local_record):
+            return True
+        return bool(
+            compare_md5
+            and drive_record.md5
+            and local_record.md5
+            and drive_record.md5 != local_record.md5
+        )
+
+    for path, kind, drive_item, local_item in iter_tree_diff(
+        iter_sorted_entries(drive_files, drive_folders),
+        iter_sorted_entries(local_files, local_folders),
+        is_changed=_files_differ,
+    ):
+        if kind == DIFF_DRIVE_ONLY:
+            (missing_local_folders if drive_item[0] else missing_local_files).append(path)
+        elif kind == DIFF_LOCAL_ONLY:
+            (extra_local_folders if local_item[0] else extra_local_files).append(path)
+        elif kind == DIFF_TYPE_CONFLICT:
+            if drive_item[0]:
+                missing_local_folders.append(path)
+                extra_local_files.append(path)
+                conflict_reasons[(path, 'folder', 'drive_only')] = (
+                    'local path is a file (file/folder name conflict)'
+                )
+                conflict_reasons[(path, 'file', 'local_only')] = (
+                    'drive path is a folder (file/folder name conflict)'
+                )
+            else:
+                missing_local_files.append(path)
+                extra_local_folders.append(path)
+                conflict_reasons[(path, 'file', 'drive_only')] = (
+                    'local path is a folder (file/folder name conflict)'
+                )
+                conflict_reasons[(path, 'folder', 'local_only')] = (
+                    'drive path is a file (file/folder name conflict)'
+                )
+        elif kind == DIFF_CHANGED:
+            drive_record = drive_item[1]
+            local_record = local_item[1]
+            if compare_md5 and drive_record.md5 and local_record.md5 and (
+                drive_record.md5 != local_record.md5
+            ):
+                md5_mismatches.append((path, drive_record.md5, local_record.md5))
+            if _sizes_differ(drive_record, local_record):
+                size_mismatches.append((path, drive_record.size, local_record.size))
+    conflict_reason_count = len(conflict_reasons)
+
+    is_ok = not (
+        missing_local_files
+        or extra_local_files
+        or missing_local_folders
+        or extra_local_folders
+        or size_mismatches
+        or md5_mismatches
+    )
+
+    lines = ['# Sync Verification Report', '']
+    lines.append(f'- Result: {"PASS" if is_ok else "FAIL"}')
+    lines.append(f'- Drive files: {len(drive_files)}')
+    lines.append(f'- Local files: {len(local_files)}')
+    lines.append(f'- Drive folders: {len(drive_folders)}')
+    lines.append(f'- Local folders: {len(local_folders)}')
+    lines.append('')
+
+    lines.append('## Failure Reasons')
+    if is_ok:
+        lines.append('- none')
+    else:
+        if missing_local_folders:
+            lines.append(f'- Missing local folders: {len(missing_local_folders)}')
+        if extra_local_folders:
+            lines.append(f'- Extra local folders: {len(extra_local_folders)}')
+        if missing_local_files:
+            lines.append(f'- Missing local files: {len(missing_local_files)}')
+        if extra_local_files:
+            lines.append(f'- Extra local files: {len(extra_local_files)}')
+        if size_mismatches:
+            lines.append(f'- File size mismatches: {len(size_mismatches)}')
+        if md5_mismatches:
+            lines.append(f'- File MD5 mismatches: {len(md5_mismatches)}')
+        if conflict_reason_count:
+            lines.append(
+                f'- File/Folder same-name conflicts: {conflict_reason_count} '
+                '(one of possible failure reasons)'
+            )
+    lines.append('')
+
+    def _append_section(title, items, item_type, side):
+        lines.append(f'## {title}')
+        if not items:
+            lines.append('- none')
+        else:
+            for item in items:
+                reason = conflict_reasons.get((item, item_type, side))
+                if reason is None:
+                    lines.append(f'- {item}')
+                else:
+                    lines.append(f'- {item} (reason: {reason})')
+        lines.append('')
+
+    _append_section(
+        'Missing Local Folders (Drive only)',
+        missing_local_folders,
+        'folder',
+        'drive_only',
+    )
+    _append_section(
+        'Extra Local Folders (Local only)',
+        extra_local_folders,
+        'folder',
+        'local_only',
+    )
+    _append_section(
+        'Missing Local Files (Drive only)',
+        missing_local_files,
+        'file',
+        'drive_only',
+    )
+    _append_section(
+        'Extra Local Files (Local only)',
+        extra_local_files,
+        'file',
+        'local_only',
+    )
+
+    # 불일치 경로의 첫 구성요소로 내용이 달라진 최상위 폴더를 모읍니다.
+    diverged_paths = [
+        *missing_local_files,
+        *extra_local_files,
+        *(item[0] for item in size_mismatches),
+        *(item[0] for item in md5_mismatches),
+    ]
+    diverged_top_level = sorted(
+        {path.partition('/')[0] for path in diverged_paths if '/' in path}
+        | {path.partition('/')[0] for path in missing_local_folders}
+        | {path.partition('/')[0] for path in extra_local_folders}
+    )
+    lines.append('## Diverged Top-level Folders')
+    if not diverged_top_level:
+        lines.append('- none')
+    else:
+        for folder in diverged_top_level:
+            lines.append(f'- {folder}/')
+    lines.append('')
+
+    lines.append('## Size Mismatches')
+    if not size_mismatches:
+        lines.append('- none')
+    else:
+        for path, drive_size, local_size in size_mismatches:
+            lines.append(f'- {path} (drive: {drive_size}, local: {local_size})')
+    lines.append('')
+
+    if compare_md5:
+        lines.append('## MD5 Mismatches')
+        if not md5_mismatches:
+            lines.append('- none')
+        else:
+            for path, drive_md5, local_md5 in md5_mismatches:
+                lines.append(f'- {path} (drive: {drive_md5}, local: {local_md5})')
+        lines.append('')
+
+    return is_ok, '\n'.join(lines)
+
+
+def export_verification_report(output_path, report):
+    """동기화 검증 리포트를 Markdown 파일로 저장합니다.
+
+    Args:
+        output_path (Path): 저장할 Markdown 파일 경로.
+        report (str): Markdown 리포트 본문.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(report, encoding='utf-8')
+    print(f"Verification report exported: {output_path}")
+
+
+def export_verification_report_to_backup(backup_dir, report, shard=None):
+    """검증 리포트를 conflicts_backup/verify.md 로 저장합니다.
+
+    샤드 실행은 코디네이터가 합칠 수 있도록 샤드 상태 폴더에 저장합니다.
+
+    Args:
+        backup_dir (Path): 충돌 백업 루트 경로.
+        report (str): Markdown 리포트 본문.
+        shard (ShardSpec | None): 샤드 지정.
+    """
+    report_dir = backup_dir if shard is None else get_state_dir(backup_dir, shard)
+    backup_report_path = report_dir / VERIFY_REPORT_FILENAME
+    backup_report_path.parent.mkdir(parents=True, exist_ok=True)
+    backup_report_path.write_text(report, encoding='utf-8')
+    print(f"Verification report exported: {backup_report_path}")
+
+
+def rotate_log_if_needed(log_path, max_size_bytes=MAX_LOG_SIZE_BYTES):
+    """로그 파일이 제한 크기를 넘으면 기존 로그를 삭제합니다.
+
+    Args:
+        log_path (Path): 로그 파일 경로.
+        max_size_bytes (int): 허용 최대 파일 크기(바이트).
+    """
+    if not log_path.exists():
+        return
+    if log_path.stat().st_size > max_size_bytes:
+        log_path.unlink()
+
+
+class TeeStream:
+    """터미널 출력과 파일 출력을 동시에 수행하는 스트림입니다."""
+
+    def __init__(self, streams):
+        self._streams = streams
 
     def write(self, data):
         for stream in self._streams:
             stream.write(data)
 
-    def flush(self):
-        for stream in self._streams:
-            stream.flush()
+    def flush(self):
+        for stream in self._streams:
+            stream.flush()
+
+
+def _build_conflict_backup_path(backup_dir, rel_path, conflict_type):
+    """충돌 백업 파일 경로를 생성합니다.
+
+    Args:
+        backup_dir (Path): 충돌 백업 루트 경로.
+        rel_path (str): 동기화 루트 기준 상대 경로.
+        conflict_type (str): 충돌 유형 식별자.
+
+    Returns:
+        Path: 충돌 백업 저장 경로.
+    """
+    timestamp = datetime.now().strftime(BACKUP_TIMESTAMP_FORMAT)
+    path_obj = Path(rel_path)
+    backup_name = f"{path_obj.name}__{conflict_type}_{timestamp}"
+    return backup_dir / conflict_type / path_obj.parent / backup_name
+
+
+def move_local_file_to_conflict_backup(local_path, backup_dir, rel_path, conflict_type):
+    """로컬 충돌 파일을 conflicts_backup으로 이동합니다.
+
+    Args:
+        local_path (Path): 이동할 로컬 파일 경로.
+        backup_dir (Path): 충돌 백업 루트 경로.
+        rel_path (str): 동기화 루트 기준 상대 경로.
+        conflict_type (str): 충돌 유형 식별자.
+    """
+    backup_path = _build_conflict_backup_path(backup_dir, rel_path, conflict_type)
+    backup_path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(local_path), str(backup_path))
+    print(f"Moved conflict file to backup: {backup_path}")
+
+
+def download_drive_file_to_conflict_backup(
+    service,
+    file_id,
+    backup_dir,
+    rel_path,
+    conflict_type,
+    limiter=None,
+    units=1.0,
+):
+    """Drive 충돌 파일을 conflicts_backup으로 다운로드합니다.
+
+    Args:
+        service: Google Drive API 서비스 객체.
+        file_id (str): Drive 파일 ID.
+        backup_dir (Path): 충돌 백업 루트 경로.
+        rel_path (str): 동기화 루트 기준 상대 경로.
+        conflict_type (str): 충돌 유형 식별자.
+        limiter (AdaptiveConcurrency | None): 전송 동시 실행 수 제어기.
+        units (float): limiter 에 보고할 작업량 (전송 MiB 등).
+    """
+    backup_path = _build_conflict_backup_path(backup_dir, rel_path, conflict_type)
+    print(f"Downloading conflict file to backup: {backup_path}")
+    if limiter is None:
+        download_file(service, file_id, backup_path)
+    else:
+        limiter.call(download_file, service, file_id, backup_path, units=units)
+
+
+def copy_drive_file_to_conflict_backup(
+    service,
+    file_id,
+    root_folder_id,
+    rel_path,
+    conflict_type,
+    folder_cache,
+    folder_lock=None,
+    limiter=None,
+):
+    """Drive 충돌 파일을 서버 측 복사로 Drive의 conflicts_backup 폴더에 백업합니다.
+
+    파일 내용을 내려받지 않으므로 파일 크기와 무관하게 API 호출 몇 번으로 끝납니다.
+
+    Args:
+        service: Google Drive API 서비스 객체.
+        file_id (str): Drive 파일 ID.
+        root_folder_id (str): 동기화 루트 Drive 폴더 ID.
+        rel_path (str): 동기화 루트 기준 상대 경로.
+        conflict_type (str): 충돌 유형 식별자.
+        folder_cache (dict[tuple[str, str], str]): 폴더 조회 캐시.
+        folder_lock (threading.Lock | None): 여러 스레드가 folder_cache 를 함께 쓸 때
+            백업 폴더를 찾거나 만드는 동안만 잡는 잠금.
+        limiter (AdaptiveConcurrency | None): API 요청 동시 실행 수 제어기.
+
+    Returns:
+        str: 생성된 백업 사본의 Drive 파일 ID.
+    """
+    backup_rel_path = _build_conflict_backup_path(Path(BACKUP_DIR_NAME), rel_path, conflict_type)
+    with folder_lock or nullcontext():
+        parent_id = ensure_drive_parent_folder(
+            service, root_folder_id, str(backup_rel_path), folder_cache, limiter
+        )
+    copied = _execute(
+        service.files().copy(
+            fileId=file_id,
+            body={'name': backup_rel_path.name, 'parents': [parent_id]},
+            fields='id',
+            supportsAllDrives=True,
+        ),
+        limiter,
+    )
+    print(f"Copied conflict file on Drive: {backup_rel_path}")
+    return copied['id']
+
+
+def pin_drive_file_revision_for_conflict_backup(
+    service,
+    file_id,
+    backup_dir,
+    rel_path,
+    conflict_type,
+    limiter=None,
+):
+    """Drive 충돌 파일의 현재 리비전을 영구 보관으로 고정합니다.
+
+    복원에 필요한 파일/리비전 ID와 크기는 conflicts_backup 아래 JSON 메모로 남기며,
+    prune_drive_conflict_backups 가 이 메모로 영구 보관을 해제합니다.
+
+    Args:
+        service: Google Drive API 서비스 객체.
+        file_id (str): Drive 파일 ID.
+        backup_dir (Path): 충돌 백업 루트 경로.
+        rel_path (str): 동기화 루트 기준 상대 경로.
+        conflict_type (str): 충돌 유형 식별자.
+        limiter (AdaptiveConcurrency | None): API 요청 동시 실행 수 제어기.
+
+    Returns:
+        str: 고정한 리비전 ID.
+    """
+    file_meta = _execute(
+        service.files().get(
+            fileId=file_id,
+            fields='headRevisionId, size',
+            supportsAllDrives=True,
+        ),
+        limiter,
+    )
+    revision_id = file_meta['headRevisionId']
+    _execute(
+        service.revisions().update(
+            fileId=file_id,
+            revisionId=revision_id,
+            body={'keepForever': True},
+        ),
+        limiter,
+    )
+
+    backup_path = _build_conflict_backup_path(backup_dir, rel_path, conflict_type)
+    note_path = backup_path.with_name(f"{backup_path.name}{REVISION_NOTE_SUFFIX}")
+    note_path.parent.mkdir(parents=True, exist_ok=True)
+    note_path.write_text(
+        json.dumps(
+            {
+                'path': rel_path,
+                'file_id': file_id,
+                'revision_id': revision_id,
+                'size': int(file_meta['size']) if file_meta.get('size') else None,
+            },
+            ensure_ascii=False,
+        ),
+        encoding='utf-8',
+    )
+    print(f"Pinned Drive revision for conflict backup: {note_path}")
+    return revision_id
+
+
+def backup_drive_conflict_file(
+    service,
+    file_id,
+    backup_dir,
+    rel_path,
+    conflict_type,
+    mode,
+    root_folder_id,
+    folder_cache,
+    folder_lock=None,
+    limiter=None,
+    units=1.0,
+):
+    """설정된 방식으로 Drive 측 충돌 파일을 백업합니다.
+
+    Args:
+        service: Google Drive API 서비스 객체.
+        file_id (str): Drive 파일 ID.
+        backup_dir (Path): 충돌 백업 루트 경로.
+        rel_path (str): 동기화 루트 기준 상대 경로.
+        conflict_type (str): 충돌 유형 식별자.
+        mode (str): 'download', 'copy'(서버 측 복사), 'revision'(리비전 고정) 중 하나.
+        root_folder_id (str): 동기화 루트 Drive 폴더 ID.
+        folder_cache (dict[tuple[str, str], str]): 폴더 조회 캐시.
+        folder_lock (threading.Lock | None): folder_cache 잠금 (copy 방식에서만 사용).
+        limiter (AdaptiveConcurrency | None): API 요청/전송 동시 실행 수 제어기.
+        units (float): 다운로드 백업 시 limiter 에 보고할 작업량.
+    """
+    if mode == 'copy':
+        copy_drive_file_to_conflict_backup(
+            service,
+            file_id,
+            root_folder_id,
+            rel_path,
+            conflict_type,
+            folder_cache,
+            folder_lock,
+            limiter,
+        )
+    elif mode == 'revision':
+        pin_drive_file_revision_for_conflict_backup(
+            service, file_id, backup_dir, rel_path, conflict_type, limiter
+        )
+    else:
+        download_drive_file_to_conflict_backup(
+            service, file_id, backup_dir, rel_path, conflict_type, limiter, units
+        )
+
+
+def _reflink_file(src_path, dst_path):
+    """FICLONE ioctl로 데이터 블록을 공유하는 사본(reflink)을 만듭니다.
+
+    Args:
+        src_path (Path): 원본 파일 경로.
+        dst_path (Path): 생성할 사본 경로.
+
+    Returns:
+        bool: reflink 성공 여부. 미지원 OS/파일시스템이면 False.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        dst_path.unlink(missing_ok=True)
+        return False
+    shutil.copystat(src_path, dst_path)
+    return True
+
+
+def backup_local_file(local_path, backup_path, replace_original=False):
+    """로컬 파일을 가능한 가장 저렴한 방식으로 백업합니다.
+
+    reflink → (원본이 곧 교체될 경우) 이름 변경 → 전체 복사 순서로 시도합니다.
+
+    Args:
+        local_path (Path): 백업할 로컬 파일 경로.
+        backup_path (Path): 백업 저장 경로.
+        replace_original (bool): True면 원본이 곧 덮어써지므로 이동해도 됩니다.
+
+    Returns:
+        str: 사용한 방식 ('reflink', 'rename', 'copy').
+    """
+    backup_path.parent.mkdir(parents=True, exist_ok=True)
+    if _reflink_file(local_path, backup_path):
+        return 'reflink'
+    if replace_original:
+        try:
+            os.replace(local_path, backup_path)
+            return 'rename'
+        except OSError:
+            pass
+    shutil.copy2(local_path, backup_path)
+    return 'copy'
+
+
+def backup_conflict(local_path, backup_dir, rel_path, conflict_type, replace_original=False):
+    """로컬 충돌 파일을 conflicts_backup/<유형>/<상대 폴더> 아래에 백업합니다.
+
+    병렬 전송 중 다른 폴더의 같은 이름 파일이 같은 초에 백업되어도 경로가 겹치지
+    않도록 상대 폴더를 유지합니다.
+
+    Args:
+        local_path (Path): 백업할 로컬 파일 경로.
+        backup_dir (Path): 충돌 백업 루트 경로.
+        rel_path (str): 동기화 루트 기준 상대 경로.
+        conflict_type (str): 충돌 유형 식별자.
+        replace_original (bool): True면 원본이 곧 덮어써지므로 이동해도 됩니다.
+    """
+    backup_path = _build_conflict_backup_path(backup_dir, rel_path, conflict_type)
+    strategy = backup_local_file(local_path, backup_path, replace_original)
+    print(f"Backed up conflict to: {backup_path} ({strategy})")
+
+
+def _backup_created_timestamp(backup_name):
+    """충돌 백업 이름 끝의 생성 시각을 POSIX 타임스탬프로 반환합니다.
+
+    reflink/이름 변경/copy2 백업과 서버 측 복사본은 원본의 수정 시각을 그대로
+    가지므로, 보존 기간과 삭제 순서는 이름에 남긴 생성 시각으로 판단합니다.
+
+    Args:
+        backup_name (str): 백업 파일 이름.
+
+    Returns:
+        float | None: 생성 시각. 이름에 시각이 없으면 None.
+    """
+    match = BACKUP_TIMESTAMP_PATTERN.search(backup_name)
+    if match is None:
+        return None
+    try:
+        return datetime.strptime(match.group(1), BACKUP_TIMESTAMP_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+def prune_conflict_backups(backup_dir, max_age_days=None, max_total_bytes=None):
+    """conflicts_backup 의 오래된 백업을 보존 기간/용량 한도에 맞춰 삭제합니다.
+
+    백업의 나이는 이름에 남긴 생성 시각(_backup_created_timestamp)으로 판단하고,
+    이름에 시각이 없는 파일만 수정 시각을 사용합니다.
+    로그, 검증 리포트, 동기화 상태 폴더는 정리 대상에서 제외하고, 리비전 고정 메모는
+    prune_drive_conflict_backups 가 영구 보관 해제와 함께 정리합니다.
+
+    Args:
+        backup_dir (Path): 충돌 백업 루트 경로.
+        max_age_days (float | None): 이보다 오래된 백업을 삭제합니다. None이면 제한 없음.
+        max_total_bytes (int | None): 전체 백업 크기 한도. 초과분은 오래된 것부터 삭제합니다.
+
+    Returns:
+        int: 삭제한 파일 수.
+    """
+    if max_age_days is None and max_total_bytes is None:
+        return 0
+    protected = {SYNC_LOG_FILENAME, VERIFY_REPORT_FILENAME, STATE_DIR_NAME}
+    backups = []
+    for path in backup_dir.rglob('*'):
+        rel_parts = path.relative_to(backup_dir).parts
+        if rel_parts[0] in protected or not path.is_file():
+            continue
+        if path.name.endswith(REVISION_NOTE_SUFFIX):
+            continue
+        file_stat = path.stat()
+        created = _backup_created_timestamp(path.name)
+        if created is None:
+            created = file_stat.st_mtime
+        backups.append((created, file_stat.st_size, path))
+    backups.sort()
+
+    removed = 0
+    total_bytes = sum(size for _, size, _ in backups)
+    cutoff = None
+    if max_age_days is not None:
+        cutoff = datetime.now().timestamp() - max_age_days * 86400
+    for created, size, path in backups:
+        too_old = cutoff is not None and created < cutoff
+        too_big = max_total_bytes is not None and total_bytes > max_total_bytes
+        if not (too_old or too_big):
+            break
+        path.unlink()
+        total_bytes -= size
+        removed += 1
+
+    for path in sorted(backup_dir.rglob('*'), key=lambda p: len(p.parts), reverse=True):
+        if path.is_dir() and path.relative_to(backup_dir).parts[0] not in protected:
+            if not any(path.iterdir()):
+                path.rmdir()
+    if removed:
+        print(f"Pruned conflict backups: {removed} file(s)")
+    return removed
+
+
+def prune_drive_conflict_backups(
+    service,
+    root_folder_id,
+    backup_dir,
+    max_age_days=None,
+    max_total_bytes=None,
+    limiter=None,
+    list_limiter=None,
+):
+    """Drive 쪽 충돌 백업을 보존 기간/용량 한도에 맞춰 정리합니다.
+
+    --drive-backup-mode copy 로 만든 Drive의 conflicts_backup 사본과 revision 으로
+    영구 보관한 리비전은 Drive 저장 용량을 쓰므로, 로컬 백업과 따로 같은 한도를
+    적용합니다. 사본은 삭제하고, 리비전은 영구 보관을 해제한 뒤 메모를 지웁니다.
+    이름에 생성 시각이 없는 Drive 항목은 이 도구가 만든 백업이 아니므로 건너뜁니다.
+
+    Args:
+        service: Google Drive API 서비스 객체.
+        root_folder_id (str): 동기화 루트 Drive 폴더 ID.
+        backup_dir (Path): 충돌 백업 루트 경로 (리비전 고정 메모 위치).
+        max_age_days (float | None): 이보다 오래된 백업을 정리합니다. None이면 제한 없음.
+        max_total_bytes (int | None): Drive 쪽 백업 전체 크기 한도.
+        limiter (AdaptiveConcurrency | None): 삭제/영구 보관 해제 요청의 동시 실행 수 제어기.
+        list_limiter (AdaptiveConcurrency | None): 백업 폴더 목록 조회 동시 실행 수 제어기.
+
+    Returns:
+        int: 정리한 백업 수.
+    """
+    if max_age_days is None and max_total_bytes is None:
+        return 0
+    backups = []
+    for folder in _list_drive_folders_named(service, root_folder_id, BACKUP_DIR_NAME, limiter):
+        copies, _ = get_drive_items(
+            service, folder['id'], workspace_files={}, limiter=list_limiter
+        )
+        for rel_path, record in copies.items():
+            created = _backup_created_timestamp(rel_path.rpartition('/')[2])
+            if created is not None:
+                backups.append((created, record.size or 0, 'copy', record.id))
+    for note_path in backup_dir.rglob(f'*{REVISION_NOTE_SUFFIX}'):
+        created = _backup_created_timestamp(note_path.name)
+        if created is None:
+            created = note_path.stat().st_mtime
+        note = json.loads(note_path.read_text(encoding='utf-8'))
+        backups.append((created, note.get('size') or 0, 'revision', note_path))
+    backups.sort(key=lambda backup: backup[0])
+
+    removed = 0
+    total_bytes = sum(size for _, size, _, _ in backups)
+    cutoff = None
+    if max_age_days is not None:
+        cutoff = datetime.now().timestamp() - max_age_days * 86400
+    for created, size, kind, target in backups:
+        too_old = cutoff is not None and created < cutoff
+        too_big = max_total_bytes is not None and total_bytes > max_total_bytes
+        if not (too_old or too_big):
+            break
+        if kind == 'copy':
+            _execute(service.files().delete(fileId=target, supportsAllDrives=True), limiter)
+        else:
+            note = json.loads(target.read_text(encoding='utf-8'))
+            try:
+                _execute(
+                    service.revisions().update(
+                        fileId=note['file_id'],
+                        revisionId=note['revision_id'],
+                        body={'keepForever': False},
+                    ),
+                    limiter,
+                )
+            except HttpError as error:
+                # 원본 파일이나 리비전이 이미 없으면 메모만 지웁니다.
+                if error.resp.status != 404:
+                    raise
+            target.unlink()
+        total_bytes -= size
+        removed += 1
+    if removed:
+        print(f"Pruned Drive conflict backups: {removed} item(s)")
+    return removed
+
+
+def partial_file_path(local_path):
+    """전송 중인 임시 파일 경로(<이름>.sync-part)를 반환합니다."""
+    return local_path.with_name(f"{local_path.name}{PARTIAL_FILE_SUFFIX}")
+
+
+def download_file(service, file_id, local_path):
+    """Drive 파일을 임시 파일에 받은 뒤 원래 경로로 교체합니다.
+
+    청크 사이마다 중단 요청을 확인하며, 중단되면 임시 파일을 지우므로
+    반쯤 받은 파일이 동기화 경로에 남지 않습니다.
+
+    Raises:
+        SyncInterrupted: 다운로드 중 중단이 요청된 경우.
+    """
+    request = service.files().get_media(fileId=file_id)
+    local_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = partial_file_path(local_path)
+    try:
+        with io.FileIO(tmp_path, 'wb') as fh:
+            downloader = MediaIoBaseDownload(fh, request)
+            done = False
+            while not done:
+                if STOP_REQUESTED.is_set():
+                    raise SyncInterrupted(f"Download interrupted: {local_path}")
+                status, done = downloader.next_chunk()
+                print(f"Download {int(status.progress() * 100)}%")
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, local_path)
 
+def upload_file(service, local_path, drive_name, parent_id):
+    file_metadata = {'name': drive_name, 'parents': [parent_id]}
+    media = MediaFileUpload(str(local_path), resumable=True)
+    return service.files().create(
+        body=file_metadata,
+        media_body=media,
+        fields='id, name, size, md5Checksum, modifiedTime, mimeType',
+    ).execute()
 
-def _build_conflict_backup_path(backup_dir, rel_path, conflict_type):
-    """충돌 백업 파일 경로를 생성합니다.
+
+def parse_export_formats(specs):
+    """--export-format 값(종류=확장자)을 문서 종류별 형식 설정으로 변환합니다.
+
+    Args:
+        specs (list[str] | None): 'document=pdf' 형식 문자열 목록.
+
+    Returns:
+        dict[str, str]: 문서 종류별 내보내기 확장자.
+
+    Raises:
+        ValueError: 알 수 없는 종류이거나 지원하지 않는 형식인 경우.
+    """
+    formats = dict(DEFAULT_EXPORT_FORMATS)
+    for spec in specs or []:
+        kind, _, ext = spec.partition('=')
+        kind = kind.strip().lower()
+        ext = ext.strip().lower().lstrip('.')
+        if kind not in EXPORT_MIME_TYPES:
+            raise ValueError(
+                f"알 수 없는 문서 종류 '{kind}' (가능: {', '.join(EXPORT_MIME_TYPES)})"
+            )
+        if ext not in EXPORT_MIME_TYPES[kind]:
+            raise ValueError(
+                f"'{kind}'은(는) '{ext}' 형식을 지원하지 않습니다 "
+                f"(가능: {', '.join(EXPORT_MIME_TYPES[kind])})"
+            )
+        formats[kind] = ext
+    return formats
+
+
+def load_export_index(backup_dir, shard=None):
+    """내보내기 캐시 인덱스(파일 ID -> 마지막 내보내기 정보)를 읽습니다.
 
     Args:
         backup_dir (Path): 충돌 백업 루트 경로.
-        rel_path (str): 동기화 루트 기준 상대 경로.
-        conflict_type (str): 충돌 유형 식별자.
+        shard (ShardSpec | None): 샤드 지정.
 
     Returns:
-        Path: 충돌 백업 저장 경로.
+        dict[str, dict]: Drive 파일 ID별 내보내기 기록.
     """
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    path_obj = Path(rel_path)
-    backup_name = f"{path_obj.name}__{conflict_type}_{timestamp}"
-    return backup_dir / conflict_type / path_obj.parent / backup_name
+    index_path = get_state_dir(backup_dir, shard) / EXPORT_INDEX_FILENAME
+    if not index_path.exists():
+        return {}
+    try:
+        return json.loads(index_path.read_text(encoding='utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        print(f"Ignoring corrupted export index: {index_path}")
+        return {}
 
 
-def move_local_file_to_conflict_backup(local_path, backup_dir, rel_path, conflict_type):
-    """로컬 충돌 파일을 conflicts_backup으로 이동합니다.
+def save_export_index(backup_dir, export_index, shard=None):
+    """내보내기 캐시 인덱스를 저장합니다.
 
     Args:
-        local_path (Path): 이동할 로컬 파일 경로.
         backup_dir (Path): 충돌 백업 루트 경로.
-        rel_path (str): 동기화 루트 기준 상대 경로.
-        conflict_type (str): 충돌 유형 식별자.
+        export_index (dict[str, dict]): Drive 파일 ID별 내보내기 기록.
+        shard (ShardSpec | None): 샤드 지정.
+    """
+    state_dir = get_state_dir(backup_dir, shard)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    (state_dir / EXPORT_INDEX_FILENAME).write_text(
+        json.dumps(export_index, ensure_ascii=False, sort_keys=True),
+        encoding='utf-8',
+    )
+
+
+def export_expected_files(export_index):
+    """내보내기 인덱스를 Drive 쪽 기대 파일 메타데이터 형식으로 변환합니다.
+
+    내보낸 파일은 Drive에 바이너리로 존재하지 않으므로 다이제스트/검증에서
+    Drive 쪽 항목으로 간주해 '로컬에만 있는 파일'로 잡히지 않게 합니다.
+
+    Args:
+        export_index (dict[str, dict]): Drive 파일 ID별 내보내기 기록.
+
+    Returns:
+        dict[str, DriveFileRecord]: 로컬 상대 경로 기준 기대 파일 메타데이터.
+    """
+    return {
+        sys.intern(entry['path']): DriveFileRecord(
+            file_id,
+            size=entry.get('size'),
+            md5=entry.get('md5'),
+        )
+        for file_id, entry in export_index.items()
+    }
+
+
+def plan_workspace_exports(
+    workspace_files,
+    export_formats,
+    export_index,
+    sync_dir,
+    drive_files,
+    rules,
+):
+    """내보내기가 필요한 Google Workspace 문서를 고릅니다.
+
+    파일 ID + version/modifiedTime + 형식이 인덱스와 같고 로컬 사본이 있으면
+    다시 내보내지 않습니다.
+
+    Args:
+        workspace_files (dict[str, DriveFileRecord]): 상대 경로 기준 Workspace 문서 메타데이터.
+        export_formats (dict[str, str]): 문서 종류별 내보내기 확장자.
+        export_index (dict[str, dict]): Drive 파일 ID별 내보내기 기록.
+        sync_dir (Path): 로컬 동기화 루트 경로.
+        drive_files (dict[str, DriveFileRecord]): 바이너리 Drive 파일 메타데이터.
+        rules (SyncRules): 선택 동기화 규칙.
+
+    Returns:
+        list[dict]: 내보내기 작업 목록.
+    """
+    jobs = []
+    for rel_name, item in sorted(workspace_files.items()):
+        kind = GOOGLE_WORKSPACE_KINDS[item.mime_type]
+        ext = export_formats[kind]
+        target = f"{rel_name}.{ext}"
+        if target in drive_files or rules.is_excluded(target):
+            print(f"Skipping Google file export (target path in use or excluded): {target}")
+            continue
+        cached = export_index.get(item.id)
+        local_path = sync_dir / target
+        if (
+            cached
+            and cached.get('path') == target
+            and cached.get('version') == item.version
+            and cached.get('modifiedTime') == item.modified_time
+            and local_path.exists()
+        ):
+            continue
+        jobs.append({
+            'path': target,
+            'file_id': item.id,
+            'export_mime': EXPORT_MIME_TYPES[kind][ext],
+            'version': item.version,
+            'modifiedTime': item.modified_time,
+            'local_path': local_path,
+            'previous_md5': cached.get('md5') if cached else None,
+        })
+    return jobs
+
+
+def export_file(service, file_id, mime_type, local_path):
+    """Google Workspace 문서를 지정 형식으로 내보내 로컬에 저장합니다.
+
+    임시 파일에 받은 뒤 교체하므로 중단되어도 기존 파일이 깨지지 않습니다.
+
+    Args:
+        service: Google Drive API 서비스 객체.
+        file_id (str): Drive 파일 ID.
+        mime_type (str): 내보내기 MIME 타입.
+        local_path (Path): 저장할 로컬 경로.
+    """
+    request = service.files().export_media(fileId=file_id, mimeType=mime_type)
+    local_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = partial_file_path(local_path)
+    with io.FileIO(tmp_path, 'wb') as fh:
+        downloader = MediaIoBaseDownload(fh, request)
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+    os.replace(tmp_path, local_path)
+
+
+class WorkspaceExporter:
+    """Google Workspace 문서 내보내기를 전용 스레드 풀에서 실행합니다.
+
+    내보내기는 느리고 할당량 소모가 크므로 일반 바이너리 전송과 분리된
+    제한된 작업자 수로 백그라운드에서 진행합니다. limiter 를 주면 그 제한 안에서
+    실행되어 할당량 초과 시 백오프/재시도하고 동시 내보내기 수를 줄입니다.
+    내보내기 지연이 전송 동시 실행 수 조정에 섞이지 않도록 전송과 다른 전용
+    limiter 를 사용해야 합니다.
+    """
+
+    def __init__(self, service_factory, max_workers=DEFAULT_EXPORT_WORKERS, limiter=None):
+        self._service_factory = service_factory
+        self._limiter = limiter
+        self._thread_state = threading.local()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='export',
+        )
+        self._futures = []
+
+    def _service(self):
+        service = getattr(self._thread_state, 'service', None)
+        if service is None:
+            service = self._service_factory()
+            self._thread_state.service = service
+        return service
+
+    def _run(self, job):
+        export_args = (self._service(), job['file_id'], job['export_mime'], job['local_path'])
+        if self._limiter is None:
+            export_file(*export_args)
+        else:
+            self._limiter.call(export_file, *export_args)
+        file_stat = job['local_path'].stat()
+        print(f"Exported from Drive: {job['path']}")
+        return dict(
+            job,
+            size=file_stat.st_size,
+            md5=_compute_file_md5(job['local_path']),
+            modified=file_stat.st_mtime,
+            mtime_ns=file_stat.st_mtime_ns,
+        )
+
+    def submit(self, job):
+        """내보내기 작업을 예약합니다."""
+        self._futures.append((job, self._executor.submit(self._run, job)))
+
+    def cancel_pending(self):
+        """아직 시작하지 않은 작업을 취소합니다. 진행 중인 작업은 끝까지 실행합니다."""
+        self._futures = [(job, future) for job, future in self._futures if not future.cancel()]
+
+    def wait(self):
+        """예약된 작업이 끝날 때까지 기다립니다.
+
+        Returns:
+            list[dict]: 성공한 작업 결과 (size/md5/modified 포함).
+        """
+        results = []
+        for job, future in self._futures:
+            try:
+                results.append(future.result())
+            except Exception as error:  # 개별 문서 실패가 전체 동기화를 멈추지 않도록 함
+                print(f"Export failed: {job['path']} ({error})")
+        self._executor.shutdown()
+        self._futures = []
+        return results
+
+
+def _iter_folder_with_parents(rel_folder_path):
+    """상대 폴더 경로와 그 상위 폴더 경로들을 모두 반환합니다.
+
+    Args:
+        rel_folder_path (str | Path): 동기화 루트 기준 상대 폴더 경로.
+
+    Returns:
+        list[str]: 자신을 포함한 상위 폴더 경로 목록. 루트('.')는 제외합니다.
+    """
+    path_obj = Path(rel_folder_path)
+    return [str(path) for path in (path_obj, *path_obj.parents) if str(path) != '.']
+
+
+class SyncLedger:
+    """동기화 중 실제로 적용한 작업을 순서대로 기록하는 장부입니다.
+
+    초기 Drive/Local 스냅샷에 장부를 재생하면 전체 목록을 다시 조회하거나
+    로컬 파일을 다시 해시하지 않고도 동기화 후 상태를 계산할 수 있습니다.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self._lock = threading.Lock()
+
+    def record(self, op, rel_path, **fields):
+        """작업 하나를 장부에 추가합니다.
+
+        Args:
+            op (str): 작업 유형 ('local_mkdir', 'local_backup', 'drive_mkdir',
+                'download', 'upload', 'export').
+            rel_path (str): 동기화 루트 기준 상대 경로.
+            **fields: 반환된 파일 ID, 결과 크기/MD5 등 작업별 부가 정보.
+        """
+        entry = {'op': op, 'path': rel_path}
+        entry.update(fields)
+        # 파일 전송은 여러 스레드에서 기록하므로 잠금 안에서 추가합니다.
+        with self._lock:
+            self.entries.append(entry)
+
+    def record_download(self, rel_path, drive_file, local_path):
+        """다운로드 결과를 기록합니다. 크기와 수정 시각은 로컬 stat 값을 사용합니다."""
+        file_stat = local_path.stat()
+        self.record(
+            'download',
+            rel_path,
+            file_id=drive_file.id,
+            size=file_stat.st_size,
+            md5=drive_file.md5,
+            modified=file_stat.st_mtime,
+            mtime_ns=file_stat.st_mtime_ns,
+        )
+
+    def record_upload(self, rel_path, uploaded):
+        """업로드 API가 반환한 파일 ID/크기/MD5를 기록합니다."""
+        self.record(
+            'upload',
+            rel_path,
+            file_id=uploaded['id'],
+            size=uploaded.get('size'),
+            md5=uploaded.get('md5Checksum'),
+            modified_time=uploaded.get('modifiedTime'),
+            mime_type=uploaded.get('mimeType'),
+        )
+
+    def apply(self, sync_dir, drive_files, drive_folders, local_files, local_folders):
+        """초기 스냅샷에 장부를 재생해 현재 상태를 계산합니다.
+
+        입력 컬렉션은 변경하지 않고 새 컬렉션을 반환합니다.
+
+        Args:
+            sync_dir (Path): 로컬 동기화 루트 경로.
+            drive_files (dict[str, DriveFileRecord]): 초기 Drive 파일 메타데이터.
+            drive_folders (set[str]): 초기 Drive 폴더 경로 집합.
+            local_files (dict[str, LocalFileRecord]): 초기 로컬 파일 메타데이터.
+            local_folders (set[str]): 초기 로컬 폴더 경로 집합.
+
+        Returns:
+            tuple[dict[str, DriveFileRecord], set[str], dict[str, LocalFileRecord], set[str]]:
+                (Drive 파일, Drive 폴더, 로컬 파일, 로컬 폴더).
+        """
+        drive_files = dict(drive_files)
+        drive_folders = set(drive_folders)
+        local_files = dict(local_files)
+        local_folders = set(local_folders)
+
+        for entry in self.entries:
+            op = entry['op']
+            rel_path = entry['path']
+            if op == 'local_mkdir':
+                local_folders.update(_iter_folder_with_parents(rel_path))
+            elif op == 'local_backup':
+                local_files.pop(rel_path, None)
+            elif op == 'drive_mkdir':
+                drive_folders.update(_iter_folder_with_parents(rel_path))
+            elif op in ('download', 'export'):
+                local_files[rel_path] = LocalFileRecord(
+                    size=entry['size'],
+                    modified=entry['modified'],
+                    mtime_ns=entry.get('mtime_ns'),
+                    md5=entry['md5'],
+                )
+            elif op == 'upload':
+                drive_files[rel_path] = DriveFileRecord(
+                    entry['file_id'],
+                    size=entry['size'],
+                    md5=entry['md5'],
+                    modified_time=entry['modified_time'],
+                    mime_type=entry['mime_type'],
+                )
+                drive_folders.update(_iter_folder_with_parents(Path(rel_path).parent))
+                local_info = local_files.get(rel_path)
+                if local_info is not None and local_info.md5 is None:
+                    # 업로드 응답의 MD5로 아직 계산하지 않은 로컬 MD5를 채웁니다.
+                    local_files[rel_path] = LocalFileRecord(
+                        size=local_info.size,
+                        modified=local_info.modified,
+                        mtime_ns=local_info.mtime_ns,
+                        md5=entry['md5'],
+                        fingerprint=local_info.fingerprint,
+                    )
+        return drive_files, drive_folders, local_files, local_folders
+
+
+class SyncMetrics:
+    """동기화 실행 지표(항목 수, 작업 수, 전송 바이트, 단계별 소요 시간, 동시 실행 수)를 모읍니다.
+
+    --metrics-json 으로 저장하며, 샤드 코디네이터는 여러 작업자의 지표를 merge 로 합칩니다.
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.timings: Dict[str, float] = {}
+        self.gauges: Dict[str, int] = {}
+        self._started = time.monotonic()
+
+    def add(self, name, amount=1):
+        """카운터를 증가시킵니다."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_concurrency(self, limiter):
+        """동시 실행 수 제어기의 현재/최대 동시 실행 수, 요청/초과 수, 지연 분위수를 기록합니다.
+
+        Args:
+            limiter (AdaptiveConcurrency): 목록 조회 또는 전송 제어기.
+        """
+        name = limiter.name
+        self.gauges[f"{name}_concurrency"] = limiter.limit
+        self.gauges[f"{name}_concurrency_peak"] = limiter.peak
+        self.add(f"{name}_requests", limiter.requests)
+        self.add(f"{name}_throttled", limiter.throttled)
+        self.add(f"{name}_concurrency_increases", limiter.increases)
+        self.add(f"{name}_concurrency_decreases", limiter.decreases)
+        p50, p95 = limiter.latency_percentiles()
+        self.timings[f"{name}_latency_p50"] = p50
+        self.timings[f"{name}_latency_p95"] = p95
+
+    def record_credential_pool(self, pool):
+        """자격 증명 풀의 구성원 수, 정상 구성원 수, 전환/초과/갱신 실패 횟수를 기록합니다.
+
+        Args:
+            pool (CredentialPool): 이번 실행의 자격 증명 풀.
+        """
+        self.gauges['credentials'] = len(pool.members)
+        self.gauges['credentials_healthy'] = pool.healthy_count()
+        self.add('credential_failovers', pool.failovers)
+        self.add('credential_throttled', sum(member.throttled for member in pool.members))
+        self.add(
+            'credential_refresh_failures',
+            sum(member.refresh_failures for member in pool.members),
+        )
+
+    @contextmanager
+    def timed(self, phase):
+        """with 블록의 소요 시간(초)을 단계 이름으로 누적합니다."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.timings[phase] = self.timings.get(phase, 0.0) + time.monotonic() - started
+
+    def record_ledger(self, ledger):
+        """장부에 기록된 작업 수와 전송 바이트를 카운터에 더합니다.
+
+        Args:
+            ledger (SyncLedger): 이번 실행의 작업 장부.
+        """
+        for entry in ledger.entries:
+            self.add(f"ops_{entry['op']}")
+            if entry['op'] in ('download', 'export'):
+                self.add('bytes_downloaded', entry.get('size') or 0)
+            elif entry['op'] == 'upload':
+                self.add('bytes_uploaded', _normalize_size(entry.get('size')) or 0)
+
+    def to_dict(self):
+        """JSON으로 저장할 수 있는 dict로 변환합니다."""
+        timings = dict(self.timings)
+        timings['total'] = time.monotonic() - self._started
+        return {
+            'counters': dict(sorted(self.counters.items())),
+            'timings': {name: round(value, 3) for name, value in sorted(timings.items())},
+            'gauges': dict(sorted(self.gauges.items())),
+        }
+
+    def save(self, output_path):
+        """지표를 JSON 파일로 저장합니다.
+
+        Args:
+            output_path (Path): 저장할 파일 경로.
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(
+            json.dumps(self.to_dict(), ensure_ascii=False, indent=2),
+            encoding='utf-8',
+        )
+        print(f"Metrics exported: {output_path}")
+
+    @staticmethod
+    def merge(metrics_list):
+        """여러 작업자의 지표 dict를 합칩니다.
+
+        카운터는 더하고, 작업자가 병렬로 실행되므로 소요 시간은 최댓값을 사용합니다.
+        동시 실행 수 게이지는 작업자들이 동시에 보내는 요청 수이므로 더합니다.
+
+        Args:
+            metrics_list (list[dict]): SyncMetrics.to_dict() 결과 목록.
+
+        Returns:
+            dict: 합친 지표.
+        """
+        counters: Dict[str, int] = {}
+        timings: Dict[str, float] = {}
+        gauges: Dict[str, int] = {}
+        for metrics in metrics_list:
+            for name, value in metrics.get('counters', {}).items():
+                counters[name] = counters.get(name, 0) + value
+            for name, value in metrics.get('timings', {}).items():
+                timings[name] = max(timings.get(name, 0.0), value)
+            for name, value in metrics.get('gauges', {}).items():
+                gauges[name] = gauges.get(name, 0) + value
+        return {
+            'counters': dict(sorted(counters.items())),
+            'timings': dict(sorted(timings.items())),
+            'gauges': dict(sorted(gauges.items())),
+        }
+
+
+FOLDER_OPERATIONS = ('local_mkdir', 'replace_local_file_with_folder', 'drive_mkdir')
+
+
+def plan_sync_operations(
+    drive_files,
+    drive_folders,
+    local_files,
+    local_folders,
+    skip_upload_paths=(),
+):
+    """Drive/로컬 스냅샷을 한 번 병합 비교해 동기화 작업 목록을 만듭니다.
+
+    작업은 기존 단계 순서(1. 로컬 폴더 생성, 2. Drive 폴더 생성, 3. 다운로드,
+    4. 업로드, 5. 충돌 처리)로 정렬되며, 같은 단계 안에서는 부모가 자식보다 먼저 옵니다.
+
+    Args:
+        drive_files (dict[str, DriveFileRecord]): Drive 파일 메타데이터.
+        drive_folders (set[str]): Drive 폴더 경로 집합.
+        local_files (dict[str, LocalFileRecord]): 로컬 파일 메타데이터.
+        local_folders (set[str]): 로컬 폴더 경로 집합.
+        skip_upload_paths (Container[str]): 업로드하지 않을 로컬 파일 경로 (내보내기 사본 등).
+
+    Returns:
+        list[dict]: {'op', 'path'[, 'file_id']} 형식의 작업 목록.
+    """
+    steps = ([], [], [], [], [])
+    for path, kind, drive_item, local_item in iter_tree_diff(
+        iter_sorted_entries(drive_files, drive_folders),
+        iter_sorted_entries(local_files, local_folders),
+    ):
+        if kind == DIFF_DRIVE_ONLY:
+            if drive_item[0]:
+                steps[0].append({'op': 'local_mkdir', 'path': path})
+            else:
+                steps[2].append({'op': 'download', 'path': path, 'file_id': drive_item[1].id})
+        elif kind == DIFF_LOCAL_ONLY:
+            if local_item[0]:
+                steps[1].append({'op': 'drive_mkdir', 'path': path})
+            elif path not in skip_upload_paths:
+                steps[3].append({'op': 'upload', 'path': path})
+        elif kind == DIFF_TYPE_CONFLICT:
+            if drive_item[0]:
+                steps[0].append({'op': 'replace_local_file_with_folder', 'path': path})
+            else:
+                steps[1].append({'op': 'drive_mkdir', 'path': path})
+                steps[2].append(
+                    {'op': 'backup_drive_file', 'path': path, 'file_id': drive_item[1].id}
+                )
+        elif kind == DIFF_CHANGED:
+            steps[4].append(
+                {'op': 'resolve_conflict', 'path': path, 'file_id': drive_item[1].id}
+            )
+    return [operation for step in steps for operation in step]
+
+
+def print_operation_preview(operations, export_jobs=()):
+    """계획한 작업을 실행하지 않고 출력합니다 (--dry-run).
+
+    Args:
+        operations (list[dict]): plan_sync_operations 가 만든 작업 목록.
+        export_jobs (list[dict]): plan_workspace_exports 가 만든 내보내기 작업 목록.
+    """
+    counts = {}
+    print(f"Dry run: {len(operations) + len(export_jobs)} planned operation(s)")
+    for operation in operations:
+        counts[operation['op']] = counts.get(operation['op'], 0) + 1
+        print(f"  {operation['op']}: {operation['path']}")
+    for job in export_jobs:
+        counts['export'] = counts.get('export', 0) + 1
+        print(f"  export: {job['path']}")
+    if counts:
+        print("Summary: " + ", ".join(f"{op}={count}" for op, count in counts.items()))
+    else:
+        print("Nothing to do.")
+
+
+class SyncExecutor:
+    """plan_sync_operations 가 만든 작업을 실행하고 결과를 장부에 기록합니다.
+
+    limiter 와 service_factory 를 주면 파일 작업을 전송 풀에서 병렬로 실행합니다.
+    작업자 스레드는 각자의 서비스 객체를 쓰고, 폴더 캐시는 잠금으로 보호합니다.
+    """
+
+    def __init__(
+        self,
+        service,
+        sync_dir,
+        backup_dir,
+        drive_folder_id,
+        drive_files,
+        local_files,
+        ledger,
+        drive_backup_mode='download',
+        limiter=None,
+        service_factory=None,
+    ):
+        self.service = service
+        self.sync_dir = sync_dir
+        self.backup_dir = backup_dir
+        self.drive_folder_id = drive_folder_id
+        self.drive_files = drive_files
+        self.local_files = local_files
+        self.ledger = ledger
+        self.drive_backup_mode = drive_backup_mode
+        self.limiter = limiter
+        self.service_factory = service_factory
+        self.folder_cache: Dict[Tuple[str, str], str] = {}
+        self._folder_lock = threading.Lock()
+        self._thread_state = threading.local()
+
+    def _service(self):
+        if self.service_factory is None or threading.current_thread() is threading.main_thread():
+            return self.service
+        service = getattr(self._thread_state, 'service', None)
+        if service is None:
+            service = self.service_factory()
+            self._thread_state.service = service
+        return service
+
+    def _call(self, fn, *args, units=1.0):
+        if self.limiter is None:
+            return fn(*args)
+        return self.limiter.call(fn, *args, units=units)
+
+    def run(self, operation):
+        """작업 하나를 실행합니다.
+
+        Args:
+            operation (dict): plan_sync_operations 가 반환한 작업.
+        """
+        getattr(self, f"_run_{operation['op']}")(operation['path'])
+
+    def run_all(self, operations, on_done):
+        """(순번, 작업) 목록을 실행하고 작업이 끝날 때마다 on_done(순번)을 호출합니다.
+
+        limiter 가 있고 모두 파일 작업이면 전송 풀에서 병렬로, 그 밖에는 순서대로
+        실행합니다. on_done 은 항상 호출한 스레드에서 불립니다.
+        작업 하나가 실패하거나 중단이 요청되면 새 작업을 시작하지 않고
+        진행 중인 작업이 끝나기를 기다린 뒤 첫 오류를 다시 발생시킵니다.
+
+        Args:
+            operations (list[tuple[int, dict]]): 실행할 (순번, 작업) 목록.
+            on_done (Callable[[int], None]): 완료 콜백.
+
+        Raises:
+            SyncInterrupted: 중단이 요청된 경우.
+        """
+        parallel = self.limiter is not None and self.service_factory is not None and all(
+            operation['op'] not in FOLDER_OPERATIONS for _, operation in operations
+        )
+        if not parallel:
+            for seq, operation in operations:
+                if STOP_REQUESTED.is_set():
+                    raise SyncInterrupted("Stopped before remaining planned operations")
+                self.run(operation)
+                on_done(seq)
+            return
+
+        queue = iter(operations)
+        pending = {}
+        error = None
+        max_pending = 2 * self.limiter.max_limit
+        with ThreadPoolExecutor(
+            max_workers=self.limiter.max_limit,
+            thread_name_prefix='transfer',
+        ) as pool:
+            while True:
+                # 중단/실패 시 곧바로 멈출 수 있도록 풀 크기의 두 배까지만 미리 넣습니다.
+                while error is None and not STOP_REQUESTED.is_set() and len(pending) < max_pending:
+                    item = next(queue, None)
+                    if item is None:
+                        break
+                    seq, operation = item
+                    pending[pool.submit(self.run, operation)] = seq
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    seq = pending.pop(future)
+                    try:
+                        future.result()
+                    except BaseException as op_error:
+                        error = error or op_error
+                        continue
+                    on_done(seq)
+        if error is not None:
+            raise error
+        if STOP_REQUESTED.is_set() and next(queue, None) is not None:
+            raise SyncInterrupted("Stopped before remaining planned operations")
+
+    def _run_local_mkdir(self, rel_path):
+        print(f"New folder from Drive: {rel_path}")
+        (self.sync_dir / rel_path).mkdir(parents=True, exist_ok=True)
+        self.ledger.record('local_mkdir', rel_path)
+
+    def _run_replace_local_file_with_folder(self, rel_path):
+        print(f"Path conflict (Drive folder vs Local file): {rel_path}")
+        local_path = self.sync_dir / rel_path
+        move_local_file_to_conflict_backup(
+            local_path,
+            self.backup_dir,
+            rel_path,
+            'drive_folder_vs_local_file',
+        )
+        self.ledger.record('local_backup', rel_path)
+        local_path.mkdir(parents=True, exist_ok=True)
+        self.ledger.record('local_mkdir', rel_path)
+
+    def _run_drive_mkdir(self, rel_path):
+        print(f"New folder from Local: {rel_path}")
+        folder_id = ensure_drive_folder_path(
+            self.service, self.drive_folder_id, rel_path, self.folder_cache, self.limiter
+        )
+        self.ledger.record('drive_mkdir', rel_path, file_id=folder_id)
+
+    def _run_download(self, rel_path):
+        print(f"New from Drive: {rel_path}")
+        self.download(rel_path)
+
+    def _run_backup_drive_file(self, rel_path):
+        print(f"Path conflict (Drive file vs Local folder): {rel_path}")
+        self._backup_drive_file(rel_path)
+
+    def _backup_drive_file(self, rel_path):
+        # 폴더 캐시를 쓰는 백업 폴더 조회/생성만 잠그고, 다운로드/복사는 병렬로 둡니다.
+        drive_file = self.drive_files[rel_path]
+        backup_drive_conflict_file(
+            self._service(),
+            drive_file.id,
+            self.backup_dir,
+            rel_path,
+            'drive_file_vs_local_folder',
+            self.drive_backup_mode,
+            self.drive_folder_id,
+            self.folder_cache,
+            folder_lock=self._folder_lock,
+            limiter=self.limiter,
+            units=1 + (drive_file.size or 0) / (1 << 20),
+        )
+
+    def _run_upload(self, rel_path):
+        print(f"New from Local: {rel_path}")
+        self.upload(rel_path)
+
+    def _run_resolve_conflict(self, rel_path):
+        drive_file = self.drive_files[rel_path]
+        local_info = self.local_files[rel_path]
+        # 타임스탬프 비교
+        drive_time, local_time = _conflict_times(drive_file.modified_time, local_info.modified)
+
+        print(f"Conflict detected: {rel_path} (Drive: {drive_time}, Local: {local_time})")
+
+        # 로컬 백업 생성 (다운로드로 덮어쓸 경우 원본을 이동해도 됨)
+        drive_wins = drive_time > local_time
+        backup_conflict(
+            self.sync_dir / rel_path,
+            self.backup_dir,
+            rel_path,
+            'modified_on_both',
+            replace_original=drive_wins,
+        )
+
+        if drive_wins:
+            print(f"Drive newer -> Download: {rel_path}")
+            self.download(rel_path)
+        else:
+            print(f"Local newer -> Upload: {rel_path}")
+            self.upload(rel_path)
+
+    def download(self, rel_path):
+        """Drive 파일을 받아 로컬 경로에 쓰고 장부에 기록합니다."""
+        drive_file = self.drive_files[rel_path]
+        local_path = self.sync_dir / rel_path
+        self._call(
+            download_file,
+            self._service(),
+            drive_file.id,
+            local_path,
+            units=1 + (drive_file.size or 0) / (1 << 20),
+        )
+        self.ledger.record_download(rel_path, drive_file, local_path)
+
+    def upload(self, rel_path):
+        """로컬 파일을 Drive 부모 폴더에 올리고 장부에 기록합니다."""
+        with self._folder_lock:
+            parent_id = ensure_drive_parent_folder(
+                self._service(), self.drive_folder_id, rel_path, self.folder_cache, self.limiter
+            )
+        local_info = self.local_files.get(rel_path)
+        uploaded = self._call(
+            upload_file,
+            self._service(),
+            self.sync_dir / rel_path,
+            Path(rel_path).name,
+            parent_id,
+            units=1 + ((local_info.size if local_info else 0) or 0) / (1 << 20),
+        )
+        self.ledger.record_upload(rel_path, uploaded)
+
+
+class SyncInterrupted(Exception):
+    """SIGINT/SIGTERM 으로 동기화 중단이 요청되어 작업을 멈췄을 때 발생합니다."""
+
+
+@contextmanager
+def handle_stop_signals():
+    """SIGINT/SIGTERM 을 받으면 즉시 종료하지 않고 STOP_REQUESTED 만 설정합니다.
+
+    진행 중인 작업은 청크/작업 단위로 마무리하고 저널을 fsync 한 뒤 멈춥니다.
+    두 번째 신호부터는 원래 처리기를 따릅니다 (SIGINT면 즉시 KeyboardInterrupt).
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    previous = {}
+
+    def _restore():
+        for signum, handler in previous.items():
+            signal.signal(signum, handler if handler is not None else signal.SIG_DFL)
+
+    def _handler(signum, frame):
+        print(f"Stop requested ({signal.Signals(signum).name}), finishing in-flight work...")
+        STOP_REQUESTED.set()
+        _restore()
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        previous[signum] = signal.signal(signum, _handler)
+    try:
+        yield
+    finally:
+        _restore()
+
+
+def _drive_record_fields(record):
+    return {
+        'id': record.id,
+        'size': record.size,
+        'md5': record.md5,
+        'modified_time': record.modified_time,
+        'mime_type': record.mime_type,
+        'version': record.version,
+    }
+
+
+def _local_record_fields(record):
+    return {
+        'size': record.size,
+        'modified': record.modified,
+        'mtime_ns': record.mtime_ns,
+        'md5': record.md5,
+    }
+
+
+def build_journal_record(seq, operation, drive_files, local_files):
+    """계획된 작업을 재개에 필요한 스냅샷 정보와 함께 저널 레코드로 만듭니다.
+
+    재개할 때 목록 조회/해시 없이 실행할 수 있도록 작업 대상의
+    Drive/로컬 메타데이터를 함께 기록합니다.
+
+    Args:
+        seq (int): 계획 내 작업 순번.
+        operation (dict): plan_sync_operations 가 만든 작업.
+        drive_files (dict[str, DriveFileRecord]): Drive 파일 메타데이터.
+        local_files (dict[str, LocalFileRecord]): 로컬 파일 메타데이터.
+
+    Returns:
+        dict: 저널 'op' 레코드.
+    """
+    record = {'type': 'op', 'seq': seq, **operation}
+    drive_file = drive_files.get(operation['path'])
+    if drive_file is not None:
+        record['drive'] = _drive_record_fields(drive_file)
+    local_info = local_files.get(operation['path'])
+    if local_info is not None:
+        record['local'] = _local_record_fields(local_info)
+    return record
+
+
+class SyncJournal:
+    """계획한 동기화 작업과 완료 여부를 기록하는 append-only 저널(JSONL)입니다.
+
+    실행을 시작할 때 계획 전체를 기록하고 작업이 끝날 때마다 'done' 레코드를
+    덧붙입니다. 'done' 레코드는 JOURNAL_FSYNC_BATCH 개 또는 JOURNAL_FSYNC_INTERVAL 초
+    단위로 묶어 fsync 하므로, 비정상 종료 직전의 완료 기록 일부는 유실될 수 있습니다.
+    재개 시에는 그런 작업도 validate_resumed_operation 으로 확인한 뒤 처리합니다.
+    """
+
+    def __init__(
+        self,
+        path,
+        fsync_batch=JOURNAL_FSYNC_BATCH,
+        fsync_interval=JOURNAL_FSYNC_INTERVAL,
+    ):
+        self.path = path
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @staticmethod
+    def load_unfinished(path):
+        """끝나지 않은 저널의 헤더와 남은 작업을 읽습니다.
+
+        Args:
+            path (Path): 저널 파일 경로.
+
+        Returns:
+            tuple[dict, list[dict]] | None: (헤더, 남은 'op' 레코드 목록).
+                저널이 없거나 정상 종료된 경우 None.
+        """
+        if not path.exists():
+            return None
+        header = None
+        records = {}
+        done = set()
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 기록 도중 중단되어 잘린 마지막 줄
+                    break
+                record_type = record.get('type')
+                if record_type == 'begin':
+                    header = record
+                elif record_type == 'op':
+                    records[record['seq']] = record
+                elif record_type == 'done':
+                    done.add(record['seq'])
+                elif record_type == 'end':
+                    return None
+        if header is None:
+            return None
+        return header, [records[seq] for seq in sorted(records) if seq not in done]
+
+    def begin(self, header, records):
+        """새 저널을 만들고 헤더와 계획된 작업 레코드를 기록합니다.
+
+        Args:
+            header (dict): 실행 정보 (시작 시각, Drive 폴더 ID, 샤드 등).
+            records (Iterable[dict]): build_journal_record 가 만든 작업 레코드.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._write({'type': 'begin', **header})
+        for record in records:
+            self._write(record)
+        self.sync()
+
+    def reopen(self):
+        """재개를 위해 기존 저널을 이어 쓰기 모드로 엽니다."""
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        self._file.write('\n')
+
+    def mark_done(self, seq):
+        """작업 완료를 기록합니다. fsync 는 묶어서 수행합니다.
+
+        Args:
+            seq (int): 완료한 작업 순번.
+        """
+        self._write({'type': 'done', 'seq': seq})
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.fsync_batch
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self.sync()
+
+    def sync(self):
+        """버퍼를 비우고 fsync 합니다."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def finish(self):
+        """모든 작업이 끝났음을 기록하고 저널을 닫습니다."""
+        self._write({'type': 'end'})
+        self.close()
+
+    def abandon(self, error):
+        """중단이 아닌 오류로 멈춘 실행을 끝난 것으로 기록하고 저널을 닫습니다.
+
+        일부만 적용된 계획을 그대로 재개하면 같은 오류가 반복될 수 있으므로,
+        다음 실행은 재개 대신 전체 비교로 남은 작업을 다시 계산합니다.
+
+        Args:
+            error (Exception): 실행을 멈춘 오류.
+        """
+        self._write({'type': 'end', 'error': f"{type(error).__name__}: {error}"})
+        self.close()
+
+    def close(self):
+        """남은 기록을 fsync 하고 저널을 닫습니다 (중단 시 재개 가능한 상태로 남김)."""
+        if self._file is None:
+            return
+        self.sync()
+        self._file.close()
+        self._file = None
+
+
+def _list_drive_files_named(service, parent_id, name):
+    """부모 폴더 아래에서 이름이 같은 (폴더가 아닌) 파일을 모두 조회합니다."""
+    escaped_name = _escape_drive_query_value(name)
+    results = service.files().list(
+        q=(
+            f"'{parent_id}' in parents and trashed=false and "
+            f"mimeType!='{FOLDER_MIME_TYPE}' and name='{escaped_name}'"
+        ),
+        fields='files(id, size, md5Checksum, modifiedTime, mimeType)',
+        supportsAllDrives=True,
+        includeItemsFromAllDrives=True,
+        pageSize=100,
+    ).execute()
+    return results.get('files', [])
+
+
+def _conflict_times(drive_modified_time, local_modified):
+    """충돌 판정에 쓰는 (Drive 수정 시각, 로컬 수정 시각)을 datetime 으로 반환합니다."""
+    return (
+        datetime.fromisoformat(drive_modified_time.rstrip('Z')),
+        datetime.fromtimestamp(local_modified),
+    )
+
+
+def validate_resumed_operation(record, sync_dir, service, drive_folder_id, folder_cache):
+    """중단된 저널의 작업을 다시 실행해도 되는지 저렴하게 확인합니다.
+
+    전체 목록 조회/해시 대신 대상 경로의 stat 과 (업로드, 로컬이 이긴 충돌만)
+    이름 조회 한 번으로 판단합니다. 이미 적용되었거나 그사이 대상이 바뀐 작업은 건너뛰며, 바뀐 항목은
+    다음 전체 동기화에서 다시 비교됩니다.
+
+    Args:
+        record (dict): 저널 'op' 레코드.
+        sync_dir (Path): 로컬 동기화 루트 경로.
+        service: Google Drive API 서비스 객체.
+        drive_folder_id (str): 동기화 루트 Drive 폴더 ID.
+        folder_cache (dict[tuple[str, str], str]): 폴더 조회 캐시.
+
+    Returns:
+        bool: 다시 실행해야 하면 True.
     """
-    backup_path = _build_conflict_backup_path(backup_dir, rel_path, conflict_type)
-    backup_path.parent.mkdir(parents=True, exist_ok=True)
-    shutil.move(str(local_path), str(backup_path))
-    print(f"Moved conflict file to backup: {backup_path}")
+    op = record['op']
+    local_path = sync_dir / record['path']
+    if op in ('local_mkdir', 'drive_mkdir', 'backup_drive_file'):
+        # 모두 멱등 작업입니다.
+        return True
+    if op == 'replace_local_file_with_folder':
+        return local_path.is_file()
+    if op == 'download':
+        # 다운로드는 임시 파일 교체로 끝나므로 파일이 있으면 이미 완료된 것입니다.
+        return not local_path.exists()
+
+    local = record.get('local') or {}
+    try:
+        file_stat = local_path.stat()
+    except FileNotFoundError:
+        file_stat = None
+    unchanged = (
+        file_stat is not None
+        and file_stat.st_size == local.get('size')
+        and file_stat.st_mtime_ns == local.get('mtime_ns')
+    )
 
+    def _uploaded(exclude_id=None):
+        # 같은 이름/크기의 Drive 파일이 있으면 업로드는 끝났고 완료 기록만 유실된 것입니다.
+        # 확인만 하므로 부모 폴더를 만들지 않고, 없으면 아직 올라가지 않은 것입니다.
+        parent_id = find_drive_parent_folder(
+            service, drive_folder_id, record['path'], folder_cache
+        )
+        if parent_id is None:
+            return False
+        return any(
+            item['id'] != exclude_id
+            and _normalize_size(item.get('size')) == file_stat.st_size
+            for item in _list_drive_files_named(service, parent_id, local_path.name)
+        )
 
-def download_drive_file_to_conflict_backup(service, file_id, backup_dir, rel_path, conflict_type):
-    """Drive 충돌 파일을 conflicts_backup으로 다운로드합니다.
+    if op == 'upload':
+        return unchanged and not _uploaded()
+    if op == 'resolve_conflict':
+        drive = record['drive']
+        drive_time, local_time = _conflict_times(drive['modified_time'], local['modified'])
+        if drive_time > local_time:
+            # 로컬 파일이 없으면 백업 이동 후 다운로드 도중 중단된 경우이므로 다시 받습니다.
+            return file_stat is None or unchanged
+        # 로컬이 이긴 충돌은 원본 옆에 새 파일을 올리므로 원본은 빼고 확인합니다.
+        return unchanged and not _uploaded(exclude_id=drive['id'])
+    return False
+
+
+def resume_sync_journal(
+    journal,
+    header,
+    pending,
+    service,
+    sync_dir,
+    backup_dir,
+    drive_folder_id,
+    drive_backup_mode='download',
+):
+    """끝나지 않은 저널의 남은 작업만 검증 후 다시 실행합니다.
 
     Args:
+        journal (SyncJournal): 이어 쓸 저널.
+        header (dict): 저널 헤더.
+        pending (list[dict]): 남은 'op' 레코드 목록.
         service: Google Drive API 서비스 객체.
-        file_id (str): Drive 파일 ID.
+        sync_dir (Path): 로컬 동기화 루트 경로.
         backup_dir (Path): 충돌 백업 루트 경로.
-        rel_path (str): 동기화 루트 기준 상대 경로.
-        conflict_type (str): 충돌 유형 식별자.
-    """
-    backup_path = _build_conflict_backup_path(backup_dir, rel_path, conflict_type)
-    print(f"Downloading conflict file to backup: {backup_path}")
-    download_file(service, file_id, backup_path)
+        drive_folder_id (str): 동기화 루트 Drive 폴더 ID.
+        drive_backup_mode (str): Drive 측 충돌 파일 백업 방식.
 
+    Returns:
+        SyncLedger: 재개 중 실제로 적용한 작업 장부.
 
-def backup_conflict(local_path, backup_dir):
-    backup_dir.mkdir(parents=True, exist_ok=True)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = backup_dir / f"{local_path.name}_{timestamp}"
-    shutil.copy2(local_path, backup_path)
-    print(f"Backed up conflict to: {backup_path}")
+    Raises:
+        SyncInterrupted: 재개 도중 다시 중단이 요청된 경우.
+        Exception: 작업이 실패한 경우. 저널은 끝난 것으로 기록되어 다시 재개되지 않습니다.
+    """
+    print(
+        f"Resuming interrupted sync from {header.get('started')}: "
+        f"{len(pending)} pending operation(s)"
+    )
+    drive_files = {}
+    local_files = {}
+    for record in pending:
+        drive = record.get('drive')
+        if drive is not None:
+            drive_files[record['path']] = DriveFileRecord(
+                drive['id'],
+                size=drive['size'],
+                md5=drive['md5'],
+                modified_time=drive['modified_time'],
+                mime_type=drive['mime_type'],
+                version=drive['version'],
+            )
+        local = record.get('local')
+        if local is not None:
+            local_files[record['path']] = LocalFileRecord(**local)
+
+    ledger = SyncLedger()
+    executor = SyncExecutor(
+        service,
+        sync_dir,
+        backup_dir,
+        drive_folder_id,
+        drive_files,
+        local_files,
+        ledger,
+        drive_backup_mode=drive_backup_mode,
+    )
+    journal.reopen()
+    skipped = 0
+    try:
+        for record in pending:
+            if STOP_REQUESTED.is_set():
+                raise SyncInterrupted("Stopped before resuming remaining operations")
+            rel_path = record['path']
+            if not validate_resumed_operation(
+                record, sync_dir, service, drive_folder_id, executor.folder_cache
+            ):
+                skipped += 1
+            elif record['op'] == 'resolve_conflict' and not (sync_dir / rel_path).exists():
+                # 로컬 사본은 이미 백업으로 옮겨졌으므로 Drive 쪽을 다시 받기만 합니다.
+                print(f"Resuming conflict download: {rel_path}")
+                executor.download(rel_path)
+            else:
+                executor.run({'op': record['op'], 'path': rel_path})
+            journal.mark_done(record['seq'])
+    except SyncInterrupted:
+        journal.close()
+        raise
+    except Exception as error:
+        journal.abandon(error)
+        raise
+    journal.finish()
+    print(f"Resume completed (skipped {skipped} already applied or changed operation(s)).")
+    return ledger
+
+
+def run_sync_verification(
+    sync_dir,
+    backup_dir,
+    drive_files,
+    drive_folders,
+    local_files,
+    local_folders,
+    verify_deep=False,
+    rehash_local=False,
+    verify_report_md=None,
+    shard=None,
+):
+    """Drive/Local 상태를 비교해 검증 리포트를 만들고 저장합니다.
 
-def download_file(service, file_id, local_path):
-    request = service.files().get_media(fileId=file_id)
-    local_path.parent.mkdir(parents=True, exist_ok=True)
-    fh = io.FileIO(local_path, 'wb')
-    downloader = MediaIoBaseDownload(fh, request)
-    done = False
-    while not done:
-        status, done = downloader.next_chunk()
-        print(f"Download {int(status.progress() * 100)}%")
-    fh.close()
+    Args:
+        sync_dir (Path): 로컬 동기화 루트 경로.
+        backup_dir (Path): 충돌 백업 루트 경로.
+        drive_files (dict[str, DriveFileRecord]): Drive 파일 메타데이터.
+        drive_folders (set[str]): Drive 폴더 경로 집합.
+        local_files (dict[str, LocalFileRecord]): 로컬 파일 메타데이터.
+        local_folders (set[str]): 로컬 폴더 경로 집합.
+        verify_deep (bool): True면 크기와 함께 MD5도 비교합니다.
+        rehash_local (bool): True면 비교 전에 로컬 MD5를 병렬로 다시 계산합니다.
+        verify_report_md (Path | None): 검증 결과 Markdown 출력 경로.
+        shard (ShardSpec | None): 샤드 실행이면 리포트를 샤드 상태 폴더에 저장합니다.
+
+    Returns:
+        bool: 검증 통과 여부.
+    """
+    if verify_deep and rehash_local:
+        print("Deep verification: hashing local files...")
+        md5_by_path = compute_local_md5_parallel(sync_dir, local_files)
+        local_files = {
+            rel_path: LocalFileRecord(
+                size=info.size,
+                modified=info.modified,
+                mtime_ns=info.mtime_ns,
+                md5=md5_by_path.get(rel_path),
+                fingerprint=info.fingerprint,
+            )
+            for rel_path, info in local_files.items()
+        }
+
+    is_ok, report = build_sync_verification_report(
+        drive_files,
+        drive_folders,
+        local_files,
+        local_folders,
+        compare_md5=verify_deep,
+    )
+    print(f"Verification result: {'PASS' if is_ok else 'FAIL'}")
+    export_verification_report_to_backup(backup_dir, report, shard)
+    if verify_report_md is not None:
+        export_verification_report(verify_report_md, report)
+    return is_ok
 
-def upload_file(service, local_path, drive_name, parent_id):
-    file_metadata = {'name': drive_name, 'parents': [parent_id]}
-    media = MediaFileUpload(str(local_path), resumable=True)
-    return service.files().create(body=file_metadata, media_body=media, fields='id').execute()['id']
 
 def sync(
     sync_dir,
@@ -694,9 +4487,35 @@ def sync(
     drive_tree_only=False,
     verify_sync=False,
     verify_report_md=None,
+    verify_deep=False,
+    verify_only=False,
+    drive_backup_mode='download',
+    backup_max_age_days=None,
+    backup_max_size_mb=None,
+    include_patterns=None,
+    exclude_patterns=None,
+    export_google_files=False,
+    export_formats=None,
+    export_workers=DEFAULT_EXPORT_WORKERS,
+    fingerprint_mode='auto',
+    shard=None,
+    metrics_json=None,
+    resume=True,
+    from_snapshot=False,
+    refresh_snapshot=False,
+    dry_run=False,
+    list_workers=DEFAULT_LIST_WORKERS,
+    transfer_workers=DEFAULT_TRANSFER_WORKERS,
+    credential_pool=None,
 ):
     """Drive 폴더와 로컬 폴더를 동기화합니다.
 
+    계획한 작업은 .sync_state/journal.jsonl 에 기록되며, 이전 실행이 중간에 멈췄으면
+    (resume=True) 전체 목록 조회/스캔 없이 남은 작업만 검증 후 이어서 실행합니다.
+    검증을 요청했으면 재개가 끝난 뒤 전체 비교와 검증을 이어서 수행합니다.
+    실행이 끝나면 Drive 목록을 .sync_state/drive_snapshot.sqlite 에 저장하고,
+    from_snapshot=True 면 Drive를 조회하지 않고 이 스냅샷으로 트리 출력/미리보기/검증을 합니다.
+
     Args:
         sync_dir (Path): 로컬 동기화 루트 경로.
         drive_folder_id (str): 동기화할 Drive 폴더 ID.
@@ -705,138 +4524,656 @@ def sync(
         drive_tree_only (bool): True면 트리 생성만 수행하고 종료.
         verify_sync (bool): True면 동기화 후 Drive/Local 일치 여부를 검증합니다.
         verify_report_md (Path | None): 검증 결과 Markdown 출력 경로.
+        verify_deep (bool): True면 검증 시 크기뿐 아니라 MD5까지 비교합니다.
+        verify_only (bool): True면 동기화 없이 현재 Drive/Local 상태만 검증합니다.
+        drive_backup_mode (str): Drive 측 충돌 파일 백업 방식
+            ('download', 'copy', 'revision').
+        backup_max_age_days (float | None): 충돌 백업 보존 기간(일).
+        backup_max_size_mb (float | None): 충돌 백업 전체 용량 한도(MB).
+        include_patterns (list[str] | None): 동기화할 경로 글롭 패턴 (--include).
+        exclude_patterns (list[str] | None): 제외할 경로 글롭 패턴 (--exclude).
+        export_google_files (bool): True면 Google Docs/Sheets/Slides를 내보내 동기화합니다.
+        export_formats (dict[str, str] | None): 문서 종류별 내보내기 확장자.
+        export_workers (int): 내보내기 전용 최대 동시 실행 수 (전송과 별도로 1~이 값 사이에서 조정).
+        fingerprint_mode (str): 로컬 변경 감지용 지문 방식 (FINGERPRINT_MODES).
+        shard (ShardSpec | None): 주어지면 이 샤드에 속한 경로만 조회/스캔/비교/전송합니다.
+        metrics_json (Path | None): 실행 지표 JSON 출력 경로.
+        resume (bool): True면 끝나지 않은 저널의 남은 작업을 먼저 이어서 실행합니다.
+        from_snapshot (bool): True면 Drive 목록 대신 저장된 스냅샷을 사용합니다.
+            전송은 하지 않으므로 drive_tree_only, verify_only, dry_run 과 함께 사용합니다.
+        refresh_snapshot (bool): from_snapshot 사용 전에 Changes API로 스냅샷을 갱신합니다.
+        dry_run (bool): True면 계획한 작업을 출력만 하고 실행하지 않습니다.
+        list_workers (tuple[int, int]): 목록 조회 동시 요청 수 (최소, 최대).
+        transfer_workers (tuple[int, int]): 파일 전송 동시 실행 수 (최소, 최대).
+            최소와 최대가 다르면 지연 시간과 할당량 초과에 따라 그 사이에서 조정합니다.
+        credential_pool (CredentialPool | None): 주어지면 token.pickle 대신 풀의 여러
+            자격 증명으로 요청을 나눠 보냅니다.
 
     Returns:
         bool | None: 검증을 수행했으면 통과 여부, 수행하지 않았으면 None.
+
+    Raises:
+        SyncInterrupted: SIGINT/SIGTERM 으로 중단된 경우. 저널은 재개 가능한 상태로 남습니다.
     """
     backup_dir = sync_dir / BACKUP_DIR_NAME
     sync_dir.mkdir(parents=True, exist_ok=True)
     backup_dir.mkdir(exist_ok=True)
-
-    service = get_service()
-    try:
-        validate_drive_folder(service, drive_folder_id)
-    except ValueError as error:
-        print(f"오류: {error}")
+    metrics = SyncMetrics()
+    STOP_REQUESTED.clear()
+    if shard is not None:
+        print(f"Shard {shard.label} (by {shard.mode})")
+
+    list_limiter = AdaptiveConcurrency('list', *list_workers)
+    transfer_limiter = AdaptiveConcurrency('transfer', *transfer_workers)
+    # 내보내기는 전송 슬롯을 쓰지 않고 export_workers 에서 시작해 할당량 초과 시에만 줄입니다.
+    export_limiter = AdaptiveConcurrency('export', 1, export_workers)
+    export_limiter.limit = export_workers
+
+    def _finish(result):
+        for limiter in (list_limiter, transfer_limiter, export_limiter):
+            if limiter.requests or limiter.throttled:
+                print(limiter.summary())
+            metrics.record_concurrency(limiter)
+        if credential_pool is not None:
+            for line in credential_pool.summary_lines():
+                print(line)
+            metrics.record_credential_pool(credential_pool)
+        if metrics_json is not None:
+            metrics.save(metrics_json)
+        return result
+
+    if from_snapshot and not (drive_tree_only or verify_only or dry_run):
+        print("오류: 스냅샷 모드는 트리 출력, 검증 또는 --dry-run 에서만 사용할 수 있습니다.")
         sys.exit(1)
 
-    drive_files, drive_folders = get_drive_items(service, drive_folder_id)
+    def _connect():
+        if credential_pool is not None:
+            pooled_service = PooledDriveService(credential_pool)
+            return pooled_service, lambda: pooled_service
+        creds = get_credentials()
+        return build_drive_service(creds), lambda: build_drive_service(creds)
+
+    rules = SyncRules.load(sync_dir, include_patterns, exclude_patterns, shard)
+    snapshot = DriveSnapshot(get_state_dir(backup_dir, shard) / DRIVE_SNAPSHOT_FILENAME)
+    workspace_files = None
+    if from_snapshot:
+        if not snapshot.exists():
+            print(f"오류: Drive 스냅샷이 없습니다: {snapshot.path} (먼저 일반 실행이 필요합니다)")
+            sys.exit(1)
+        service = service_factory = None
+        if refresh_snapshot:
+            service, service_factory = _connect()
+            with metrics.timed('refresh_snapshot'):
+                refresh_drive_snapshot(
+                    service,
+                    snapshot,
+                    rules,
+                    limiter=list_limiter,
+                    service_factory=service_factory,
+                )
+        with metrics.timed('load_snapshot'):
+            snapshot_meta, drive_files, drive_folders, _ = snapshot.load()
+        if snapshot_meta.get('drive_folder_id') != drive_folder_id:
+            print(
+                "오류: Drive 스냅샷의 폴더 ID가 다릅니다: "
+                f"{snapshot_meta.get('drive_folder_id')} != {drive_folder_id}"
+            )
+            sys.exit(1)
+        drive_files, drive_folders = filter_by_rules(rules, drive_files, drive_folders)
+        print(f"Using Drive snapshot saved at {snapshot_meta.get('updated')}")
+    else:
+        service, service_factory = _connect()
+        try:
+            root_item = validate_drive_folder(service, drive_folder_id)
+        except ValueError as error:
+            print(f"오류: {error}")
+            sys.exit(1)
+
+        journal = SyncJournal(get_state_dir(backup_dir, shard) / JOURNAL_FILENAME)
+        unfinished = SyncJournal.load_unfinished(journal.path)
+        if (
+            resume
+            and unfinished is not None
+            and unfinished[0].get('drive_folder_id') == drive_folder_id
+            and not (drive_tree_only or verify_only or dry_run)
+        ):
+            header, pending = unfinished
+            try:
+                with handle_stop_signals(), metrics.timed('transfer'):
+                    ledger = resume_sync_journal(
+                        journal,
+                        header,
+                        pending,
+                        service,
+                        sync_dir,
+                        backup_dir,
+                        drive_folder_id,
+                        drive_backup_mode=drive_backup_mode,
+                    )
+            except SyncInterrupted:
+                raise
+            except Exception as error:
+                # 재개에 실패하면 저널을 닫고 이번 실행에서 전체 비교로 이어 갑니다.
+                print(
+                    f"Resume failed ({type(error).__name__}: {error}); "
+                    "falling back to a full sync."
+                )
+            else:
+                metrics.record_ledger(ledger)
+                if not (verify_sync or verify_deep or verify_report_md is not None):
+                    print("Run sync again for a full comparison and verification.")
+                    return _finish(None)
+                # 검증을 요청했으면 재개로 끝내지 않고 전체 비교와 검증까지 이어 갑니다.
+                print("Resume completed; running a full comparison for verification.")
+
+        # 목록 조회 전에 토큰을 받아 두어야 조회 중 생긴 변경도 다음 갱신에 포함됩니다.
+        snapshot_meta = {
+            'drive_folder_id': drive_folder_id,
+            'drive_id': (root_item or {}).get('driveId'),
+            'start_page_token': get_changes_start_page_token(
+                service, (root_item or {}).get('driveId')
+            ),
+        }
+        workspace_files = {} if export_google_files else None
+        listed_folder_ids: Dict[str, str] = {}
+        with metrics.timed('list_drive'):
+            drive_files, drive_folders = get_drive_items(
+                service,
+                drive_folder_id,
+                rules,
+                workspace_files,
+                listed_folder_ids,
+                limiter=list_limiter,
+                service_factory=service_factory,
+            )
+
+    def _save_snapshot(files, folders, folder_cache=None):
+        if from_snapshot:
+            return
+        with metrics.timed('save_snapshot'):
+            snapshot.save(
+                snapshot_meta,
+                files,
+                folders,
+                resolve_folder_ids(drive_folder_id, folders, listed_folder_ids, folder_cache or {}),
+            )
+
+    metrics.add('drive_files', len(drive_files))
+    metrics.add('drive_folders', len(drive_folders))
     if drive_tree_md is not None:
         export_drive_tree_markdown(drive_tree_md, drive_files, drive_folders)
     if drive_tree_only:
+        _save_snapshot(drive_files, drive_folders)
         print("Drive tree export completed.")
-        return None
-
-    local_files = get_local_files(sync_dir)
-    local_folders = get_local_directories(sync_dir)
-    folder_cache: Dict[Tuple[str, str], str] = {}
+        return _finish(None)
+
+    with metrics.timed('scan_local'):
+        initial_local_files = get_local_files(
+            sync_dir,
+            rules,
+            fingerprint_mode=resolve_fingerprint_mode(fingerprint_mode),
+            local_index=load_local_index(backup_dir, shard),
+        )
+        initial_local_folders = get_local_directories(sync_dir, rules)
+    metrics.add('local_files', len(initial_local_files))
+    metrics.add('local_folders', len(initial_local_folders))
+    # 해시 샤드: 다른 샤드의 로컬 파일과 이름이 겹치는 Drive 폴더는 그 샤드에 맡깁니다.
+    foreign_conflicts = find_foreign_name_conflicts(
+        shard, sync_dir, drive_folders, initial_local_folders
+    )
+    if foreign_conflicts:
+        print(
+            f"Deferring {len(foreign_conflicts)} file/folder name conflict(s) "
+            "to the shards that own the local files"
+        )
+    compare_drive_files, compare_drive_folders = drop_subtrees(
+        drive_files, drive_folders, foreign_conflicts
+    )
+    # 내보낸 문서의 로컬 사본은 Drive 쪽 기대 파일로 취급합니다.
+    export_index = load_export_index(backup_dir, shard)
+    exported_files = export_expected_files(export_index)
+    # MD5는 Drive 쪽에도 같은 경로가 있어 실제로 비교할 파일만 계산합니다.
+    compared_paths = set(drive_files) | set(exported_files)
+
+    if verify_only:
+        if verify_deep:
+            ensure_local_md5(sync_dir, initial_local_files, compared_paths)
+        save_local_index(backup_dir, initial_local_files, shard)
+        _save_snapshot(drive_files, drive_folders)
+        if local_tree_md is not None:
+            export_local_tree_markdown(
+                local_tree_md, initial_local_files, initial_local_folders
+            )
+        # 방금 스캔한 로컬 MD5가 최신이므로 다시 해시하지 않습니다.
+        with metrics.timed('verify'):
+            is_ok = run_sync_verification(
+                sync_dir,
+                backup_dir,
+                {**exported_files, **compare_drive_files},
+                compare_drive_folders,
+                initial_local_files,
+                initial_local_folders,
+                verify_deep=verify_deep,
+                verify_report_md=verify_report_md,
+                shard=shard,
+            )
+        return _finish(is_ok)
 
     print("Scanning changes...")
 
-    # 1. Drive에만 있는 폴더: 로컬에 생성
-    for folder in sorted(drive_folders):
-        local_folder_path = sync_dir / folder
-        if local_folder_path.exists():
-            if local_folder_path.is_file():
-                print(f"Path conflict (Drive folder vs Local file): {folder}")
-                move_local_file_to_conflict_backup(
-                    local_folder_path,
-                    backup_dir,
-                    folder,
-                    'drive_folder_vs_local_file',
-                )
-                local_folder_path.mkdir(parents=True, exist_ok=True)
-            continue
-        print(f"New folder from Drive: {folder}")
-        local_folder_path.mkdir(parents=True, exist_ok=True)
+    # 지난 동기화 끝에 일치했고 그 뒤 양쪽 모두 바뀌지 않은 하위 트리는 비교하지 않습니다.
+    with metrics.timed('directory_digests'):
+        unchanged_dirs = find_unchanged_directories(
+            load_directory_digests(backup_dir, shard),
+            {**exported_files, **compare_drive_files},
+            compare_drive_folders,
+            initial_local_files,
+            initial_local_folders,
+        )
+    metrics.add('unchanged_dirs', len(unchanged_dirs))
+    if '' in unchanged_dirs:
+        print("No changes detected (directory digests match).")
+    elif unchanged_dirs:
+        print(f"Skipping unchanged folders: {len(unchanged_dirs)}")
+    plan_drive_files, plan_drive_folders = drop_subtrees(
+        compare_drive_files, compare_drive_folders, unchanged_dirs
+    )
+    plan_local_files, plan_local_folders = drop_subtrees(
+        initial_local_files, initial_local_folders, unchanged_dirs
+    )
+    with metrics.timed('hash_local'):
+        ensure_local_md5(
+            sync_dir, initial_local_files, compared_paths.intersection(plan_local_files)
+        )
+    ledger = SyncLedger()
+
+    # Google Workspace 문서 내보내기는 전용 풀에서 바이너리 전송과 병행합니다.
+    export_jobs = []
+    export_targets = set(exported_files)
+    if workspace_files:
+        export_jobs = plan_workspace_exports(
+            workspace_files,
+            export_formats or DEFAULT_EXPORT_FORMATS,
+            export_index,
+            sync_dir,
+            drive_files,
+            rules,
+        )
+        export_targets.update(job['path'] for job in export_jobs)
 
+    # 양쪽 스냅샷을 한 번 병합 비교해 1~5단계 작업을 모두 계획합니다.
+    # 1. Drive에만 있는 폴더: 로컬에 생성
     # 2. 로컬에만 있는 폴더: Drive에 생성
-    for folder in sorted(local_folders):
-        if folder not in drive_folders:
-            print(f"New folder from Local: {folder}")
-            ensure_drive_folder_path(service, drive_folder_id, folder, folder_cache)
+    # 3. Drive에만 있는 파일: 다운로드
+    # 4. 로컬에만 있는 파일: 업로드
+    # 5. 양쪽 모두 있는 파일: 충돌 확인 및 처리
+    with metrics.timed('plan'):
+        operations = plan_sync_operations(
+            plan_drive_files,
+            plan_drive_folders,
+            plan_local_files,
+            plan_local_folders,
+            skip_upload_paths=export_targets,
+        )
+    metrics.add('planned_operations', len(operations))
+    if not operations and not export_jobs and '' not in unchanged_dirs:
+        print("No changes detected.")
+    if dry_run:
+        print_operation_preview(operations, export_jobs)
+        _save_snapshot(drive_files, drive_folders)
+        return _finish(None)
+    # 저장된 다이제스트는 이번 실행이 끝까지 성공해야 다시 만들어집니다.
+    (get_state_dir(backup_dir, shard) / DIRECTORY_DIGESTS_FILENAME).unlink(missing_ok=True)
+    journal.begin(
+        {
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'drive_folder_id': drive_folder_id,
+            'shard': shard.label if shard is not None else None,
+            'operations': len(operations),
+        },
+        (
+            build_journal_record(seq, operation, drive_files, initial_local_files)
+            for seq, operation in enumerate(operations)
+        ),
+    )
+    executor = SyncExecutor(
+        service,
+        sync_dir,
+        backup_dir,
+        drive_folder_id,
+        drive_files,
+        initial_local_files,
+        ledger,
+        drive_backup_mode=drive_backup_mode,
+        limiter=transfer_limiter,
+        service_factory=service_factory,
+    )
+
+    def _run_operations(folder_phase):
+        executor.run_all(
+            [
+                (seq, operation)
+                for seq, operation in enumerate(operations)
+                if (operation['op'] in FOLDER_OPERATIONS) == folder_phase
+            ],
+            journal.mark_done,
+        )
 
-    local_files = get_local_files(sync_dir)
-    local_folders = get_local_directories(sync_dir)
+    transfer_started = time.monotonic()
+    exporter = None
+    interrupted = failed = None
+    try:
+        with handle_stop_signals():
+            _run_operations(folder_phase=True)
 
-    # 3. Drive에만 있는 파일: 다운로드
-    for name, drive_file in drive_files.items():
-        local_path = sync_dir / name
-        if local_path.exists():
-            if local_path.is_dir():
-                print(f"Path conflict (Drive file vs Local folder): {name}")
-                download_drive_file_to_conflict_backup(
-                    service,
-                    drive_file['id'],
-                    backup_dir,
-                    name,
-                    'drive_file_vs_local_folder',
+            if export_jobs:
+                print(f"Exporting Google files: {len(export_jobs)}")
+                exporter = WorkspaceExporter(
+                    service_factory, export_workers, limiter=export_limiter
                 )
-            continue
-        print(f"New from Drive: {name}")
-        download_file(service, drive_file['id'], local_path)
+                for job in export_jobs:
+                    local_info = initial_local_files.get(job['path'])
+                    if local_info and job['local_path'].is_file() and (
+                        job['previous_md5'] is None or local_info.md5 != job['previous_md5']
+                    ):
+                        # 로컬에서 수정된 내보내기 사본은 덮어쓰기 전에 백업합니다.
+                        backup_conflict(
+                            job['local_path'],
+                            backup_dir,
+                            job['path'],
+                            'local_edit_of_export',
+                            replace_original=True,
+                        )
+                        ledger.record('local_backup', job['path'])
+                    exporter.submit(job)
+
+            _run_operations(folder_phase=False)
+    except SyncInterrupted as error:
+        interrupted = error
+        if exporter is not None:
+            exporter.cancel_pending()
+    except Exception as error:
+        failed = error
+        if exporter is not None:
+            exporter.cancel_pending()
+
+    if exporter is not None:
+        for result in exporter.wait():
+            ledger.record(
+                'export',
+                result['path'],
+                file_id=result['file_id'],
+                size=result['size'],
+                md5=result['md5'],
+                modified=result['modified'],
+                mtime_ns=result['mtime_ns'],
+            )
+            export_index[result['file_id']] = {
+                'path': result['path'],
+                'version': result['version'],
+                'modifiedTime': result['modifiedTime'],
+                'size': result['size'],
+                'md5': result['md5'],
+            }
+        save_export_index(backup_dir, export_index, shard)
+        exported_files = export_expected_files(export_index)
+    metrics.timings['transfer'] = time.monotonic() - transfer_started
+    metrics.record_ledger(ledger)
+    if interrupted is not None:
+        journal.close()
+        _finish(None)
+        print(f"Sync interrupted: {interrupted}. Pending operations resume on the next run.")
+        raise interrupted
+    if failed is not None:
+        # 실패한 계획은 재개하지 않고 다음 실행에서 전체 비교로 다시 계산합니다.
+        journal.abandon(failed)
+        _finish(None)
+        raise failed
+    journal.finish()
+
+    print("Sync completed!")
+    backup_max_bytes = (
+        int(backup_max_size_mb * 1024 * 1024) if backup_max_size_mb is not None else None
+    )
+    prune_conflict_backups(
+        backup_dir,
+        max_age_days=backup_max_age_days,
+        max_total_bytes=backup_max_bytes,
+    )
+    prune_drive_conflict_backups(
+        service,
+        drive_folder_id,
+        backup_dir,
+        max_age_days=backup_max_age_days,
+        max_total_bytes=backup_max_bytes,
+        limiter=transfer_limiter,
+        list_limiter=list_limiter,
+    )
+    # 전체 재조회 대신 초기 스냅샷 + 장부로 최종 상태를 계산합니다.
+    (
+        final_drive_files,
+        final_drive_folders,
+        final_local_files,
+        final_local_folders,
+    ) = ledger.apply(
+        sync_dir,
+        drive_files,
+        drive_folders,
+        initial_local_files,
+        initial_local_folders,
+    )
+    _save_snapshot(final_drive_files, final_drive_folders, executor.folder_cache)
+    final_drive_files, final_drive_folders = drop_subtrees(
+        {**exported_files, **final_drive_files}, final_drive_folders, foreign_conflicts
+    )
+    save_local_index(backup_dir, final_local_files, shard)
+    with metrics.timed('directory_digests'):
+        save_directory_digests(
+            backup_dir,
+            final_drive_files,
+            final_drive_folders,
+            final_local_files,
+            final_local_folders,
+            shard,
+        )
 
-    local_files = get_local_files(sync_dir)
+    if local_tree_md is not None:
+        export_local_tree_markdown(local_tree_md, final_local_files, final_local_folders)
 
-    # 4. 로컬에만 있는 파일: 업로드
-    for name, local_info in local_files.items():
-        if name not in drive_files:
-            print(f"New from Local: {name}")
-            parent_id = ensure_drive_parent_folder(
-                service, drive_folder_id, name, folder_cache
+    if verify_sync or verify_deep or verify_report_md is not None:
+        with metrics.timed('verify'):
+            is_ok = run_sync_verification(
+                sync_dir,
+                backup_dir,
+                final_drive_files,
+                final_drive_folders,
+                final_local_files,
+                final_local_folders,
+                verify_deep=verify_deep,
+                rehash_local=True,
+                verify_report_md=verify_report_md,
+                shard=shard,
             )
-            upload_file(service, local_info['path'], Path(name).name, parent_id)
+        return _finish(is_ok)
 
-    # 5. 양쪽 모두 있는 파일: 충돌 확인 및 처리
-    for name in set(drive_files) & set(local_files):
-        drive_file = drive_files[name]
-        local_info = local_files[name]
+    return _finish(None)
+
+
+def merge_shard_verification_reports(shard_results):
+    """샤드별 검증 리포트를 하나의 Markdown 리포트로 합칩니다.
+
+    Args:
+        shard_results (list[tuple[ShardSpec, int, str | None]]):
+            (샤드, 작업자 종료 코드, 샤드 검증 리포트 본문 또는 None) 목록.
 
-        drive_md5 = drive_file.get('md5Checksum')
-        local_md5 = local_info['md5']
+    Returns:
+        tuple[bool, str]: (모든 샤드 통과 여부, Markdown 리포트).
+    """
+    statuses = []
+    for shard, returncode, report in shard_results:
+        if report is None or returncode not in (0, 2):
+            statuses.append('ERROR')
+        elif '- Result: PASS' in report.splitlines():
+            statuses.append('PASS')
+        else:
+            statuses.append('FAIL')
+    is_ok = all(status == 'PASS' for status in statuses)
 
-        if drive_md5 != local_md5:
-            # 타임스탬프 비교
-            drive_time = datetime.fromisoformat(drive_file['modifiedTime'].rstrip('Z'))
-            local_time = datetime.fromtimestamp(local_info['modified'])
+    first_shard = shard_results[0][0]
+    lines = ['# Sync Verification Report', '']
+    lines.append(f'- Result: {"PASS" if is_ok else "FAIL"}')
+    lines.append(f'- Shards: {first_shard.count} (by {first_shard.mode})')
+    lines.append('')
+    lines.append('| Shard | Result | Exit code |')
+    lines.append('|---|---|---|')
+    for (shard, returncode, _), status in zip(shard_results, statuses):
+        lines.append(f'| {shard.label} | {status} | {returncode} |')
+    lines.append('')
+    for shard, returncode, report in shard_results:
+        lines.append(f'## Shard {shard.label}')
+        lines.append('')
+        if report is None:
+            lines.append(f'- no report (worker exit code: {returncode})')
+            lines.append('')
+            continue
+        for line in report.splitlines()[2:]:
+            # 샤드 리포트의 제목 수준을 한 단계 내려 합친 문서 구조를 유지합니다.
+            lines.append(f'#{line}' if line.startswith('#') else line)
+        lines.append('')
+    return is_ok, '\n'.join(lines)
 
-            print(f"Conflict detected: {name} (Drive: {drive_time}, Local: {local_time})")
 
-            # 로컬 백업 생성
-            backup_conflict(local_info['path'], backup_dir)
+def run_shard_coordinator(
+    sync_dir,
+    drive_folder_id,
+    shard_count,
+    shard_mode,
+    worker_args,
+    verify_requested=False,
+    verify_report_md=None,
+    metrics_json=None,
+    backup_max_age_days=None,
+    backup_max_size_mb=None,
+    credential_pool=None,
+):
+    """샤드 작업자 N개를 로컬 프로세스로 실행하고 지표/검증 리포트를 합칩니다.
 
-            if drive_time > local_time:
-                print(f"Drive newer -> Download: {name}")
-                download_file(service, drive_file['id'], local_info['path'])
-            else:
-                print(f"Local newer -> Upload: {name}")
-                parent_id = ensure_drive_parent_folder(
-                    service, drive_folder_id, name, folder_cache
-                )
-                upload_file(service, local_info['path'], Path(name).name, parent_id)
+    각 작업자는 --shard i/N 으로 자기 파티션만 처리하고, 지표와 검증 리포트를
+    conflicts_backup/.sync_state/shard-i-of-N/ 에 남깁니다. 백업 정리는 작업자가
+    모두 끝난 뒤 코디네이터가 한 번만 수행합니다.
 
-    print("Sync completed!")
-    final_drive_files, final_drive_folders = get_drive_items(service, drive_folder_id)
-    final_local_files = get_local_files(sync_dir)
-    final_local_folders = get_local_directories(sync_dir)
+    Args:
+        sync_dir (Path): 로컬 동기화 루트 경로.
+        drive_folder_id (str): 동기화할 Drive 폴더 ID.
+        shard_count (int): 실행할 작업자(샤드) 수.
+        shard_mode (str): 분배 방식 (SHARD_MODES).
+        worker_args (list[str]): 모든 작업자에 공통으로 전달할 명령줄 인자.
+        verify_requested (bool): 작업자가 검증을 수행하는지 여부.
+        verify_report_md (Path | None): 합친 검증 결과 Markdown 출력 경로.
+        metrics_json (Path | None): 합친 지표 JSON 출력 경로.
+        backup_max_age_days (float | None): 충돌 백업 보존 기간(일).
+        backup_max_size_mb (float | None): 충돌 백업 전체 용량 한도(MB).
+        credential_pool (CredentialPool | None): 폴더 확인에 사용할 자격 증명 풀.
+            작업자에는 worker_args 의 --credential 로 같은 풀이 전달됩니다.
 
-    if local_tree_md is not None:
-        export_local_tree_markdown(local_tree_md, final_local_files, final_local_folders)
+    Returns:
+        tuple[bool, bool | None]: (모든 작업자 정상 종료 여부,
+            검증을 수행했으면 통과 여부, 아니면 None).
+    """
+    backup_dir = sync_dir / BACKUP_DIR_NAME
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    # 작업자가 동시에 OAuth 인증을 시작하지 않도록 토큰을 먼저 준비합니다.
+    if credential_pool is not None:
+        service = PooledDriveService(credential_pool)
+    else:
+        service = build_drive_service(get_credentials())
+    try:
+        validate_drive_folder(service, drive_folder_id)
+    except ValueError as error:
+        print(f"오류: {error}")
+        sys.exit(1)
 
-    if verify_sync or verify_report_md is not None:
-        is_ok, report = build_sync_verification_report(
-            final_drive_files,
-            final_drive_folders,
-            final_local_files,
-            final_local_folders,
+    script_path = str(Path(__file__).resolve())
+    processes = []
+    for index in range(1, shard_count + 1):
+        shard = ShardSpec(index, shard_count, shard_mode)
+        state_dir = get_state_dir(backup_dir, shard)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        for stale_name in (VERIFY_REPORT_FILENAME, METRICS_FILENAME):
+            (state_dir / stale_name).unlink(missing_ok=True)
+        command = [
+            sys.executable,
+            script_path,
+            *worker_args,
+            '--shard', shard.label,
+            '--shard-by', shard_mode,
+            '--metrics-json', str(state_dir / METRICS_FILENAME),
+        ]
+        print(f"Starting shard {shard.label} (by {shard_mode})")
+        processes.append((shard, subprocess.Popen(command)))
+
+    shard_results = []
+    shard_metrics = []
+    # 작업자도 같은 신호를 받아 스스로 정리하므로 코디네이터는 끝까지 기다립니다.
+    with handle_stop_signals():
+        returncodes = [process.wait() for _, process in processes]
+    for (shard, _), returncode in zip(processes, returncodes):
+        print(f"Shard {shard.label} finished (exit code: {returncode})")
+        state_dir = get_state_dir(backup_dir, shard)
+        report_path = state_dir / VERIFY_REPORT_FILENAME
+        report = report_path.read_text(encoding='utf-8') if report_path.exists() else None
+        shard_results.append((shard, returncode, report))
+        metrics_path = state_dir / METRICS_FILENAME
+        if metrics_path.exists():
+            shard_metrics.append(json.loads(metrics_path.read_text(encoding='utf-8')))
+
+    workers_ok = all(returncode in (0, 2) for _, returncode, _ in shard_results)
+    backup_max_bytes = (
+        int(backup_max_size_mb * 1024 * 1024) if backup_max_size_mb is not None else None
+    )
+    prune_conflict_backups(
+        backup_dir,
+        max_age_days=backup_max_age_days,
+        max_total_bytes=backup_max_bytes,
+    )
+    prune_drive_conflict_backups(
+        service,
+        drive_folder_id,
+        backup_dir,
+        max_age_days=backup_max_age_days,
+        max_total_bytes=backup_max_bytes,
+        # 작업자가 모두 끝난 뒤라 한 번에 하나씩 보내고, 할당량 초과만 백오프/재시도합니다.
+        limiter=AdaptiveConcurrency('prune'),
+    )
+
+    merged_metrics = SyncMetrics.merge(shard_metrics)
+    merged_metrics['shards'] = {
+        shard.label: returncode for shard, returncode, _ in shard_results
+    }
+    counters = merged_metrics['counters']
+    print(
+        "Shard totals: "
+        f"downloads={counters.get('ops_download', 0)}, "
+        f"uploads={counters.get('ops_upload', 0)}, "
+        f"exports={counters.get('ops_export', 0)}, "
+        f"drive folders created={counters.get('ops_drive_mkdir', 0)}"
+    )
+    if metrics_json is not None:
+        metrics_json.parent.mkdir(parents=True, exist_ok=True)
+        metrics_json.write_text(
+            json.dumps(merged_metrics, ensure_ascii=False, indent=2),
+            encoding='utf-8',
         )
-        print(f"Verification result: {'PASS' if is_ok else 'FAIL'}")
-        export_verification_report_to_backup(backup_dir, report)
-        if verify_report_md is not None:
-            export_verification_report(verify_report_md, report)
-        return is_ok
+        print(f"Metrics exported: {metrics_json}")
 
-    return None
+    if not verify_requested:
+        return workers_ok, None
+    is_ok, report = merge_shard_verification_reports(shard_results)
+    print(f"Verification result: {'PASS' if is_ok else 'FAIL'}")
+    export_verification_report_to_backup(backup_dir, report)
+    if verify_report_md is not None:
+        export_verification_report(verify_report_md, report)
+    return workers_ok, is_ok
 
 
 def print_usage_guide():
@@ -857,6 +5194,16 @@ def print_usage_guide():
     print(f"  python sync.py --sync-dir {DEFAULT_SYNC_DIR} --drive-folder-id 1ABC...xyz")
     print("  python sync.py --drive-folder-id 1ABC...xyz --drive-tree-md ./drive_tree.md --drive-tree-only")
     print("  python sync.py --drive-folder-id 1ABC...xyz --local-tree-md ./local_tree.md --verify-sync --verify-report-md ./verify.md")
+    print("  python sync.py --drive-folder-id 1ABC...xyz --verify-only --verify-deep")
+    print("  python sync.py --drive-folder-id 1ABC...xyz --exclude node_modules/ --exclude '*.tmp'")
+    print("  python sync.py --drive-folder-id 1ABC...xyz --shards 8 --verify-sync --metrics-json ./metrics.json")
+    print("  python sync.py --drive-folder-id 1ABC...xyz --shard 3/8 --shard-by hash")
+    print("  python sync.py --drive-folder-id 1ABC...xyz --no-resume   # 중단된 실행을 잇지 않고 새로 동기화")
+    print("  python sync.py --drive-folder-id 1ABC...xyz --dry-run   # 실행할 작업만 미리 보기")
+    print("  python sync.py --drive-folder-id 1ABC...xyz --list-workers 2:16 --transfer-workers 1:8   # 동시 실행 수 자동 조정 범위")
+    print("  python sync.py --drive-folder-id 1ABC...xyz --credential alice.pickle --credential sa.json@20   # 여러 자격 증명으로 할당량 분산")
+    print("  python sync.py --drive-folder-id 1ABC...xyz --from-snapshot --drive-tree-only --drive-tree-md drive.md   # 저장된 스냅샷으로 오프라인 트리 출력")
+    print("  python sync.py --drive-folder-id 1ABC...xyz --from-snapshot --refresh-snapshot --verify-only   # 변경 내역만 받아 스냅샷 갱신 후 검증")
 
 
 if __name__ == '__main__':
@@ -903,7 +5250,202 @@ if __name__ == '__main__':
         default=None,
         help='동기화 검증 결과를 저장할 Markdown 파일 경로',
     )
+    parser.add_argument(
+        '--verify-deep',
+        action='store_true',
+        help='검증 시 파일 크기뿐 아니라 MD5까지 비교 (로컬 해시는 병렬 계산)',
+    )
+    parser.add_argument(
+        '--verify-only',
+        action='store_true',
+        help='동기화 없이 현재 Drive/Local 상태만 검증',
+    )
+    parser.add_argument(
+        '--drive-backup-mode',
+        choices=DRIVE_BACKUP_MODES,
+        default='download',
+        help='Drive 측 충돌 파일 백업 방식: download(로컬로 다운로드), '
+             'copy(Drive 서버 측 복사), revision(현재 리비전 영구 보관)',
+    )
+    parser.add_argument(
+        '--backup-max-age-days',
+        type=float,
+        default=None,
+        help='이 기간(일)보다 오래된 conflicts_backup 백업 삭제 '
+             '(Drive 쪽 사본/고정 리비전에도 적용)',
+    )
+    parser.add_argument(
+        '--backup-max-size-mb',
+        type=float,
+        default=None,
+        help='conflicts_backup 백업 전체 용량 한도(MB), 초과 시 오래된 것부터 삭제 '
+             '(Drive 쪽 사본/고정 리비전은 별도로 같은 한도 적용)',
+    )
+    parser.add_argument(
+        '--include',
+        action='append',
+        default=None,
+        metavar='GLOB',
+        help=f'동기화할 경로 글롭 패턴 (여러 번 지정 가능, {SYNC_IGNORE_FILENAME}의 !패턴과 동일)',
+    )
+    parser.add_argument(
+        '--exclude',
+        action='append',
+        default=None,
+        metavar='GLOB',
+        help=f'제외할 경로 글롭 패턴 (여러 번 지정 가능, {SYNC_IGNORE_FILENAME}와 함께 적용)',
+    )
+    parser.add_argument(
+        '--export-google-files',
+        action='store_true',
+        help='Google Docs/Sheets/Slides/Drawings를 지정 형식으로 내보내 로컬에 저장',
+    )
+    parser.add_argument(
+        '--export-format',
+        action='append',
+        default=None,
+        metavar='KIND=EXT',
+        help='문서 종류별 내보내기 형식 (예: document=pdf, spreadsheet=csv). '
+             f'기본: {", ".join(f"{k}={v}" for k, v in DEFAULT_EXPORT_FORMATS.items())}',
+    )
+    parser.add_argument(
+        '--export-workers',
+        type=int,
+        default=DEFAULT_EXPORT_WORKERS,
+        help=f'내보내기 전용 최대 동시 실행 수, 할당량 초과 시 1까지 줄임 (기본: {DEFAULT_EXPORT_WORKERS})',
+    )
+    parser.add_argument(
+        '--list-workers',
+        default=None,
+        metavar='N|MIN:MAX',
+        help=(
+            '목록 조회 동시 요청 수. MIN:MAX 면 지연 시간/할당량 초과에 따라 자동 조정 '
+            f'(기본: {DEFAULT_LIST_WORKERS[0]}:{DEFAULT_LIST_WORKERS[1]})'
+        ),
+    )
+    parser.add_argument(
+        '--transfer-workers',
+        default=None,
+        metavar='N|MIN:MAX',
+        help=(
+            '파일 전송 동시 실행 수. MIN:MAX 면 지연 시간/할당량 초과에 따라 자동 조정 '
+            f'(기본: {DEFAULT_TRANSFER_WORKERS[0]}:{DEFAULT_TRANSFER_WORKERS[1]})'
+        ),
+    )
+    parser.add_argument(
+        '--fingerprint',
+        choices=FINGERPRINT_MODES,
+        default='auto',
+        help='로컬 변경 감지 지문 방식 (기본 auto: xxh3 > blake3 > md5). '
+             'MD5는 Drive와 비교가 필요한 파일만 계산',
+    )
+    parser.add_argument(
+        '--shard',
+        type=str,
+        default=None,
+        metavar='I/N',
+        help='전체 작업을 N개로 나눈 것 중 I번째 파티션만 처리 (예: 3/8)',
+    )
+    parser.add_argument(
+        '--shard-by',
+        choices=SHARD_MODES,
+        default='subtree',
+        help='샤드 분배 방식: subtree(최상위 항목 단위), hash(파일 경로 해시)',
+    )
+    parser.add_argument(
+        '--shards',
+        type=int,
+        default=None,
+        metavar='N',
+        help='코디네이터 모드: 샤드 작업자 N개를 로컬 프로세스로 실행하고 결과를 합침',
+    )
+    parser.add_argument(
+        '--no-resume',
+        action='store_true',
+        help='중단된 이전 실행의 저널을 이어서 실행하지 않고 새로 동기화',
+    )
+    parser.add_argument(
+        '--credential',
+        action='append',
+        default=None,
+        metavar='PATH[@QPS]',
+        help=(
+            '자격 증명 풀에 추가할 사용자 토큰(pickle/authorized_user JSON) 또는 서비스 계정 키(JSON). '
+            '여러 번 지정하면 요청을 나눠 보내고 할당량 초과/토큰 갱신 실패 시 다른 자격 증명으로 전환'
+        ),
+    )
+    parser.add_argument(
+        '--credential-qps',
+        type=float,
+        default=CREDENTIAL_DEFAULT_QPS,
+        help=f'--credential 에 @QPS 가 없을 때 자격 증명별 초당 요청 수 (기본: {CREDENTIAL_DEFAULT_QPS:g})',
+    )
+    parser.add_argument(
+        '--from-snapshot',
+        action='store_true',
+        help='Drive를 조회하지 않고 마지막 실행이 저장한 Drive 스냅샷으로 트리 출력/미리보기/검증',
+    )
+    parser.add_argument(
+        '--refresh-snapshot',
+        action='store_true',
+        help='--from-snapshot 사용 전에 Drive 변경 내역(Changes API)만 받아 스냅샷을 갱신',
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='실행할 작업을 출력만 하고 파일은 변경하지 않음',
+    )
+    parser.add_argument(
+        '--metrics-json',
+        type=Path,
+        default=None,
+        help='실행 지표(항목 수, 작업 수, 전송 바이트, 단계별 시간)를 저장할 JSON 경로',
+    )
     args = parser.parse_args()
+    try:
+        export_formats = parse_export_formats(args.export_format)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.export_workers < 1:
+        parser.error('--export-workers 는 1 이상이어야 합니다.')
+    try:
+        list_workers = (
+            parse_worker_bounds(args.list_workers) if args.list_workers else DEFAULT_LIST_WORKERS
+        )
+        transfer_workers = (
+            parse_worker_bounds(args.transfer_workers)
+            if args.transfer_workers
+            else DEFAULT_TRANSFER_WORKERS
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    if args.credential_qps <= 0:
+        parser.error('--credential-qps 는 0보다 커야 합니다.')
+    credential_specs = []
+    try:
+        for spec in args.credential or []:
+            credential_specs.append(parse_credential_spec(spec, args.credential_qps))
+    except ValueError as error:
+        parser.error(str(error))
+    shard = None
+    if args.shard is not None:
+        if args.shards is not None:
+            parser.error('--shard 와 --shards 는 함께 사용할 수 없습니다.')
+        try:
+            shard = ShardSpec.parse(args.shard, args.shard_by)
+        except ValueError as error:
+            parser.error(str(error))
+    if args.shards is not None:
+        if args.shards < 1:
+            parser.error('--shards 는 1 이상이어야 합니다.')
+        if args.drive_tree_md or args.local_tree_md or args.drive_tree_only:
+            parser.error('--shards 에서는 트리 Markdown 옵션을 사용할 수 없습니다.')
+        if args.from_snapshot or args.dry_run:
+            parser.error('--shards 에서는 --from-snapshot/--dry-run 을 사용할 수 없습니다.')
+    if args.refresh_snapshot and not args.from_snapshot:
+        parser.error('--refresh-snapshot 은 --from-snapshot 과 함께 사용해 주세요.')
+    if args.from_snapshot and not (args.drive_tree_only or args.verify_only or args.dry_run):
+        parser.error('--from-snapshot 은 --drive-tree-only, --verify-only 또는 --dry-run 과 함께 사용해 주세요.')
 
     sync_dir = args.sync_dir or DEFAULT_SYNC_DIR
     drive_folder_id = args.drive_folder_id
@@ -917,18 +5459,34 @@ if __name__ == '__main__':
         print_usage_guide()
         sys.exit(1)
 
+    credential_pool = None
+    if credential_specs:
+        try:
+            credential_pool = CredentialPool.load(credential_specs)
+        except ValueError as error:
+            print(f"오류: {error}")
+            sys.exit(1)
+
     if drive_tree_md is not None:
         drive_tree_md = drive_tree_md.expanduser().resolve()
     if local_tree_md is not None:
         local_tree_md = local_tree_md.expanduser().resolve()
     if verify_report_md is not None:
         verify_report_md = verify_report_md.expanduser().resolve()
+    metrics_json = args.metrics_json
+    if metrics_json is not None:
+        metrics_json = metrics_json.expanduser().resolve()
 
     resolved_sync_dir = sync_dir.resolve()
     backup_log_dir = resolved_sync_dir / BACKUP_DIR_NAME
     backup_log_dir.mkdir(parents=True, exist_ok=True)
     backup_log_path = backup_log_dir / SYNC_LOG_FILENAME
     script_log_path = Path(__file__).resolve().parent / SYNC_LOG_FILENAME
+    if shard is not None:
+        # 샤드 작업자는 서로의 로그를 덮어쓰거나 회전시키지 않도록 별도 로그를 씁니다.
+        backup_log_path = get_state_dir(backup_log_dir, shard) / SYNC_LOG_FILENAME
+        backup_log_path.parent.mkdir(parents=True, exist_ok=True)
+        script_log_path = script_log_path.with_name(f"sync.{shard.name}.log")
 
     rotate_log_if_needed(backup_log_path)
     rotate_log_if_needed(script_log_path)
@@ -946,20 +5504,94 @@ if __name__ == '__main__':
         sys.stdout = TeeStream([original_stdout, backup_log_file, script_log_file])
         sys.stderr = TeeStream([original_stderr, backup_log_file, script_log_file])
         try:
-            verification_result = sync(
-                resolved_sync_dir,
-                drive_folder_id.strip(),
-                drive_tree_md=drive_tree_md,
-                local_tree_md=local_tree_md,
-                drive_tree_only=args.drive_tree_only,
-                verify_sync=args.verify_sync,
-                verify_report_md=verify_report_md,
-            )
+            if args.shards is not None:
+                worker_args = [
+                    '--sync-dir', str(resolved_sync_dir),
+                    '--drive-folder-id', drive_folder_id.strip(),
+                    '--drive-backup-mode', args.drive_backup_mode,
+                    '--fingerprint', args.fingerprint,
+                    '--export-workers', str(args.export_workers),
+                    '--list-workers', f"{list_workers[0]}:{list_workers[1]}",
+                    '--transfer-workers', f"{transfer_workers[0]}:{transfer_workers[1]}",
+                ]
+                for pattern in args.include or []:
+                    worker_args.append(f'--include={pattern}')
+                for pattern in args.exclude or []:
+                    worker_args.append(f'--exclude={pattern}')
+                for spec in args.export_format or []:
+                    worker_args.append(f'--export-format={spec}')
+                for path, qps in credential_specs:
+                    worker_args.append(f'--credential={path.resolve()}@{qps:g}')
+                verify_requested = bool(
+                    args.verify_sync or args.verify_deep or args.verify_only
+                    or verify_report_md is not None
+                )
+                for flag, enabled in (
+                    ('--no-resume', args.no_resume),
+                    ('--verify-sync', verify_requested),
+                    ('--verify-deep', args.verify_deep),
+                    ('--verify-only', args.verify_only),
+                    ('--export-google-files', args.export_google_files),
+                ):
+                    if enabled:
+                        worker_args.append(flag)
+                workers_ok, verification_result = run_shard_coordinator(
+                    resolved_sync_dir,
+                    drive_folder_id.strip(),
+                    args.shards,
+                    args.shard_by,
+                    worker_args,
+                    verify_requested=verify_requested,
+                    verify_report_md=verify_report_md,
+                    metrics_json=metrics_json,
+                    backup_max_age_days=args.backup_max_age_days,
+                    backup_max_size_mb=args.backup_max_size_mb,
+                    credential_pool=credential_pool,
+                )
+                if not workers_ok:
+                    print("오류: 일부 샤드 작업자가 실패했습니다.")
+                    sys.exit(1)
+            else:
+                verification_result = sync(
+                    resolved_sync_dir,
+                    drive_folder_id.strip(),
+                    drive_tree_md=drive_tree_md,
+                    local_tree_md=local_tree_md,
+                    drive_tree_only=args.drive_tree_only,
+                    verify_sync=args.verify_sync,
+                    verify_report_md=verify_report_md,
+                    verify_deep=args.verify_deep,
+                    verify_only=args.verify_only,
+                    drive_backup_mode=args.drive_backup_mode,
+                    backup_max_age_days=args.backup_max_age_days,
+                    backup_max_size_mb=args.backup_max_size_mb,
+                    include_patterns=args.include,
+                    exclude_patterns=args.exclude,
+                    export_google_files=args.export_google_files,
+                    export_formats=export_formats,
+                    export_workers=args.export_workers,
+                    fingerprint_mode=args.fingerprint,
+                    shard=shard,
+                    metrics_json=metrics_json,
+                    resume=not args.no_resume,
+                    from_snapshot=args.from_snapshot,
+                    refresh_snapshot=args.refresh_snapshot,
+                    dry_run=args.dry_run,
+                    list_workers=list_workers,
+                    transfer_workers=transfer_workers,
+                    credential_pool=credential_pool,
+                )
+        except SyncInterrupted:
+            sys.exit(130)
+        except CredentialPoolExhausted as error:
+            print(f"오류: {error}")
+            sys.exit(1)
         finally:
             end_time = datetime.now().isoformat(timespec='seconds')
             print(f"===== Sync ended: {end_time} =====")
             sys.stdout = original_stdout
             sys.stderr = original_stderr
 
-    if args.verify_sync and verification_result is False:
+    verification_requested = args.verify_sync or args.verify_deep or args.verify_only
+    if verification_requested and verification_result is False:
         sys.exit(2)